@@ -6,11 +6,13 @@ import clckwrkbdgr.serialize.stream
 import clckwrkbdgr.tui
 from src.engine import builders, scene
 from src.engine import events, auto, vision
+import src.world.dungeons
 from hud import *
 from world import *
 import tkui
 
-SAVEFILE_VERSION = 20
+SAVEFILE_VERSION = 22
+AUTOSAVE_INTERVAL = 300 # Seconds.
 
 import click
 @click.command()
@@ -24,29 +26,43 @@ def cli(debug=False, logfile=None, use_gui=False):
 			stream=None,
 			)
 	Log.debug('started')
-	savefile = clckwrkbdgr.serialize.stream.Savefile(xdg.save_data_path('dotrogue')/'rogue.sav')
+	savefile = clckwrkbdgr.serialize.stream.Savefile(xdg.save_data_path('dotrogue')/'rogue.sav', binary=True, compression='zlib')
 	with savefile.get_reader() as reader:
 		game = Game()
 		if reader:
 			assert reader.version == SAVEFILE_VERSION, (reader.version, SAVEFILE_VERSION, savefile.filename)
+			if debug:
+				reader.collect_stats()
 			game.load(reader)
+			if debug:
+				Log.debug('Loading stats:\n' + '\n'.join(reader.stats.report()))
 		else:
 			game.generate('overworld')
+	saver = clckwrkbdgr.serialize.stream.BackgroundSaver(savefile, SAVEFILE_VERSION, AUTOSAVE_INTERVAL)
 	if use_gui:
 		with tkui.TkUI() as ui:
-			main_game = tkui.MainGame(game)
+			main_game = tkui.MainGame(game, saver=saver)
 			loop = tkui.ModeLoop(ui)
 			loop.run(main_game)
 	else:
 		with clckwrkbdgr.tui.Curses() as ui:
-			main_game = MainGame(game)
+			main_game = MainGame(game, saver=saver)
 			loop = clckwrkbdgr.tui.ModeLoop(ui)
 			loop.run(main_game)
+	try:
+		saver.wait()
+	except Exception as e:
+		Log.error('Autosave failed: {0}'.format(e))
 	if game.is_finished():
 		savefile.unlink()
 	else:
 		with savefile.save(SAVEFILE_VERSION) as writer:
+			if debug:
+				writer.collect_stats()
 			game.save(writer)
+			if debug:
+				Log.debug('Saving stats:\n' + '\n'.join(writer.stats.report()))
+	Log.debug('Monster line of sight cache: %s', src.world.dungeons.MonsterVision.LINES)
 	Log.debug('exited')
 
 if __name__ == '__main__':
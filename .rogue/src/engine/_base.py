@@ -2,9 +2,11 @@ import logging
 Log = logging.getLogger('rogue')
 from clckwrkbdgr.math import Point, Size, Matrix, Rect
 from clckwrkbdgr.pcg import RNG
+from clckwrkbdgr.collections import LazyDict
 from . import events
 from . import scene, items, appliances, actors
 from . import auto
+from . import math
 
 class GodMode:
 	""" God mode options.
@@ -153,6 +155,7 @@ class Events:
 class Game(object):
 	""" Main object for the game mechanics.
 	"""
+	DISTANCE_MAP_RADIUS = 15 # Max distance to the player monsters could track (see get_distance_map).
 	def __init__(self, rng=None):
 		""" Creates and initializes empty Game.
 		Rng is either RNG object, or integer seed.
@@ -167,10 +170,11 @@ class Game(object):
 		self.playing_time = 0
 		self.god = GodMode()
 		self.events = []
-		self.scenes = {}
+		self.scenes = LazyDict(self._load_scene)
 		self.current_scene_id = None
 		self.automovement = None
-		self.visions = {}
+		self.visions = LazyDict(self._load_vision)
+		self.distance_map = None
 	@property
 	def scene(self):
 		return self.scenes[self.current_scene_id]
@@ -190,6 +194,25 @@ class Game(object):
 	def make_scene(self, scene_id): # pragma: no cover
 		""" Should return constructed Scene object for given ID. """
 		raise NotImplementedError()
+	def get_distance_map(self):
+		""" Returns distance map to the player on the current scene
+		(see math.DistanceMap), shared by all monsters.
+		Map is updated incrementally when player moves
+		and recalculated from scratch on another scene.
+		"""
+		player_pos = self.scene.get_global_pos(self.scene.get_player())
+		if self.distance_map is None or self.distance_map.matrix is not self.scene:
+			self.distance_map = math.DistanceMap(self.scene, max_distance=self.DISTANCE_MAP_RADIUS)
+			self.distance_map.update([player_pos])
+		elif self.distance_map.sources != [player_pos]:
+			self.distance_map.move_sources([player_pos])
+		return self.distance_map
+	def terrain_changed(self):
+		""" Should be called after any change of terrain or appliances
+		on the current scene that could affect passability (e.g. doors).
+		Invalidates cached data that depends on it (distance map).
+		"""
+		self.distance_map = None
 	def jump_to(self, actor, new_pos):
 		""" Transfers actor to a new position on the current map.
 		Does not perform any passability checks.
@@ -212,10 +235,13 @@ class Game(object):
 
 		if self.current_scene_id is not None:
 			self.scene.exit_actor(actor)
+			self.scenes.mark_dirty(self.current_scene_id)
+			self.visions.mark_dirty(self.current_scene_id)
 		if self.current_scene_id and self.scene.one_time(): # pragma: no cover -- TODO
 			del self.scenes[self.current_scene_id]
 			del self.visions[self.current_scene_id]
 		self.current_scene_id = scene_id
+		self.distance_map = None
 		self.scene.enter_actor(actor, passage)
 
 		Log.debug("Finalizing dungeon...")
@@ -232,50 +258,64 @@ class Game(object):
 		self.fire_event(Events.Welcome())
 	def load(self, stream):
 		""" Loads game data from the stream/state.
+		Each scene and vision is stored as a separate section
+		and is loaded only on first access (see LazyDict),
+		so only the current scene (with the player) is loaded right away.
 		Updates vision after loading.
 		"""
 		self.playing_time = stream.read(int)
 		self.rng = RNG(stream.read_int())
+		self.rng.value = stream.read_int()
 		self.current_scene_id = stream.read()
 
-		self.scenes = {}
+		self.scenes = LazyDict(self._load_scene)
 		while True:
 			scene_id = stream.read()
 			if not scene_id:
 				break
-			scene = self.make_scene(scene_id)
-			scene.load(stream)
-			self.scenes[scene_id] = scene
+			self.scenes.pending[scene_id] = stream.read_section()
 
-		self.visions = {}
+		self.visions = LazyDict(self._load_vision)
 		while True:
 			scene_id = stream.read()
 			if not scene_id:
 				break
-			vision = self.scenes[scene_id].make_vision(self.scene.get_player())
-			vision.load(stream)
-			self.visions[scene_id] = vision
+			self.visions.pending[scene_id] = stream.read_section()
 
 		self.fire_event(Events.WelcomeBack())
 		self.update_vision()
+	def _load_scene(self, scene_id, section):
+		scene = self.make_scene(scene_id)
+		scene.load(section.get_reader())
+		return scene
+	def _load_vision(self, scene_id, section):
+		vision = self.scenes[scene_id].make_vision(self.scene.get_player())
+		vision.load(section.get_reader())
+		return vision
 	def save(self, stream):
 		""" Stores game data to the reader/state.
+		Only the current scene and scenes that were changed since the last save
+		(i.e. were current at some point) are serialized,
+		others (including those not loaded yet) are written back as is.
 		"""
 		stream.write(self.playing_time)
+		stream.write(self.rng.seed)
 		stream.write(self.rng.value)
 		stream.write(self.current_scene_id)
-
-		for scene_id, scene in self.scenes.items():
+		self._save_scenes(stream, self.scenes)
+		self._save_scenes(stream, self.visions)
+	def _save_scenes(self, stream, scenes):
+		for scene_id in list(scenes):
 			stream.write(scene_id)
-			stream.write(scene)
-		else:
-			stream.write('')
-
-		for scene_id, vision in self.visions.items():
-			stream.write(scene_id)
-			stream.write(vision)
-		else:
-			stream.write('')
+			if scene_id in scenes.pending:
+				stream.write_section(scenes.pending[scene_id])
+			elif scene_id != self.current_scene_id and scene_id in scenes.clean:
+				stream.write_section(scenes.clean[scene_id])
+			else:
+				section = stream.write_section(scenes[scene_id])
+				if scene_id != self.current_scene_id:
+					scenes.clean[scene_id] = section
+		stream.write('')
 	def is_finished(self):
 		""" Should return True if game is completed/finished/failed
 		and should reset, e.g. savefile should be deleted.
@@ -721,6 +761,7 @@ class Game(object):
 					ok = False
 					continue
 			self.fire_event(Events.ToggledDoor(door, door.is_closed()))
+			self.terrain_changed()
 		return True
 
 	def process_others(self): # pragma: no cover
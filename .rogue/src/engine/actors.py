@@ -390,4 +390,9 @@ class Offensive(Behaviour):
 		vision.visit(self)
 		if vision.is_visible(target_pos):
 			direction = Direction.from_points(self_pos, target_pos)
+			if target == game.scene.get_player():
+				# Walk around obstacles when direct step does not bring closer.
+				step = game.get_distance_map().downhill(self_pos, preferred=self_pos + direction)
+				if step is not None:
+					direction = step - self_pos
 			game.move_actor(self, direction)
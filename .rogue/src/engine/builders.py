@@ -1,6 +1,6 @@
 import inspect
 import copy
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from clckwrkbdgr.math import Matrix, Size
 from clckwrkbdgr import pcg
 from clckwrkbdgr import utils
@@ -26,8 +26,37 @@ class WeightedDistribution(EntityDistribution):
 	Returns data without weight.
 	Weight is a number - the greater the number, the more probable the choice.
 	"""
+	def __init__(self, rng, entities):
+		super(WeightedDistribution, self).__init__(rng, entities)
+		self._population = [data for _, data in self.entities]
+		self._cumulative_weights = pcg.cumulative_weights(weight for weight, _ in self.entities)
+	def __call__(self):
+		return pcg.choice_by_cumulative_weights(self.rng, self._population, self._cumulative_weights)
+
+class AliasDistribution(EntityDistribution):
+	""" Weighted choice from a weighted entity list (see WeightedDistribution)
+	using alias table, so each choice is O(1) regardless of list size.
+	Tables are cached for the same entity lists (up to MAX_CACHED_SAMPLERS
+	most recently used ones); entity lists with unhashable data are not cached.
+	Results differ from WeightedDistribution for the same RNG.
+	"""
+	MAX_CACHED_SAMPLERS = 64
+	_samplers = OrderedDict()
+	def __init__(self, rng, entities):
+		super(AliasDistribution, self).__init__(rng, entities)
+		key = tuple(self.entities)
+		try:
+			self._sampler = self._samplers.pop(key, None)
+		except TypeError:
+			self._sampler = pcg.AliasSampler(self.entities)
+			return
+		if self._sampler is None:
+			self._sampler = pcg.AliasSampler(self.entities)
+		self._samplers[key] = self._sampler
+		while len(self._samplers) > self.MAX_CACHED_SAMPLERS:
+			self._samplers.popitem(last=False)
 	def __call__(self):
-		return pcg.weighted_choices(self.rng, self.entities)[0]
+		return self._sampler.choice(self.rng)
 
 class Builder(object):
 	""" Basic generator for maps with content.
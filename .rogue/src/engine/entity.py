@@ -3,6 +3,28 @@ import six
 from clckwrkbdgr.utils import classfield
 import clckwrkbdgr.utils
 
+_LOAD_PLANS = {} # (base class, actual class): instance method load() or None
+
+def get_load_plan(cls, obj_type):
+	""" Returns subclass-specific load(self, reader) of the actual class obj_type
+	or None if it is not overridden as instance method (see Entity.load()).
+	Classes are inspected only once, result is cached.
+	"""
+	plan = _LOAD_PLANS.get((cls, obj_type), False)
+	if plan is not False:
+		return plan
+	return _compile_load_plan(cls, obj_type)
+
+def _compile_load_plan(cls, obj_type):
+	assert obj_type is cls or issubclass(obj_type, cls)
+	if six.PY2: # pragma: no cover -- TODO
+		is_base_classmethod = obj_type.load.__self__ is not None
+	else: # pragma: no cover -- TODO
+		is_base_classmethod = inspect.ismethod(obj_type.load)
+	plan = None if is_base_classmethod else obj_type.load
+	_LOAD_PLANS[(cls, obj_type)] = plan
+	return plan
+
 class Entity(object):
 	""" The base for any entity in the game: actor, terrain, item etc.
 	"""
@@ -32,19 +54,14 @@ class Entity(object):
 		which loads subclass-specific data only.
 		"""
 		type_name = reader.read()
-		registry = reader.get_meta_info(cls._metainfo_key)
-		obj_type = registry[type_name]
-		assert obj_type is cls or issubclass(obj_type, cls)
+		obj_type = reader.get_meta_info(cls._metainfo_key)[type_name]
+		load = get_load_plan(cls, obj_type)
 		if _additional_init:
 			obj = obj_type(_additional_init(reader))
 		else:
 			obj = obj_type()
-		if six.PY2: # pragma: no cover -- TODO
-			is_overridden_as_instance_method = obj_type.load.__self__ is not None
-		else: # pragma: no cover -- TODO
-			is_overridden_as_instance_method = inspect.ismethod(obj_type.load)
-		if not is_overridden_as_instance_method:
-			obj.load(reader)
+		if load is not None:
+			load(obj, reader)
 		return obj
 
 class EntityAtPos(object):
@@ -33,3 +33,19 @@ class Pathfinder(clckwrkbdgr.math.algorithm.MatrixWave):
 		if not self.matrix.is_passable(p):
 			return False
 		return self.matrix.allow_movement_direction(from_point, p)
+
+class DistanceMap(clckwrkbdgr.math.algorithm.DistanceMap):
+	""" Distance map (flow field) on Scene.
+	Considers terrain and appliances, but not actors:
+	they move during the turn and should be handled by the caller.
+	"""
+	def is_passable(self, p, from_point):
+		""" Movement is allowed if terrain and all appliances are passable
+		and diagonal movement is allowed between two cells.
+		"""
+		cell, objects, _, _ = self.matrix.get_cell_info(p)
+		if not cell or not cell.passable:
+			return False
+		if not all(obj.passable for obj in objects):
+			return False
+		return self.matrix.allow_movement_direction(from_point, p)
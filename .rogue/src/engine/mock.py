@@ -289,7 +289,7 @@ class Vision(vision.Vision):
 		self.visited = Matrix(scene.cells.size, False)
 		self.visible_monsters = []
 	def load(self, reader):
-		self.visited = reader.read_matrix(lambda c:c=='1')
+		self.visited = reader.read_matrix(bool)
 	def save(self, writer):
 		writer.write(self.visited)
 	def is_visible(self, pos):
@@ -1,4 +1,4 @@
-import six, inspect
+from . import entity
 
 class Quest(object):
 	""" Base class for any quest.
@@ -31,17 +31,12 @@ class Quest(object):
 		which loads subclass-specific data only.
 		"""
 		type_name = reader.read()
-		registry = reader.get_meta_info(cls._metainfo_key)
-		obj_type = registry[type_name]
-		assert obj_type is cls or issubclass(obj_type, cls)
+		obj_type = reader.get_meta_info(cls._metainfo_key)[type_name]
+		load = entity.get_load_plan(cls, obj_type)
 		obj = obj_type()
 		obj._active = reader.read_bool()
-		if six.PY2: # pragma: no cover -- TODO
-			is_overridden_as_instance_method = obj_type.load.__self__ is not None
-		else: # pragma: no cover -- TODO
-			is_overridden_as_instance_method = inspect.ismethod(obj_type.load)
-		if not is_overridden_as_instance_method:
-			obj.load(reader)
+		if load is not None:
+			load(obj, reader)
 		return obj
 
 	def summary(self): # pragma: no cover
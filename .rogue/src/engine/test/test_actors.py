@@ -402,3 +402,25 @@ class TestBehaviour(AbstractTestDungeon):
 		goblin.act(self.game)
 		self.assertEqual(self.game.events, [
 			])
+	def should_walk_around_obstacles_towards_player(self):
+		rogue = self.game.scene.get_player()
+		self.game.jump_to(rogue, Point(2, 2))
+		goblin = Goblin(Point(4, 2))
+		self.game.scene.monsters.append(goblin)
+		self.game.update_vision()
+
+		list(self.game.process_events(raw=True)) # Clear events.
+		goblin.act(self.game) # Statue is in the way.
+		self.assertEqual(self.game.events, [
+			Events.Move(goblin, Point(3, 3)),
+			])
+
+		self.game.jump_to(rogue, Point(1, 3))
+		goblin.pos = Point(4, 3)
+		list(self.game.process_events(raw=True)) # Clear events.
+		goblin.act(self.game)
+		self.assertEqual(self.game.events, [
+			Events.Move(goblin, Point(3, 3)),
+			])
+		self.assertEqual(self.game.get_distance_map().sources, [Point(1, 3)])
+		self.assertEqual(self.game.get_distance_map().distance(Point(4, 2)), 3)
@@ -84,6 +84,33 @@ class TestDistribution(unittest.TestCase):
 			(Point(11, 4), 'potion'),
 			]))
 
+	def should_distribute_entities_using_alias_table(self):
+		entities = [
+			(1, ('dragonfly',)),
+			(5, ('goblin',)),
+			(10, ('rat',)),
+			]
+		distribution = builders.AliasDistribution(RNG(0), entities)
+		self.assertEqual([distribution() for _ in range(8)], [
+			('dragonfly',), ('rat',), ('rat',), ('rat',),
+			('rat',), ('goblin',), ('goblin',), ('goblin',),
+			])
+		other = builders.AliasDistribution(RNG(0), list(entities))
+		self.assertIs(other._sampler, distribution._sampler)
+
+		unhashable = builders.AliasDistribution(RNG(0), [(1, ['dragonfly'])])
+		self.assertEqual(unhashable(), ['dragonfly'])
+		self.assertIsNot(builders.AliasDistribution(RNG(0), [(1, ['dragonfly'])])._sampler, unhashable._sampler)
+
+		with unittest.mock.patch.object(builders.AliasDistribution, 'MAX_CACHED_SAMPLERS', 2):
+			builders.AliasDistribution(RNG(0), [(1, ('rat',))])
+			builders.AliasDistribution(RNG(0), [(1, ('goblin',))])
+			self.assertEqual(len(builders.AliasDistribution._samplers), 2)
+			self.assertIsNot(builders.AliasDistribution(RNG(0), entities)._sampler, distribution._sampler)
+	def should_accept_empty_weighted_distribution(self):
+		builder = make_builder(RNG(0), Size(20, 20))
+		self.assertEqual(list(builder.distribute(builders.WeightedDistribution, [], lambda: 0)), [])
+
 class TestBuilder(unittest.TestCase):
 	def should_generate_dungeon(self):
 		rng = RNG(0)
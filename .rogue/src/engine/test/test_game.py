@@ -1,3 +1,4 @@
+from io import BytesIO
 from clckwrkbdgr import unittest
 import clckwrkbdgr.serialize.stream as savefile
 from .. import _base
@@ -41,8 +42,8 @@ class TestSerialization(AbstractTestDungeon):
 		Floor = mock.Floor.__name__
 		ToxicWaste = mock.ToxicWaste.__name__
 		#self.maxDiff = None
-		self.assertEqual(dump, list(map(str, [0, 1521280756,
-			'floor', 'floor',
+		self.assertEqual(dump, list(map(str, [0, 0, 1521280756,
+			'floor', 'floor', 139, 1,
 			10, 10,
 			Wall, Wall, Wall, Wall, Wall, Wall, Wall, Wall, Wall, Wall,
 			Wall, Floor, Floor, Floor, Floor, Floor, Floor, Floor, Floor, Wall,
@@ -65,7 +66,7 @@ class TestSerialization(AbstractTestDungeon):
 				'StairsDown', 'tomb', 'enter', 4, 6,
 			'',
 
-			'floor',
+			'floor', 103, 1,
 			10, 10,
 			0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
 			0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
@@ -102,6 +103,104 @@ class TestSerialization(AbstractTestDungeon):
 			self.assertEqual(item.item.name, restored_item.item.name)
 			self.assertEqual(item.pos, restored_item.pos)
 
+	def should_serialize_and_deserialize_game_in_binary_format(self):
+		dungeon = self.game
+		writer = savefile.BinaryWriter(BytesIO(), 1)
+		dungeon.save(writer)
+		writer.flush()
+
+		restored_dungeon = NanoDungeon()
+		reader = savefile.BinaryReader(BytesIO(writer.f.getvalue()))
+		restored_dungeon.load(reader)
+		self.assertEqual(
+				[(_.name, _.pos) for _ in dungeon.scene.monsters],
+				[(_.name, _.pos) for _ in restored_dungeon.scene.monsters],
+				)
+		self.assertEqual(
+				[(_.item.name, _.pos) for _ in dungeon.scene.items],
+				[(_.item.name, _.pos) for _ in restored_dungeon.scene.items],
+				)
+		self.assertEqual(dungeon.scene.appliances[0].pos, restored_dungeon.scene.appliances[0].pos)
+		for pos in dungeon.scene.cells.size.iter_points():
+			self.assertEqual(type(dungeon.scene.cells.cell(pos)).__name__, type(restored_dungeon.scene.cells.cell(pos)).__name__, str(pos))
+			self.assertEqual(dungeon.vision.visited.cell(pos), restored_dungeon.vision.visited.cell(pos), str(pos))
+	def should_load_other_scenes_on_demand(self):
+		dungeon = self.game
+		dungeon.travel(dungeon.scene.get_player(), 'tomb', 'enter')
+		writer = savefile.BinaryWriter(BytesIO(), 1)
+		dungeon.save(writer)
+		writer.flush()
+
+		restored_dungeon = NanoDungeon()
+		restored_dungeon.load(savefile.BinaryReader(BytesIO(writer.f.getvalue())))
+		self.assertEqual(restored_dungeon.current_scene_id, 'tomb')
+		self.assertEqual(sorted(restored_dungeon.scenes), ['floor', 'tomb'])
+		self.assertEqual(list(restored_dungeon.scenes.pending), ['floor'])
+		self.assertEqual(list(restored_dungeon.visions.pending), ['floor'])
+
+		writer = savefile.BinaryWriter(BytesIO(), 1)
+		restored_dungeon.save(writer)
+		writer.flush()
+		restored_dungeon = NanoDungeon()
+		restored_dungeon.load(savefile.BinaryReader(BytesIO(writer.f.getvalue())))
+		self.assertEqual(list(restored_dungeon.scenes.pending), ['floor'])
+
+		restored_dungeon.travel(restored_dungeon.scene.get_player(), 'floor')
+		self.assertEqual(restored_dungeon.scenes.pending, {})
+		self.assertEqual(restored_dungeon.visions.pending, {})
+		self.assertEqual(
+				[(_.name, _.pos) for _ in dungeon.scenes['floor'].monsters],
+				[(_.name, _.pos) for _ in restored_dungeon.scene.monsters if _ is not restored_dungeon.scene.get_player()],
+				)
+	def should_serialize_only_changed_scenes(self):
+		dungeon = self.game
+		dungeon.travel(dungeon.scene.get_player(), 'tomb', 'enter')
+		writer = savefile.BinaryWriter(BytesIO(), 1)
+		dungeon.save(writer)
+		self.assertEqual(list(dungeon.scenes.clean), ['floor'])
+		self.assertEqual(list(dungeon.visions.clean), ['floor'])
+		floor_section = dungeon.scenes.clean['floor']
+
+		writer = savefile.BinaryWriter(BytesIO(), 1)
+		dungeon.save(writer)
+		writer.flush()
+		self.assertIs(dungeon.scenes.clean['floor'], floor_section)
+		restored_dungeon = NanoDungeon()
+		restored_dungeon.load(savefile.BinaryReader(BytesIO(writer.f.getvalue())))
+		self.assertEqual(
+				[(_.name, _.pos) for _ in dungeon.scenes['floor'].monsters],
+				[(_.name, _.pos) for _ in restored_dungeon.scenes['floor'].monsters],
+				)
+
+		dungeon.travel(dungeon.scene.get_player(), 'floor')
+		dungeon.travel(dungeon.scene.get_player(), 'tomb', 'enter')
+		self.assertEqual(dungeon.scenes.clean, {})
+		self.assertEqual(dungeon.visions.clean, {})
+		dungeon.save(savefile.BinaryWriter(BytesIO(), 1))
+		self.assertIsNot(dungeon.scenes.clean['floor'], floor_section)
+	def should_generate_the_same_scenes_after_loading(self):
+		class ForkingDungeon(NanoDungeon):
+			def make_scene(self, scene_id):
+				return mock.Dungeon(self.rng.fork(scene_id))
+		dungeon = ForkingDungeon(12345)
+		dungeon.generate('floor')
+		dungeon.rng.get()
+		writer = savefile.BinaryWriter(BytesIO(), 1)
+		dungeon.save(writer)
+		writer.flush()
+		restored_dungeon = ForkingDungeon()
+		restored_dungeon.load(savefile.BinaryReader(BytesIO(writer.f.getvalue())))
+		self.assertEqual(restored_dungeon.rng.seed, 12345)
+		self.assertEqual(restored_dungeon.rng.value, dungeon.rng.value)
+
+		dungeon.travel(dungeon.scene.get_player(), 'tomb', 'enter')
+		restored_dungeon.travel(restored_dungeon.scene.get_player(), 'tomb', 'enter')
+		self.assertEqual(restored_dungeon.scene.rng.value, dungeon.scene.rng.value)
+		self.assertEqual(
+				restored_dungeon.scene.tostring(restored_dungeon.scene.get_area_rect()),
+				dungeon.scene.tostring(dungeon.scene.get_area_rect()),
+				)
+
 class TestActionLoop(AbstractTestDungeon):
 	def should_process_others(self):
 		game = self.game
@@ -328,6 +427,18 @@ class TestDoors(AbstractTestDungeon):
 		self.assertEqual(self.game.events, [
 			_base.Events.ToggledDoor(door, True),
 			])
+	def should_reset_distance_map_when_passability_changes(self):
+		rogue = self.game.scene.get_player()
+		self.game.travel(rogue, 'tomb', 'enter')
+		self.game.jump_to(rogue, Point(3, 2))
+		distance_map = self.game.get_distance_map()
+		self.assertIs(self.game.get_distance_map(), distance_map)
+		self.game.toggle_nearby_doors(rogue)
+		self.assertIsNot(self.game.get_distance_map(), distance_map)
+
+		self.assertIsNotNone(self.game.distance_map)
+		self.game.travel(rogue, 'tomb', 'enter')
+		self.assertIsNone(self.game.distance_map)
 
 class TestItems(AbstractTestDungeon):
 	def should_drop_item(self):
@@ -3,7 +3,7 @@ try:
 	from cStringIO import StringIO
 except: # pragma: no cover
 	from io import StringIO
-from .. import terrain
+from .. import terrain, entity
 import clckwrkbdgr.serialize.stream as savefile
 from ..mock import *
 
@@ -35,3 +35,15 @@ class TestTerrainSavefile(unittest.TestCase):
 		cell = ToxicWaste(1)
 		writer.write(cell)
 		self.assertEqual(stream.getvalue(), str(VERSION) + '\x00ToxicWaste\x001')
+	def should_cache_load_plans_for_terrain_classes(self):
+		self.assertIsNone(entity.get_load_plan(terrain.Terrain, Floor))
+		self.assertEqual(entity.get_load_plan(terrain.Terrain, ToxicWaste), ToxicWaste.load)
+		self.assertIsNone(entity.get_load_plan(terrain.Terrain, Floor))
+	def should_collect_stats_for_terrain_classes(self):
+		stream = StringIO(str(VERSION) + '\x00ToxicWaste\x001\x00Floor\x00Floor')
+		reader = savefile.StreamReader(stream)
+		reader.set_meta_info('Terrain', {'Floor':Floor, 'ToxicWaste':ToxicWaste})
+		stats = reader.collect_stats()
+		cells = [reader.read(terrain.Terrain) for _ in range(3)]
+		self.assertEqual([type(cell) for cell in cells], [ToxicWaste, Floor, Floor])
+		self.assertEqual(stats.counts, {'Floor':2, 'ToxicWaste':1})
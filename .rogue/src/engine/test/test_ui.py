@@ -224,6 +224,17 @@ class TestMainGameCustomizations(MainGameTestCase):
 		mode.game.scene.monsters.remove(mode.game.scene.get_player())
 		self.assertFalse(mode.action(clckwrkbdgr.tui.Key(' ')))
 
+	def should_notify_saver_after_each_turn(self):
+		class MockSaver:
+			def __init__(self):
+				self.updates = []
+			def update(self, game):
+				self.updates.append(game)
+		mode = self.mode
+		mode.saver = MockSaver()
+		self.assertTrue(mode.action(False))
+		self.assertEqual(mode.saver.updates, [mode.game])
+
 class TestMainGameControls(MainGameTestCase):
 	def should_quit_game_and_save(self):
 		self.mock_ui.key('S')
@@ -8,7 +8,7 @@ class MockWriterStream:
 	def write(self, item):
 		if item == '\0':
 			return
-		self.dump.append(item)
+		self.dump.extend(item.split('\0')) # Sections are written at once.
 
 class AbstractTestDungeon(unittest.TestCase):
 	def _formatMessage(self, msg, standardMsg): # pragma: no cover
@@ -62,8 +62,12 @@ class MainGame(clckwrkbdgr.tui.Mode):
 	KEYMAPPING = _MainKeys
 	INDICATORS = [] # See .draw_status()
 
-	def __init__(self, game):
+	def __init__(self, game, saver=None):
+		""" Optional saver is notified after each turn to autosave the game
+		(see clckwrkbdgr.serialize.stream.BackgroundSaver).
+		"""
 		self.game = game
+		self.saver = saver
 		self.messages = []
 		self.aim = None
 
@@ -95,6 +99,8 @@ class MainGame(clckwrkbdgr.tui.Mode):
 			self.game.stop_automovement()
 			return True
 		self.game.process_others()
+		if self.saver:
+			self.saver.update(self.game)
 		return not control
 
 	# Options for customizations.
@@ -1,6 +1,6 @@
 import textwrap
 from collections import defaultdict
-from clckwrkbdgr.math import Matrix, Point, Size, get_neighbours
+from clckwrkbdgr.math import Matrix, Point, Size
 import clckwrkbdgr.math.algorithm
 import logging
 Log = logging.getLogger('rogue')
@@ -73,9 +73,10 @@ class RogueDungeon(builders.Builder):
 			for y in range(room.topleft.y+1, room.topleft.y+room.size.height):
 				grid.set_cell((room.topleft.x, y), 'wall_v')
 				grid.set_cell((room.topleft.x+room.size.width, y), 'wall_v')
-			for y in range(room.topleft.y+1, room.topleft.y+room.size.height):
-				for x in range(room.topleft.x+1, room.topleft.x+room.size.width):
-					grid.set_cell((x, y), 'floor')
+			grid.fill(
+					(room.topleft.x+1, room.topleft.y+1),
+					(room.topleft.x+room.size.width-1, room.topleft.y+room.size.height-1),
+					'floor')
 
 		for tunnel in builder.iter_tunnels():
 			for cell in tunnel.iter_points():
@@ -195,9 +196,7 @@ class BSPDungeon(builders.Builder):
 				if self.grid.cell(pos) == 'wall':
 					reach.set_cell(pos, 0)
 			reach.set_cell(self._locked_door, 0)
-			def _spread_function(p):
-				return [x for x in get_neighbours(reach, p) if reach.cell(x) == 1]
-			for pos in clckwrkbdgr.math.algorithm.floodfill(start_pos, _spread_function):
+			for pos in clckwrkbdgr.math.algorithm.scanline_floodfill(reach, start_pos, lambda value: value == 1):
 				reach.set_cell(pos, 2)
 			for door in self.doors:
 				reach.set_cell(door, 1)
@@ -239,9 +238,7 @@ class CityBuilder(builders.Builder):
 		for y in range(self.size.height):
 			grid.set_cell((0, y), 'wall')
 			grid.set_cell((self.size.width - 1, y), 'wall')
-		for x in range(1, self.size.width - 1):
-			for y in range(1, self.size.height - 1):
-				grid.set_cell((x, y), 'floor')
+		grid.fill((1, 1), (self.size.width - 2, self.size.height - 2), 'floor')
 
 		Log.debug("Running BSP...")
 		partition = bsp.BinarySpacePartition(self.rng, min_width=8, min_height=7)
@@ -279,8 +276,10 @@ class CaveBuilder(builders.Builder):
 class MazeBuilder(builders.Builder):
 	""" A maze labyrinth on a grid.
 	Size of the grid cell is controlled by the field CELL_SIZE, default is 1 cell.
+	Maze algorithm is controlled by the field MAZE (see clckwrkbdgr.pcg.maze).
 	"""
 	CELL_SIZE = Size(1, 1)
+	MAZE = clckwrkbdgr.pcg.maze.Maze
 	def _fill_maze(self, grid, layout, floor_terrain='tunnel_floor'):
 		""" Fills actual map with terrain IDs according to given layout
 		and considering cell_size.
@@ -288,13 +287,14 @@ class MazeBuilder(builders.Builder):
 		grid.clear('wall')
 		for pos in layout.size.iter_points():
 			if layout.cell(pos):
-				for x in range(self.CELL_SIZE.width):
-					for y in range(self.CELL_SIZE.height):
-						grid.set_cell((
-								1 + pos.x * self.CELL_SIZE.width + x,
-								1 + pos.y * self.CELL_SIZE.height + y,
-								), floor_terrain,
-								)
+				topleft = Point(
+						1 + pos.x * self.CELL_SIZE.width,
+						1 + pos.y * self.CELL_SIZE.height,
+						)
+				grid.fill(topleft, (
+						topleft.x + self.CELL_SIZE.width - 1,
+						topleft.y + self.CELL_SIZE.height - 1,
+						), floor_terrain)
 	def is_open(self, pos):
 		return self.grid.cell(pos) in ['floor', 'tunnel_floor']
 	def generate_appliances(self):
@@ -303,7 +303,7 @@ class MazeBuilder(builders.Builder):
 		yield self.point(self.is_accessible), 'start'
 		yield self.point(self.is_accessible), 'exit', 0 # TODO proper next_level_id
 	def fill_grid(self, grid):
-		maze = clckwrkbdgr.pcg.maze.Maze(self.rng, self.size, self.CELL_SIZE)
+		maze = self.MAZE(self.rng, self.size, self.CELL_SIZE)
 		layout = maze.build()
 		self._fill_maze(grid, layout)
 
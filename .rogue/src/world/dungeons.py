@@ -7,6 +7,7 @@ from ..engine.terrain import Terrain
 import clckwrkbdgr.math
 
 class MonsterVision(vision.Vision):
+	LINES = clckwrkbdgr.math.algorithm.BresenhamCache(20) # Shared between all monsters.
 	def __init__(self, scene):
 		super(MonsterVision, self).__init__(scene)
 		self.monster = None
@@ -14,19 +15,20 @@ class MonsterVision(vision.Vision):
 		if clckwrkbdgr.math.distance(self.monster.pos, pos) > self.monster.vision:
 			return False
 		is_transparent = lambda p: self.scene.is_transparent_to_monster(p, self.monster)
-		return clckwrkbdgr.math.algorithm.FieldOfView.in_line_of_sight(self.monster.pos, pos, is_transparent)
+		return self.LINES.in_line_of_sight(self.monster.pos, pos, is_transparent)
 	def visit(self, monster):
 		self.monster = monster
 
 class Vision(vision.Vision):
+	FIELD_OF_VIEW = clckwrkbdgr.math.algorithm.FieldOfView
 	def __init__(self, scene):
 		super(Vision, self).__init__(scene)
-		self.visited = Matrix(scene.strata.size, False)
-		self.field_of_view = clckwrkbdgr.math.algorithm.FieldOfView(10)
+		self.visited = Matrix(scene.strata.size, False, typecode='?')
+		self.field_of_view = self.FIELD_OF_VIEW(10)
 		self.visible_monsters = []
 		self.visible_items = []
 	def load(self, reader): # pragma: no cover
-		self.visited = reader.read_matrix(lambda c:c=='1')
+		self.visited = reader.read_matrix(bool, typecode='?')
 	def save(self, writer): # pragma: no cover
 		writer.write(self.visited)
 	def is_visible(self, pos):
@@ -29,9 +29,10 @@ def place_round_tank(rng, grid, topleft_pos, size):
 def place_broken_tank(rng, grid, topleft_pos, size):
 	size = Size(size)
 	topleft_pos = Point(topleft_pos)
+	is_wall = iter(rng.range_array(0, 2, size.width * size.height))
 	for x in range(size.width):
 		for y in range(size.height):
-			if rng.choice((False, True)):
+			if next(is_wall):
 				grid.set_cell(topleft_pos + (x, y), 'wall')
 
 class Builder(builders.Builder):
@@ -66,11 +67,12 @@ class FieldOfTanks(Builder):
 				tank_count.width * (tank_size.width + 1),
 				tank_count.height * (tank_size.height + 1),
 				)
-		field_shift = Point(1, 1)
+		field_shift_x, field_shift_y = 1, 1
 		if (grid.width - 2) > array_size.width:
-			field_shift.x += self.rng.randrange((grid.width - 2) - array_size.width)
+			field_shift_x += self.rng.randrange((grid.width - 2) - array_size.width)
 		if (grid.height - 2) > array_size.height:
-			field_shift.y += self.rng.randrange((grid.height - 2) - array_size.height)
+			field_shift_y += self.rng.randrange((grid.height - 2) - array_size.height)
+		field_shift = Point(field_shift_x, field_shift_y)
 		forms = [
 				place_square_tank,
 				place_round_tank,
@@ -89,9 +91,14 @@ class Builders:
 	def __init__(self, builders, rng=None):
 		self.rng = rng or RNG()
 		self.builder_types = builders
-	def build_block(self, block):
-		builder_type = self.rng.choice(self.builder_types)
-		builder = builder_type(self.rng, block)
+	def build_block(self, block, block_pos=None):
+		""" Fills block with content of a randomly chosen builder.
+		If block_pos is specified, block gets its own RNG forked by block pos,
+		so its content does not depend on the order of building.
+		"""
+		rng = self.rng if block_pos is None else self.rng.fork(block_pos)
+		builder_type = rng.choice(self.builder_types)
+		builder = builder_type(rng, block)
 		builder.generate()
 		builder.make_grid()
 		appliances = list(builder.make_appliances())
@@ -1,21 +1,35 @@
+from clckwrkbdgr import utils
 from clckwrkbdgr.math import Point, Size, Rect
-from clckwrkbdgr.math.grid import EndlessMatrix
+from clckwrkbdgr.math.grid import EndlessMatrix, BlockCache
 from .. import engine
 from ..engine import scene, terrain, actors, appliances
 from ..engine import auto
 
 class Scene(scene.Scene):
 	BLOCK_SIZE = Size(32, 32)
+	BLOCK_CACHE_SIZE = 64 # Blocks out of sight that are kept in memory.
+	BLOCK_SPILL_DIR = None # If set, blocks above cache size are saved there.
+	PREFETCH_BLOCKS = False # Build neighbouring blocks in background.
 	BUILDERS = None
 	def __init__(self):
 		self.terrain = None
 		self.monsters = []
 		self.appliances = []
 		self.builder = type(self).BUILDERS()
+	def _create_terrain(self):
+		cache = BlockCache(self.BLOCK_CACHE_SIZE, spill_dir=self.BLOCK_SPILL_DIR,
+				cell_type=terrain.Terrain,
+				meta_info={'Terrain': {_.__name__:_ for _ in utils.all_subclasses(terrain.Terrain)}},
+				)
+		return EndlessMatrix(block_size=self.BLOCK_SIZE, builder=self.builder.build_block,
+				cell_type=terrain.Terrain, cache=cache, prefetch=self.PREFETCH_BLOCKS,
+				pass_block_pos=True,
+				)
 	def generate(self, id):
-		self.terrain = EndlessMatrix(block_size=self.BLOCK_SIZE, builder=self.builder.build_block)
+		self.terrain = self._create_terrain()
 		self._player_pos = self.builder._start_pos
 		self.appliances[:] = self.builder.appliances
+		self.terrain.prefetch() # Builder state is not needed anymore.
 	def save(self, stream): # pragma: no cover -- TODO
 		self.terrain.save(stream)
 		stream.write(len(self.monsters))
@@ -26,8 +40,9 @@ class Scene(scene.Scene):
 			appliance.save(stream)
 	def load(self, stream): # pragma: no cover -- TODO
 		super(Scene, self).load(stream)
-		self.terrain = EndlessMatrix(block_size=self.BLOCK_SIZE, builder=self.builder.build_block, cell_type=terrain.Terrain)
+		self.terrain = self._create_terrain()
 		self.terrain.load(stream)
+		self.terrain.prefetch()
 		monsters = stream.read(int)
 		for _ in range(monsters):
 			self.monsters.append(actors.Actor.load(stream))
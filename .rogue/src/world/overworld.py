@@ -251,6 +251,7 @@ class MonsterVision(vision.Vision):
 class Scene(scene.Scene):
 	MAX_MONSTER_ACTION_LENGTH = 10
 	SIZE = [(256, 256), (16, 16), (16, 16)]
+	INDEPENDENT_ZONES = False # Each zone is generated with own RNG forked by zone pos.
 
 	def __init__(self, builders, rng=None):
 		self.world = NestedGrid(self.SIZE, [None, ZoneData, FieldData], Terrain)
@@ -332,21 +333,22 @@ class Scene(scene.Scene):
 		close_to_zone_boundaries = False
 		coord = NestedGrid.Coord.from_global(pos, self.world)
 		in_world_pos = coord.values[0]
-		expansion = Point(0, 0)
+		expansion_x, expansion_y = 0, 0
 		if within_zone.x - margin.width < 0:
 			close_to_zone_boundaries = True
-			expansion.x = -1
+			expansion_x = -1
 		if within_zone.x + margin.width >= self.world.cells.cell(in_world_pos).full_size.width:
 			close_to_zone_boundaries = True
-			expansion.x = +1
+			expansion_x = +1
 		if within_zone.y - margin.height < 0:
 			close_to_zone_boundaries = True
-			expansion.y = -1
+			expansion_y = -1
 		if within_zone.y + margin.height >= self.world.cells.cell(in_world_pos).full_size.height:
 			close_to_zone_boundaries = True
-			expansion.y = +1
+			expansion_y = +1
 		if not close_to_zone_boundaries:
 			return
+		expansion = Point(expansion_x, expansion_y)
 		if expansion.x:
 			new_pos = in_world_pos + Point(expansion.x, 0)
 			if self.world.cells.valid(new_pos) and self.world.cells.cell(new_pos) is None:
@@ -360,11 +362,18 @@ class Scene(scene.Scene):
 			if self.world.cells.valid(new_pos) and self.world.cells.cell(new_pos) is None:
 				self.generate_zone(new_pos)
 	def generate_zone(self, zone_pos):
+		""" Fills zone with fields.
+		If INDEPENDENT_ZONES is True, zone content depends only on the seed and zone pos,
+		not on the order in which zones are generated.
+		"""
+		rng = self.rng
+		if self.INDEPENDENT_ZONES:
+			rng = rng.fork(('zone', zone_pos[0], zone_pos[1]))
 		zone = self.world.make_subgrid(zone_pos)
 		for pos in zone.cells:
 			field = zone.make_subgrid(pos)
-			builder_type = self.rng.choice(self.builders)
-			builder = builder_type(self.rng, field.cells)
+			builder_type = rng.choice(self.builders)
+			builder = builder_type(rng, field.cells)
 			builder.generate()
 			builder.make_grid()
 			field.data.monsters.extend(builder.make_actors())
@@ -403,15 +412,35 @@ class Scene(scene.Scene):
 						]
 				if not any(raw_viewport.contains(pos - view_shift, with_border=True) for pos in control_points):
 					continue
-				for pos in field.cells:
-					if not view_rect.contains(pos + field_rect.topleft, with_border=True):
-						continue
-					coord_pos = NestedGrid.Coord(zone_index, field_index, pos)
-					
-					yield ((pos + field_rect.topleft), self.get_cell_info(coord_pos, context=field))
+				for _ in self._iter_field_cells(zone_index, field_index, field, field_rect, view_rect):
+					yield _
+	def _iter_field_cells(self, zone_index, field_index, field, field_rect, view_rect):
+		""" Yields cells of the field that are within view rect
+		(same as get_cell_info(), but objects are collected once per field).
+		"""
+		appliances, items, actors = {}, {}, {}
+		for appliance_pos, appliance in field.data.appliances:
+			appliances.setdefault(appliance_pos, []).append(appliance)
+		for item_pos, item in field.data.items:
+			items.setdefault(item_pos, []).append(item)
+		for actor in field.data.monsters:
+			actors.setdefault(actor.pos, []).append(actor)
+		cells = field.cells
+		field_left, field_top = field_rect.topleft
+		for y in range(max(view_rect.top, field_rect.top), min(view_rect.bottom, field_rect.bottom) + 1):
+			for x in range(max(view_rect.left, field_rect.left), min(view_rect.right, field_rect.right) + 1):
+				pos = Point(x - field_left, y - field_top)
+				cell_actors = actors.get(pos, [])
+				for actor in cell_actors:
+					actor.coord = NestedGrid.Coord(zone_index, field_index, pos)
+				yield Point(x, y), (
+						cells.cell(pos),
+						appliances.get(pos, []),
+						items.get(pos, []),
+						cell_actors,
+						)
 	def valid(self, pos):
-		pos = NestedGrid.Coord.from_global(pos, self.world)
-		return self.world.valid(pos)
+		return self.world.cell_at_global(pos.x, pos.y) is not None
 	def get_cell_info(self, pos, context=None):
 		field = context
 		if field is None:
@@ -481,8 +510,7 @@ class Scene(scene.Scene):
 		result = Matrix(size)
 		for pos in viewrect.size.iter_points():
 			world_pos = pos + viewrect.topleft
-			world_pos.x *= self.SIZE[-1][0]
-			world_pos.y *= self.SIZE[-1][1]
+			world_pos = Point(world_pos.x * self.SIZE[-1][0], world_pos.y * self.SIZE[-1][1])
 			coord = NestedGrid.Coord.from_global(world_pos, self.world)
 			if not self.world.valid(coord):
 				continue
@@ -509,8 +537,7 @@ class Scene(scene.Scene):
 			actor_coord = actor.coord = next(coord for coord, monster in self.all_monsters(raw=True) if monster == actor)
 		return actor_coord.get_global(self.world)
 	def can_move(self, actor, pos):
-		dest_pos = NestedGrid.Coord.from_global(pos, self.world)
-		dest_cell = self.world.cell(dest_pos)
+		dest_cell = self.world.cell_at_global(pos.x, pos.y)
 		return dest_cell.passable
 	def transfer_actor(self, actor, pos):
 		dest_pos = NestedGrid.Coord.from_global(pos, self.world)
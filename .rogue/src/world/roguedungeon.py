@@ -14,6 +14,7 @@ from ..engine import scene, builders
 from ..engine import actors, items, appliances, terrain
 
 class Builder(builders.Builder):
+	DISTRIBUTION = builders.WeightedDistribution
 	def get_item_distribution(self, depth): # pragma: no cover
 		raise NotImplementedError()
 	def get_monster_distribution(self, depth): # pragma: no cover
@@ -55,7 +56,7 @@ class Builder(builders.Builder):
 
 	def generate_items(self):
 		item_distribution = [(prob, (item_type.__name__,)) for (prob, item_type) in self.get_item_distribution(self.depth)]
-		for pos, item in self.distribute(builders.WeightedDistribution, item_distribution, self.amount_fixed(2, 4)
+		for pos, item in self.distribute(self.DISTRIBUTION, item_distribution, self.amount_fixed(2, 4)
 			):
 			if item is None: # pragma: no cover
 				continue
@@ -68,7 +69,7 @@ class Builder(builders.Builder):
 	def generate_actors(self):
 		monster_distribution = [(_, (monster_type.__name__,)) for (_, monster_type) in self.get_monster_distribution(self.depth)]
 		available_rooms = [room for room in self.dungeon.grid.keys() if room != self.enter_room_key]
-		for pos, monster in self.distribute(builders.WeightedDistribution, monster_distribution,  self.amount_fixed(5)):
+		for pos, monster in self.distribute(self.DISTRIBUTION, monster_distribution,  self.amount_fixed(5)):
 			if monster is None: # pragma: no cover
 				continue
 			room = self.dungeon.grid.cell(self.rng.choice(available_rooms))
@@ -89,6 +90,8 @@ class Scene(scene.Scene):
 		self.size = None
 		self.rooms = Matrix( (3, 3) )
 		self.tunnels = []
+		self._room_index = clckwrkbdgr.math.geometry.SpatialIndex()
+		self._tunnel_index = clckwrkbdgr.math.geometry.SpatialIndex()
 		self.items = []
 		self.monsters = []
 		self.objects = []
@@ -146,15 +149,13 @@ class Scene(scene.Scene):
 		return Rect((0, 0),self.size)
 	def valid(self, pos): # pragma: no cover -- TODO
 		return 0 <= pos.x < self.size.width and 0 <= pos.y < self.size.height
-	@functools.lru_cache()
 	def room_of(self, pos):
-		return next((room for room in self.rooms.data if room.contains(pos, with_border=True)), None)
-	@functools.lru_cache()
+		room_index = self._room_index.get(pos)
+		return None if room_index is None else self.rooms.cell(room_index)
 	def tunnel_of(self, pos):
-		return next((tunnel for tunnel in self.tunnels if tunnel.contains(pos)), None)
-	@functools.lru_cache()
+		return self._tunnel_index.get(pos)
 	def index_room_of(self, pos):
-		return next((key for key in self.rooms.keys() if self.rooms.cell(key).contains(pos, with_border=True)), None)
+		return self._room_index.get(pos)
 	@functools.lru_cache()
 	def get_tunnels(self, room):
 		""" Returns all tunnels connected to the room. """
@@ -168,9 +169,7 @@ class Scene(scene.Scene):
 	@functools.lru_cache()
 	def get_tunnel_rooms(self, tunnel):
 		""" Returns both rooms that tunnel connects. """
-		start_room = next(_ for _ in self.rooms.values() if _.contains(tunnel.start, with_border=True))
-		stop_room = next(_ for _ in self.rooms.values() if _.contains(tunnel.stop, with_border=True))
-		return start_room, stop_room
+		return self.room_of(tunnel.start), self.room_of(tunnel.stop)
 	def can_move(self, actor, pos):
 		""" Returns True if pos is available for movement.
 		If with_tunnels is False, prohibits movements in tunnels and their doors.
@@ -195,27 +194,14 @@ class Scene(scene.Scene):
 					return False
 				return True
 		return False
+	def _make_spatial_index(self):
+		""" Rooms and tunnels are static, so point lookups are indexed once. """
+		self._room_index = clckwrkbdgr.math.geometry.SpatialIndex()
+		for room_index in self.rooms.keys():
+			self._room_index.add(self.rooms.cell(room_index), room_index)
+		self._tunnel_index = clckwrkbdgr.math.geometry.SpatialIndex(self.tunnels)
 	def _make_actual_grid(self):
-		self.grid = Matrix(self.size, 'void')
-		for room in self.rooms.values():
-			for y in range(room.top+1, room.bottom):
-				for x in range(room.left+1, room.right):
-					self.grid.set_cell((x, y), 'floor')
-			for x in range(room.left+1, room.right):
-				self.grid.set_cell((x, room.top), "wall_h")
-				self.grid.set_cell((x, room.bottom), "wall_h")
-			for y in range(room.top+1, room.bottom):
-				self.grid.set_cell((room.left, y), "wall_v")
-				self.grid.set_cell((room.right, y), "wall_v")
-			self.grid.set_cell((room.left, room.top), "corner")
-			self.grid.set_cell((room.left, room.bottom), "corner")
-			self.grid.set_cell((room.right, room.top), "corner")
-			self.grid.set_cell((room.right, room.bottom), "corner")
-		for tunnel in self.tunnels:
-			for cell in tunnel.iter_points():
-				self.grid.set_cell(cell, "tunnel")
-			self.grid.set_cell(tunnel.start, "door")
-			self.grid.set_cell(tunnel.stop, "door")
+		self._make_spatial_index()
 		mapping = {
 			'void':  0,
 			'corner':1,
@@ -225,8 +211,23 @@ class Scene(scene.Scene):
 			'tunnel':5,
 			'door'  :6,
 			}
-		for pos in self.grid:
-			self.grid.set_cell(pos, self.terrain.cell((0, mapping[self.grid.cell(pos)])))
+		layout = Matrix(self.size, mapping['void'], typecode='B')
+		for room in self.rooms.values():
+			layout.fill((room.left+1, room.top+1), (room.right-1, room.bottom-1), mapping['floor'])
+			layout.fill((room.left+1, room.top), (room.right-1, room.top), mapping['wall_h'])
+			layout.fill((room.left+1, room.bottom), (room.right-1, room.bottom), mapping['wall_h'])
+			layout.fill((room.left, room.top+1), (room.left, room.bottom-1), mapping['wall_v'])
+			layout.fill((room.right, room.top+1), (room.right, room.bottom-1), mapping['wall_v'])
+			layout.set_cell((room.left, room.top), mapping['corner'])
+			layout.set_cell((room.left, room.bottom), mapping['corner'])
+			layout.set_cell((room.right, room.top), mapping['corner'])
+			layout.set_cell((room.right, room.bottom), mapping['corner'])
+		for tunnel in self.tunnels:
+			for cell in tunnel.iter_points():
+				layout.set_cell(cell, mapping['tunnel'])
+			layout.set_cell(tunnel.start, mapping['door'])
+			layout.set_cell(tunnel.stop, mapping['door'])
+		self.grid = layout.transform(lambda c: self.terrain.cell((0, c)))
 	def _get_terrain(self, pos):
 		if not self.grid.valid(pos): # pragma: no cover -- TODO
 			return self.terrain.cell((0, 0)) # Void.
@@ -243,6 +244,7 @@ class Scene(scene.Scene):
 	def __setstate__(self, data): # pragma: no cover -- TODO
 		self.rooms = data.rooms
 		self.tunnels = data.tunnels
+		self._make_spatial_index()
 
 		self.objects = data.objects
 		self.items = data.map_items
@@ -383,7 +385,7 @@ class MonsterVision(vision.Vision):
 class Vision(vision.Vision):
 	def __init__(self, scene):
 		super(Vision, self).__init__(scene)
-		self.visited_rooms = Matrix((3, 3), False)
+		self.visited_rooms = Matrix((3, 3), False, typecode='?')
 		self.visited_tunnels = [set() for tunnel in scene.tunnels]
 	def save(self, stream): # pragma: no cover -- TODO
 		stream.write(self.visited_rooms.width)
@@ -399,7 +401,7 @@ class Vision(vision.Vision):
 				stream.write(p.y)
 	def load(self, stream): # pragma: no cover -- TODO
 		size = Size(stream.read(int), stream.read(int))
-		self.visited_rooms = Matrix(size, None)
+		self.visited_rooms = Matrix(size, None, typecode='?')
 		for tile_index in self.visited_rooms:
 			self.visited_rooms.set_cell(tile_index, bool(stream.read(int)))
 
@@ -424,12 +426,10 @@ class Vision(vision.Vision):
 			tunnel_visited = self.visited_tunnels[tunnel_visited]
 			return additional in tunnel_visited
 		if isinstance(obj, Point):
-			for room in scene.rooms.values():
-				if room.contains(obj, with_border=True) and self.is_visible(room):
-					return True
-			for tunnel in scene.tunnels:
-				if self.is_visible(tunnel, obj):
-					return True
+			room = scene.room_of(obj)
+			if room and self.is_visible(room):
+				return True
+			return any(obj in tunnel_visited for tunnel_visited in self.visited_tunnels)
 		return False
 	def iter_important(self): # pragma: no cover
 		if not self.scene.current_room:
@@ -451,12 +451,10 @@ class Vision(vision.Vision):
 			tunnel_visited = self.visited_tunnels[tunnel_visited]
 			return additional in tunnel_visited
 		if isinstance(obj, Point):
-			for room in scene.rooms.values():
-				if room.contains(obj, with_border=True) and self.is_explored(room):
-					return True
-			for tunnel in scene.tunnels:
-				if self.is_explored(tunnel, obj): # pragma: no covered -- TODO
-					return True
+			room = scene.room_of(obj)
+			if room and self.is_explored(room):
+				return True
+			return any(obj in tunnel_visited for tunnel_visited in self.visited_tunnels)
 		return False
 	def visit_tunnel(self, tunnel, tunnel_index, pos, adjacent=True):
 		""" Marks cell as visited. If adjacent is True, marks all neighbouring cells too. """
@@ -2,6 +2,7 @@ from clckwrkbdgr import unittest
 import textwrap
 from clckwrkbdgr.math import Point, Size, Rect, Direction
 from clckwrkbdgr.pcg import RNG
+from clckwrkbdgr.math.algorithm import ShadowcastingFieldOfView
 from ..dungeonbuilders import CustomMap
 from ...engine import items, terrain
 from ... import engine
@@ -168,6 +169,20 @@ class TestVisibility(AbstractTestDungeon):
 			next(scene.iter_actors_at((10, 6))),
 			next(scene.iter_actors_at((9, 4))),
 			])
+	def should_use_custom_field_of_view_algorithm(self):
+		class ShadowcastingVision(game.Vision):
+			FIELD_OF_VIEW = ShadowcastingFieldOfView
+		scene = game.Scene(RNG(0), [_MockBuilder])
+		scene.generate('fighting around')
+		scene.enter_actor(Rogue(Point(9, 6)), None)
+		vision = ShadowcastingVision(scene)
+		self.assertTrue(isinstance(vision.field_of_view, ShadowcastingFieldOfView))
+		list(vision.visit(scene.get_player()))
+		self.assertTrue(vision.is_visible(Point(9, 6)))
+		self.assertFalse(vision.is_visible(Point(0, 0)))
+		self.assertEqual(sorted(monster.pos for monster in vision.iter_important()), [
+			Point(9, 4), Point(10, 6),
+			])
 	def should_get_visible_surroundings(self):
 		scene = game.Scene(RNG(0), [_MockBuilder])
 		scene.generate('lonely')
@@ -40,6 +40,20 @@ class TestMainBuilder(unittest.TestCase):
 		builder.build_block(block)
 		pos = builder._start_pos
 		self.assertEqual(pos, (2, 0))
+	def should_build_blocks_independently_of_order(self):
+		builder = Builders(utils.all_subclasses(MockEndlessBuilder), rng=RNG(0))
+		blocks = {}
+		for block_pos in [Point(0, 0), Point(1, 0), Point(0, 1)]:
+			blocks[block_pos] = Matrix((5, 5), MockVoid())
+			builder.build_block(blocks[block_pos], block_pos)
+		builder = Builders(utils.all_subclasses(MockEndlessBuilder), rng=RNG(0))
+		for block_pos in [Point(0, 1), Point(1, 0), Point(0, 0)]:
+			block = Matrix((5, 5), MockVoid())
+			builder.build_block(block, block_pos)
+			self.assertEqual(
+					block.tostring(lambda c: c.sprite.sprite),
+					blocks[block_pos].tostring(lambda c: c.sprite.sprite),
+					)
 
 class TestBuildings(unittest.TestCase):
 	def should_create_square_tank(self):
@@ -1,3 +1,4 @@
+import os
 from clckwrkbdgr.math import Point, Size, Matrix, Rect
 from clckwrkbdgr import unittest
 from clckwrkbdgr.collections import dotdict
@@ -31,7 +32,7 @@ class MockBuilder(object):
 		self._exit_pos = exit_pos
 		self.walls = walls or []
 		self.void = MockVoid()
-	def build_block(self, block):
+	def build_block(self, block, block_pos=None):
 		block.clear(MockFloor())
 		if not self.walls:
 			return
@@ -106,3 +107,18 @@ class TestDungeon(unittest.TestCase):
 		_....@...
 		_........
 		""").replace('_', 'None'))
+
+class MockSpillingScene(MockScene):
+	BLOCK_CACHE_SIZE = 0
+	BLOCK_SPILL_DIR = '/spill'
+
+class TestBlockSpilling(unittest.fs.TestCase):
+	def should_restore_spilled_terrain(self):
+		self.fs.create_dir('/spill')
+		scene = MockSpillingScene(MockBuilder(rogue_pos=(1, 1), walls=[[]]*4+[[(1, 0), (0, 1)]]))
+		scene.generate(1)
+		scene.recalibrate(Point(1, 20))
+		self.assertTrue(os.listdir('/spill'))
+		scene.recalibrate(Point(1, 1))
+		self.assertEqual(type(scene.terrain.cell((1, 0))), MockWall)
+		self.assertEqual(type(scene.terrain.cell((1, 1))), MockFloor)
@@ -279,6 +279,25 @@ class TestScene(unittest.TestCase):
 		self.assertEqual(scene._player_pos, NestedGrid.Coord((1, 0), (1, 1), (1, 1)))
 		self.assertEqual([_ is not None for _ in scene.world.cells.values()], [False] + [True] + [False] * 7)
 		self.assertEqual(scene.get_area_rect(), Rect((0, 0), (3*2*2, 3*2*2)))
+	def should_generate_zones_independently_of_order(self):
+		class IndependentScene(MockScene):
+			INDEPENDENT_ZONES = True
+		def _zone_content(scene, zone_pos):
+			zone = scene.world.cells.cell(zone_pos)
+			return [
+					(field.cells.tostring(lambda c: c.sprite.sprite), [str(_.sprite.sprite) for _ in field.data.monsters])
+					for field in zone.cells.values()
+					]
+		first = IndependentScene(BUILDERS, RNG(1))
+		first.generate_zone(Point(0, 0))
+		first.generate_zone(Point(2, 1))
+		second = IndependentScene(BUILDERS, RNG(1))
+		second.generate_zone(Point(2, 1))
+		second.rng.get() # Shared RNG state does not matter.
+		second.generate_zone(Point(0, 0))
+		self.assertEqual(_zone_content(first, Point(0, 0)), _zone_content(second, Point(0, 0)))
+		self.assertEqual(_zone_content(first, Point(2, 1)), _zone_content(second, Point(2, 1)))
+		self.assertNotEqual(_zone_content(first, Point(0, 0)), _zone_content(first, Point(2, 1)))
 	def should_serialize_and_deserialize_scene(self):
 		scene = MockScene(BUILDERS, RNG(1))
 		scene.generate(None)
@@ -525,6 +544,12 @@ class TestScene(unittest.TestCase):
 		r........
 		r...>....
 		"""))
+		dagger = Dagger()
+		scene.drop_item(ItemAtPos(Point(5, 6), dagger))
+		cells = dict(scene.iter_cells(Rect((3, 4), (9, 8))))
+		self.assertEqual(cells[Point(5, 6)][2], [dagger])
+		for pos, cell_info in cells.items():
+			self.assertEqual(cell_info, scene.get_cell_info(pos))
 
 class TestVision(unittest.TestCase):
 	def should_visit_places_by_monsters(self):
@@ -392,6 +392,19 @@ class TestDungeon(unittest.TestCase):
 		scene.get_player().pos = Point(5, 1)
 		self.assertIsNone(scene.current_room)
 		self.assertEqual(scene.current_tunnel, scene.tunnels[0])
+	def should_check_visibility_of_tunnel_cells(self):
+		scene = MockScene()
+		scene.generate('top')
+		scene.enter_actor(Rogue(None), 'enter')
+		vision = scene.make_vision(scene.get_player())
+		scene.get_player().pos = Point(5, 1)
+		list(vision.visit(scene.get_player()))
+		self.assertTrue(vision.is_visible(scene.tunnels[0], Point(5, 1)))
+		self.assertFalse(vision.is_visible(scene.tunnels[0], Point(5, 3)))
+		self.assertTrue(vision.is_explored(scene.tunnels[0], Point(4, 1)))
+		self.assertFalse(vision.is_explored(scene.tunnels[1], Point(11, 5)))
+		self.assertFalse(vision.is_visible('not a map object'))
+		self.assertFalse(vision.is_explored('not a map object'))
 	def should_detect_player_by_monsters(self):
 		scene = MockScene()
 		scene.generate('top')
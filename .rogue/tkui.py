@@ -171,8 +171,12 @@ class MainGame(object):
 			((77, 23), HUD.Help),
 			]
 
-	def __init__(self, game):
+	def __init__(self, game, saver=None):
+		""" Optional saver is notified after each turn to autosave the game
+		(see clckwrkbdgr.serialize.stream.BackgroundSaver).
+		"""
 		self.game = game
+		self.saver = saver
 		self.messages = None
 		self.aim = None
 		self.main_buttons = []
@@ -196,9 +200,13 @@ class MainGame(object):
 		else:
 			self.show_main_buttons()
 		return result
+	def process_others(self):
+		self.game.process_others()
+		if self.saver:
+			self.saver.update(self.game)
 	def autostop(self, ui):
 		self.game.stop_automovement()
-		self.game.process_others()
+		self.process_others()
 		ui._loop.redraw()
 	def add_button(self, ui, frame, text, control):
 		if control is None:
@@ -317,17 +325,17 @@ class MainGame(object):
 		"""
 		view_rect = self.get_viewrect()
 		Log.debug('View rect: {0}'.format(view_rect))
+		map_window = ui.window.view(Rect(self.get_map_shift(), view_rect.size))
 		for world_pos, cell_info in self.game.scene.iter_cells(view_rect):
 			sprite = self.get_sprite(world_pos, cell_info)
 			if sprite is None:
 				continue
 			viewport_pos = world_pos - view_rect.topleft
-			screen_pos = viewport_pos + self.get_map_shift()
-			#Log.debug('World: {0}, view: {1}, screen: {2}'.format(world_pos, viewport_pos, screen_pos))
+			#Log.debug('World: {0}, view: {1}'.format(world_pos, viewport_pos))
 			try:
-				ui.window.set_cell(screen_pos, sprite.sprite[0])
+				map_window.set_cell(viewport_pos, sprite.sprite[0])
 			except: # pragma: no cover
-				raise RuntimeError('Failed to draw sprite @{0} (screen {1}): {2} ({3})'.format(world_pos, screen_pos, sprite, cell_info))
+				raise RuntimeError('Failed to draw sprite @{0} (view {1}): {2} ({3})'.format(world_pos, viewport_pos, sprite, cell_info))
 	def draw_status(self, ui):
 		""" Draws status line/panel with indicators defined in .INDICATORS,
 		which should be a list of tuples (pos, Indicator).
@@ -846,7 +854,7 @@ class ModeLoop(object): # pragma: no cover -- TODO
 			return False
 
 		result = not control()
-		mode.game.process_others()
+		mode.process_others()
 
 		if not result:
 			return False
@@ -860,7 +868,7 @@ class ModeLoop(object): # pragma: no cover -- TODO
 		if not player:
 			return False
 		mode.game.perform_automovement()
-		mode.game.process_others()
+		mode.process_others()
 		self.redraw()
 		if self.mode.game.in_automovement():
 			self.ui.root.after(100, lambda:self.auto_mode(on_autostop))
@@ -1,5 +1,6 @@
 from clckwrkbdgr.math import Size
 from clckwrkbdgr import utils
+import clckwrkbdgr.pcg.maze
 from src.engine import Game, builders
 import src.world.dungeonbuilders
 import src.world.dungeons
@@ -55,12 +56,14 @@ class CityBuilder(src.world.dungeonbuilders.CityBuilder, DungeonSquatters):
 	Mapping = DungeonMapping
 class Sewers(src.world.dungeonbuilders.Sewers, DungeonSquatters):
 	Mapping = DungeonMapping
+	MAZE = clckwrkbdgr.pcg.maze.BacktrackingMaze
 class RogueDungeon(src.world.dungeonbuilders.RogueDungeon, DungeonSquatters):
 	Mapping = DungeonMapping
 class CaveBuilder(src.world.dungeonbuilders.CaveBuilder, DungeonSquatters):
 	Mapping = DungeonMapping
 class MazeBuilder(src.world.dungeonbuilders.MazeBuilder, DungeonSquatters):
 	Mapping = DungeonMapping
+	MAZE = clckwrkbdgr.pcg.maze.BacktrackingMaze
 
 class DungeonScene(src.world.dungeons.Scene):
 	MAX_LEVELS = 30
@@ -77,10 +80,12 @@ class FilledWithGarbage(EndlessBuilder, endlessbuilders.FilledWithGarbage):
 	pass
 
 class EndlessScene(endlessdungeon.Scene):
+	PREFETCH_BLOCKS = True
 	BUILDERS = lambda: endlessbuilders.Builders(utils.all_subclasses(EndlessBuilder))
 
 class RogueBuilder(src.world.roguedungeon.Builder):
 	Mapping = DungeonMapping
+	DISTRIBUTION = builders.AliasDistribution
 	def get_item_distribution(self, depth):
 		return [
 		(50, HealingPotion),
@@ -104,6 +109,9 @@ class RogueDungeonScene(src.world.roguedungeon.Scene):
 	SIZE = Size(78, 21)
 	BUILDER = RogueBuilder
 
+class OverworldScene(overworld.Scene):
+	INDEPENDENT_ZONES = True
+
 class OverBuilder(object):
 	Mapping = DungeonMapping
 
@@ -121,11 +129,11 @@ class Game(src.engine.Game):
 		if scene_id == 'hollow':
 			return EndlessScene()
 		if scene_id == 'overworld':
-			return overworld.Scene(utils.all_subclasses(OverBuilder))
+			return OverworldScene(utils.all_subclasses(OverBuilder), rng=self.rng.fork(scene_id))
 		if scene_id.startswith('rogue/'):
-			return RogueDungeonScene()
+			return RogueDungeonScene(rng=self.rng.fork(scene_id))
 		if scene_id.startswith('dungeon/'):
-			return DungeonScene(self.rng, [
+			return DungeonScene(self.rng.fork(scene_id), [
 				BSPDungeon,
 				CityBuilder,
 				Sewers,
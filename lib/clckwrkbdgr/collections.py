@@ -1,4 +1,8 @@
 import itertools
+try:
+	from collections.abc import MutableMapping
+except ImportError: # pragma: no cover
+	from collections import MutableMapping
 import clckwrkbdgr.utils
 
 class AutoRegistry(object):
@@ -76,6 +80,49 @@ class dotdict(dict):
 		else:
 			return plain_obj
 
+class LazyDict(MutableMapping):
+	""" Dict with values that are loaded on demand.
+	Values that are not loaded yet are kept in .pending (key: raw data)
+	and are replaced with loader(key, raw data) on first access.
+	Checks for keys (in, len(), iteration) do not trigger loading.
+	Already loaded values are available in .loaded
+	Raw data of loaded values is kept in .clean until value is replaced
+	or marked as changed (see mark_dirty()), so it can be reused for saving.
+	"""
+	def __init__(self, loader):
+		self.loader = loader
+		self.loaded = {}
+		self.pending = {}
+		self.clean = {}
+	def mark_dirty(self, key):
+		""" Marks value as changed, so its raw data is not valid anymore. """
+		self.clean.pop(key, None)
+	def __getitem__(self, key):
+		try:
+			return self.loaded[key]
+		except KeyError:
+			pass
+		value = self.loader(key, self.pending[key])
+		self.clean[key] = self.pending.pop(key)
+		self.loaded[key] = value
+		return value
+	def __setitem__(self, key, value):
+		self.pending.pop(key, None)
+		self.clean.pop(key, None)
+		self.loaded[key] = value
+	def __delitem__(self, key):
+		self.clean.pop(key, None)
+		if key in self.loaded:
+			del self.loaded[key]
+		else:
+			del self.pending[key]
+	def __contains__(self, key):
+		return key in self.loaded or key in self.pending
+	def __iter__(self):
+		return itertools.chain(list(self.loaded), list(self.pending))
+	def __len__(self):
+		return len(self.loaded) + len(self.pending)
+
 class Enum(object):
 	""" Enumeration of integer type with auto-increment.
 	Example:
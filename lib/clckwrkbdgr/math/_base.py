@@ -6,6 +6,12 @@ from collections import namedtuple
 from functools import total_ordering
 import vintage
 
+def _vector_values(other):
+	""" Returns raw sequence of values for Vector or any iterable. """
+	if isinstance(other, Vector):
+		return other.values
+	return list(other)
+
 @total_ordering
 class Vector(object):
 	""" Represents N-dim vector.
@@ -15,6 +21,7 @@ class Vector(object):
 	- accessing items: vector[i];
 	- math operations: <=>, +, -, * (scalar), / (scalar), // (scalar).
 	"""
+	__slots__ = ('values',)
 	def __new__(cls, *args): # pragma: no cover FIXME to prevent issues with deserializing from old namedtuple format.
 		instance = super(Vector, cls).__new__(cls)
 		instance.__init__(*args)
@@ -46,17 +53,17 @@ class Vector(object):
 	def __setstate__(self, state):
 		self.values = state
 	def __eq__(self, other):
-		return other is not None and self.values == Vector(other).values
+		return other is not None and list(self.values) == list(_vector_values(other))
 	def __ne__(self, other):
 		return not (self == other)
 	def __lt__(self, other):
-		return other is not None and self.values < Vector(other).values
+		return other is not None and list(self.values) < list(_vector_values(other))
 	def __abs__(self):
 		return type(self)(list(map(abs, self.values)))
 	def __add__(self, other):
-		return type(self)(list(map(operator.add, self.values, Vector(other).values)))
+		return type(self)(list(map(operator.add, self.values, _vector_values(other))))
 	def __sub__(self, other):
-		return type(self)(list(map(operator.sub, self.values, Vector(other).values)))
+		return type(self)(list(map(operator.sub, self.values, _vector_values(other))))
 	def __mul__(self, other):
 		return type(self)(list(_ * other for _ in self.values))
 	def __floordiv__(self, other):
@@ -66,30 +73,87 @@ class Vector(object):
 	def __div__(self, other): # pragma: no cover -- py2 only
 		return type(self)(list(_ / other for _ in self.values))
 
-class Point(Vector): # pragma: no cover
-	""" Convenience type definition for 2D vector
-	with access to first two elements under aliases .x and .y
+class _Vector2D(Vector):
+	""" Compact immutable 2D vector.
+	Values are stored in a tuple and never change after creation,
+	so objects are hashable as is and can be shared freely.
+	Arithmetics on pairs avoids any intermediate lists.
 	"""
+	__slots__ = ()
+	def __new__(cls, *values):
+		if len(values) == 1:
+			values = values[0]
+			if type(values) is cls:
+				return values # Immutable, no need to copy.
+			if isinstance(values, Vector):
+				values = values.values
+		instance = object.__new__(cls)
+		instance.values = tuple(values)
+		return instance
+	def __init__(self, *values):
+		pass # Already constructed in __new__.
+	def __str__(self): # pragma: no cover
+		return str(list(self.values))
+	def __hash__(self):
+		return hash(self.values)
+	def __getstate__(self):
+		return list(self.values)
 	def __setstate__(self, state):
 		if isinstance(state, dict):
-			self.values = [state['x'], state['y']]
-		else:
-			super(Point, self).__setstate__(state)
+			state = (state['x'], state['y'])
+		self.values = tuple(state)
+	def __eq__(self, other):
+		if isinstance(other, Vector):
+			return self.values == tuple(other.values)
+		return other is not None and self.values == tuple(other)
+	def __ne__(self, other):
+		return not (self == other)
+	def __lt__(self, other):
+		if isinstance(other, Vector):
+			return self.values < tuple(other.values)
+		return other is not None and self.values < tuple(other)
+	def __abs__(self):
+		x, y = self.values
+		return type(self)(abs(x), abs(y))
+	def __add__(self, other):
+		x, y = self.values
+		other_x, other_y = other.values if isinstance(other, Vector) else other
+		return type(self)(x + other_x, y + other_y)
+	def __sub__(self, other):
+		x, y = self.values
+		other_x, other_y = other.values if isinstance(other, Vector) else other
+		return type(self)(x - other_x, y - other_y)
+	def __mul__(self, other):
+		x, y = self.values
+		return type(self)(x * other, y * other)
+	def __floordiv__(self, other):
+		x, y = self.values
+		return type(self)(x // other, y // other)
+	def __truediv__(self, other): # pragma: no cover -- py3 only
+		x, y = self.values
+		return type(self)(x / other, y / other)
+	def __div__(self, other): # pragma: no cover -- py2 only
+		x, y = self.values
+		return type(self)(x / other, y / other)
+
+class Point(_Vector2D):
+	""" Convenience type definition for 2D vector
+	with access to first two elements under aliases .x and .y
+	Points are immutable.
+	"""
+	__slots__ = ()
 	@property
 	def x(self): return self.values[0]
-	@x.setter
-	def x(self, value): self.values[0] = value
 	@property
 	def y(self): return self.values[1]
-	@y.setter
-	def y(self, value): self.values[1] = value
 	def neighbours(self):
 		""" Returns all neighbours including the copy of original point:
 		All points in 3x3 square around the original one.
 		"""
-		for x in [-1, 0, 1]:
-			for y in [-1, 0, 1]:
-				yield Point(self.x + x, self.y + y)
+		x, y = self.values
+		for shift_x in [-1, 0, 1]:
+			for shift_y in [-1, 0, 1]:
+				yield Point(x + shift_x, y + shift_y)
 
 def distance(point_a, point_b):
 	""" Amount of cells between two points. """
@@ -118,27 +182,20 @@ class Direction:
 				)
 		return shift
 
-class Size(Vector): # pragma: no cover
+class Size(_Vector2D):
 	""" Convenience type definition for 2D vector
 	with access to first two elements under aliases .with and .height
+	Sizes are immutable.
 	"""
-	def __setstate__(self, state):
-		if isinstance(state, dict):
-			self.values = [state['x'], state['y']]
-		else:
-			super(Size, self).__setstate__(state)
+	__slots__ = ()
 	@property
 	def width(self): return self.values[0]
-	@width.setter
-	def width(self, value): self.values[0] = value
 	@property
 	def height(self): return self.values[1]
-	@height.setter
-	def height(self, value): self.values[1] = value
 	@property
-	def x(self): return self.width
+	def x(self): return self.values[0]
 	@property
-	def y(self): return self.height
+	def y(self): return self.values[1]
 	def iter_points(self):
 		""" Iterates over all available positions withing rect of this size.
 		See Matrix.keys().
@@ -181,7 +238,7 @@ class Rect(object):
 	@property
 	def right(self): return self._topleft.x + self._size.width - 1
 	@property
-	def topleft(self): return Point(self.left, self.top)
+	def topleft(self): return self._topleft
 	@property
 	def bottomright(self): return Point(self.right, self.bottom)
 	def contains(self, pos, with_border=False):
@@ -1,6 +1,15 @@
-from ._base import Point, Size
+import array
+import heapq
+import itertools
+from ._base import Point, Size, distance
 from .grid import Matrix, get_neighbours
 
+_ADJACENT_SHIFTS = [
+		(shift_x, shift_y)
+		for shift_x, shift_y in itertools.product((-1, 0, 1), repeat=2)
+		if shift_x or shift_y
+		]
+
 class Wave(object):
 	""" Defines abstract wave algorithm on set of linkes nodes (like graph or matrix)
 	from start until it reaches the target node.
@@ -81,6 +90,345 @@ class MatrixWave(Wave):
 			 and (self.region is None or self.region.contains(p, with_border=True))
 			 ]
 
+class AStar(Wave):
+	""" Heuristic search (A*) with a binary heap.
+	Drop-in replacement for Wave: same get_links() hook, all links have cost 1.
+	Redefine heuristic() to guide search towards the target,
+	by default it is 0 and search degrades to plain breadth-first one.
+	Paths are rebuilt from remembered parent nodes, so is_linked()
+	and reorder_links() are not used.
+	"""
+	def heuristic(self, node, target):
+		""" Should return lower estimation of path length from node to target.
+		Overestimation breaks optimality of found paths.
+		"""
+		return 0
+	def get_successors(self, node, parents):
+		""" Yields pairs (next_node, cost) for A* search.
+		By default yields direct links with cost 1.
+		"""
+		for link in self.get_links(node):
+			yield link, 1
+	def build_path(self, parents, node):
+		""" Returns path from the start node to the given node
+		using dict of parent nodes.
+		"""
+		path = []
+		while node is not None:
+			path.append(node)
+			node = parents[node]
+		path.reverse()
+		return path
+	def run(self, start, target, depth=10000):
+		""" Parameter depth serves as safeguard: paths longer than depth are not considered.
+		If target is callable, it should receive a wave (set of Points) and return
+		a Point that could be considired as target (or None to continue exploring).
+		In that case heuristic cannot be used and search goes wave by wave.
+		"""
+		if callable(target):
+			return self._run_waves(start, target, depth)
+		parents = {start: None}
+		costs = {start: 0}
+		counter = itertools.count()
+		# Entries are (priority, -cost, counter, node):
+		# deeper nodes go first among equal priorities, counter keeps order stable.
+		queue = [(self.heuristic(start, target), 0, next(counter), start)]
+		while queue:
+			_, negative_cost, _, node = heapq.heappop(queue)
+			cost = -negative_cost
+			if node == target:
+				return self.build_path(parents, node)
+			if cost > costs[node]:
+				continue # Outdated entry, node was already reached by a shorter path.
+			for link, link_cost in self.get_successors(node, parents):
+				new_cost = cost + link_cost
+				if new_cost > depth:
+					continue
+				if link in costs and costs[link] <= new_cost:
+					continue
+				costs[link] = new_cost
+				parents[link] = node
+				priority = new_cost + self.heuristic(link, target)
+				heapq.heappush(queue, (priority, -new_cost, next(counter), link))
+		return None
+	def _run_waves(self, start, find_target, depth):
+		parents = {start: None}
+		wave = [start]
+		while depth > 0:
+			depth -= 1
+			new_wave = []
+			for node in wave:
+				for link in self.get_links(node):
+					if link not in parents:
+						parents[link] = node
+						new_wave.append(link)
+			if not new_wave:
+				return None
+			found_target = find_target(set(new_wave))
+			if found_target:
+				return self.build_path(parents, found_target)
+			wave = new_wave
+		return None
+
+class MatrixAStar(AStar, MatrixWave):
+	""" A* search for the shortest path in matrix of cells.
+	Drop-in replacement for MatrixWave (the same is_passable() hook),
+	uses Chebyshev distance (all 8 directions have the same cost) as heuristic.
+	"""
+	def heuristic(self, node, target):
+		return distance(node, target)
+
+class JumpPointSearch(MatrixAStar):
+	""" Jump Point Search: A* on uniform-cost 8-connected grid
+	that skips over intermediate cells of straight and diagonal runs.
+	Drop-in replacement for MatrixWave (the same is_passable() hook),
+	but result is optimal only if passability of a cell does not depend
+	on the direction of movement (no restrictions on diagonal moves etc).
+	Callable targets cannot be jumped to, in that case plain search is used.
+	NOTE: jumps check many more cells than A* expands nodes, so in pure Python
+	MatrixAStar is usually faster (see clckwrkbdgr.math.test.benchmark).
+	"""
+	def can_enter(self, point, orig_point):
+		""" Returns True if point is valid, within region and passable. """
+		if not self.matrix.valid(point):
+			return False
+		if self.region is not None and not self.region.contains(point, with_border=True):
+			return False
+		return self.is_passable(point, orig_point)
+	def _get_directions(self, node, parent):
+		""" Returns directions that are worth exploring from the node
+		(natural and forced neighbours) if it was reached from parent.
+		"""
+		if parent is None:
+			return _ADJACENT_SHIFTS
+		x, y = node
+		dx = (x > parent.x) - (x < parent.x)
+		dy = (y > parent.y) - (y < parent.y)
+		if dx and dy:
+			directions = [(dx, dy), (dx, 0), (0, dy)]
+			if not self.can_enter(Point(x - dx, y), node):
+				directions.append((-dx, dy))
+			if not self.can_enter(Point(x, y - dy), node):
+				directions.append((dx, -dy))
+		elif dx:
+			directions = [(dx, 0)]
+			if not self.can_enter(Point(x, y + 1), node):
+				directions.append((dx, 1))
+			if not self.can_enter(Point(x, y - 1), node):
+				directions.append((dx, -1))
+		else:
+			directions = [(0, dy)]
+			if not self.can_enter(Point(x + 1, y), node):
+				directions.append((1, dy))
+			if not self.can_enter(Point(x - 1, y), node):
+				directions.append((-1, dy))
+		return directions
+	def _has_forced_neighbours(self, node, dx, dy):
+		x, y = node
+		can_enter = self.can_enter
+		if dx and dy:
+			return (
+					(can_enter(Point(x - dx, y + dy), node) and not can_enter(Point(x - dx, y), node))
+					or (can_enter(Point(x + dx, y - dy), node) and not can_enter(Point(x, y - dy), node))
+					)
+		if dx:
+			return (
+					(can_enter(Point(x + dx, y + 1), node) and not can_enter(Point(x, y + 1), node))
+					or (can_enter(Point(x + dx, y - 1), node) and not can_enter(Point(x, y - 1), node))
+					)
+		return (
+				(can_enter(Point(x + 1, y + dy), node) and not can_enter(Point(x + 1, y), node))
+				or (can_enter(Point(x - 1, y + dy), node) and not can_enter(Point(x - 1, y), node))
+				)
+	def _jump(self, node, dx, dy):
+		""" Moves from node in given direction until reaches a jump point
+		(target, node with forced neighbours or a turn to one of those).
+		Returns None if hits an obstacle.
+		"""
+		while True:
+			next_node = Point(node.x + dx, node.y + dy)
+			if not self.can_enter(next_node, node):
+				return None
+			if next_node == self._target:
+				return next_node
+			if self._has_forced_neighbours(next_node, dx, dy):
+				return next_node
+			if dx and dy:
+				if self._jump(next_node, dx, 0) or self._jump(next_node, 0, dy):
+					return next_node
+			node = next_node
+	def get_successors(self, node, parents):
+		for dx, dy in self._get_directions(node, parents[node]):
+			jump_point = self._jump(node, dx, dy)
+			if jump_point is not None:
+				yield jump_point, distance(node, jump_point)
+	def build_path(self, parents, node):
+		""" Restores all intermediate cells between jump points. """
+		jump_points = super(JumpPointSearch, self).build_path(parents, node)
+		path = jump_points[:1]
+		for jump_point in jump_points[1:]:
+			x, y = path[-1]
+			dx = (jump_point.x > x) - (jump_point.x < x)
+			dy = (jump_point.y > y) - (jump_point.y < y)
+			while path[-1] != jump_point:
+				x, y = x + dx, y + dy
+				path.append(Point(x, y))
+		return path
+	def run(self, start, target, depth=10000):
+		self._target = None if callable(target) else target
+		return super(JumpPointSearch, self).run(start, target, depth=depth)
+
+class DistanceMap(object):
+	""" Distance map (a.k.a. flow field or Dijkstra map) on a matrix of cells:
+	number of steps from every reachable cell to the closest source.
+	Calculated once by multi-source breadth-first search,
+	after that any number of actors can walk towards sources using downhill().
+	Redefine is_passable() to specify passability of cells (see MatrixWave).
+	Movement is considered reversible (if it is possible to step from A to B,
+	then it is possible to step from B to A).
+	"""
+	def __init__(self, matrix, region=None, max_distance=None):
+		""" Creates empty map on given matrix (or any object with .valid(pos)).
+		Search can be limited to a region (by default uses full matrix)
+		and to the max_distance from sources (by default is unlimited).
+		Cells outside limits are considered unreachable.
+		Sources should be passable cells within the region.
+		"""
+		self.matrix = matrix
+		self.region = region
+		self.max_distance = max_distance
+		self.sources = []
+		self.distances = {}
+	def is_passable(self, point, orig_point): # pragma: no cover
+		""" Should return True if cell at point is passable
+		if movement is originated from orig_point.
+		"""
+		raise NotImplementedError()
+	def get_links(self, node):
+		return [p for p in get_neighbours(
+			self.matrix, node,
+			with_diagonal=True,
+			)
+			 if self.is_passable(p, node)
+			 and (self.region is None or self.region.contains(p, with_border=True))
+			 ]
+	def distance(self, point):
+		""" Returns number of steps to the closest source
+		or None if point is not reachable.
+		"""
+		return self.distances.get(point)
+	def downhill(self, point, preferred=None):
+		""" Returns adjacent cell which is one step closer to sources,
+		or None if point is a source itself or cannot be reached.
+		If preferred adjacent cell is specified and is one step closer,
+		it is returned, otherwise the first suitable neighbour is picked.
+		"""
+		steps = self.distances.get(point)
+		if not steps:
+			return None
+		if preferred is not None and distance(point, preferred) == 1:
+			if self.distances.get(preferred) == steps - 1 and self.is_passable(preferred, point):
+				return preferred
+		for neighbour in get_neighbours(self.matrix, point, with_diagonal=True):
+			if self.distances.get(neighbour) == steps - 1 and self.is_passable(neighbour, point):
+				return neighbour
+		return None # pragma: no cover -- should not be reached for consistent map.
+	def update(self, sources):
+		""" Fully recalculates map for the given sources. """
+		self.sources = list(sources)
+		self.distances = dict((source, 0) for source in self.sources)
+		self._spread(self.sources)
+	def move_sources(self, sources):
+		""" Updates map for the new set of sources (e.g. when the source moves).
+		Recalculates only cells whose distances are actually changed.
+		"""
+		sources = list(sources)
+		current_sources = set(sources)
+		previous_sources = set(self.sources)
+		self.sources = sources
+		distances = self.distances
+
+		# New sources go first, so cells that became closer
+		# keep their support after old sources are removed.
+		added = [source for source in sources if source not in previous_sources]
+		for source in added:
+			distances[source] = 0
+		self._spread(added)
+
+		# Cells that were reachable only via removed sources are invalidated.
+		# Processed in order of increasing distance, so by the moment cell is checked
+		# all its possible supports are already checked.
+		invalidated = [source for source in previous_sources if source not in current_sources]
+		invalid = set(invalidated)
+		index = 0
+		while index < len(invalidated):
+			node = invalidated[index]
+			index += 1
+			steps = distances[node]
+			for link in self._iter_adjacent(node):
+				if distances.get(link) != steps + 1:
+					continue
+				if link in invalid or link in current_sources:
+					continue
+				if any(
+						distances.get(support) == steps and support not in invalid
+						and self.is_passable(link, support)
+						for support in self._iter_adjacent(link)
+						):
+					continue
+				invalid.add(link)
+				invalidated.append(link)
+
+		# Invalidated cells are recalculated from the remaining valid ones.
+		for node in invalidated:
+			del distances[node]
+		seeds = []
+		for node in invalidated:
+			closest = None
+			for link in self._iter_adjacent(node):
+				steps = distances.get(link)
+				if steps is None or (closest is not None and steps >= closest):
+					continue
+				if self.is_passable(node, link):
+					closest = steps
+			if closest is None:
+				continue
+			if self.max_distance is not None and closest + 1 > self.max_distance:
+				continue
+			distances[node] = closest + 1
+			seeds.append(node)
+		self._spread(seeds)
+	def _iter_adjacent(self, node):
+		""" Yields all 8 adjacent positions, without any checks. """
+		x, y = node
+		for shift_x, shift_y in _ADJACENT_SHIFTS:
+			yield Point(x + shift_x, y + shift_y)
+	def _spread(self, seeds):
+		""" Propagates distances from seed cells (breadth-first, wave by wave)
+		to every cell that could be reached by a shorter path.
+		Seeds may have different distances, they join the waves in order.
+		"""
+		distances = self.distances
+		pending = {}
+		for node in seeds:
+			pending.setdefault(distances[node], []).append(node)
+		while pending:
+			steps = min(pending)
+			wave = pending.pop(steps)
+			while wave:
+				next_steps = steps + 1
+				next_wave = pending.pop(next_steps, [])
+				if self.max_distance is None or steps < self.max_distance:
+					for node in wave:
+						if distances[node] != steps:
+							continue # Outdated, node was already reached by a shorter path.
+						for link in self.get_links(node):
+							if link in distances and distances[link] <= next_steps:
+								continue
+							distances[link] = next_steps
+							next_wave.append(link)
+				steps, wave = next_steps, next_wave
+
 def floodfill(start, spread_function):
 	""" Fills area starting from 'start' and using spread_function(p) to iterate over next possible points to advance.
 	Does not check if start is already 'filled', it should be checked by caller or spread_function.
@@ -98,6 +446,124 @@ def floodfill(start, spread_function):
 		already_affected |= wave
 		last_wave = wave
 
+def _get_values(matrix):
+	""" Returns flat sequence of matrix values for fast index access.
+	Raw typed storage is converted to Python values (see Matrix.values()).
+	"""
+	if matrix.typecode:
+		return list(matrix.values())
+	return matrix.data
+
+def scanline_floodfill(matrix, start, check, with_diagonal=False):
+	""" Fills area of matrix cells starting from 'start'.
+	Cell is fillable if check(value) is True.
+	Fills horizontal runs at once and seeds only one point per run
+	on adjacent rows, so it is much faster than generic floodfill().
+	If with_diagonal is True, diagonal neighbours are connected too.
+	Yields filled points (each once, start is skipped if it is not fillable).
+	It is safe to modify values of already yielded cells.
+	Values are passed to check() the same way they are returned by Matrix.cell().
+	Raises KeyError if start is outside of the matrix.
+	"""
+	width, height = matrix.width, matrix.height
+	if not matrix.valid(start):
+		raise KeyError('Invalid cell position: {0}'.format(Point(start)))
+	data = _get_values(matrix)
+	visited = bytearray(width * height)
+	spread = 1 if with_diagonal else 0
+	seeds = [tuple(start)]
+	while seeds:
+		x, y = seeds.pop()
+		row = y * width
+		if visited[row + x] or not check(data[row + x]):
+			continue
+		left = x
+		while left > 0 and not visited[row + left - 1] and check(data[row + left - 1]):
+			left -= 1
+		right = x
+		while right < width - 1 and not visited[row + right + 1] and check(data[row + right + 1]):
+			right += 1
+		for column in range(left, right + 1):
+			visited[row + column] = 1
+		for column in range(left, right + 1):
+			yield Point(column, y)
+		for other_y in (y - 1, y + 1):
+			if not (0 <= other_y < height):
+				continue
+			other_row = other_y * width
+			in_run = False
+			for column in range(max(0, left - spread), min(width - 1, right + spread) + 1):
+				if not visited[other_row + column] and check(data[other_row + column]):
+					if not in_run:
+						seeds.append((column, other_y))
+						in_run = True
+				else:
+					in_run = False
+
+def label_components(matrix, check, with_diagonal=False):
+	""" Labels connected areas of cells for which check(value) is True.
+	If with_diagonal is True, diagonal neighbours are connected too.
+	Uses two passes over the matrix with union-find of provisional labels.
+	Returns pair (labels, sizes):
+	- labels is a Matrix of ints of the same size, where 0 marks unchecked cells
+	  and areas are numbered from 1 in order of their first cell (row by row);
+	- sizes is a list of area sizes indexed by label (sizes[0] is the number of unchecked cells).
+	Values are passed to check() the same way they are returned by Matrix.cell().
+	"""
+	width, height = matrix.width, matrix.height
+	data = _get_values(matrix)
+	labels = [0] * (width * height)
+	parents = [0]
+	def _find(label):
+		root = label
+		while parents[root] != root:
+			root = parents[root]
+		while parents[label] != root:
+			parents[label], label = root, parents[label]
+		return root
+	def _union(label, other):
+		label, other = _find(label), _find(other)
+		if label < other:
+			parents[other] = label
+		elif other < label:
+			parents[label] = other
+		return min(label, other)
+	for y in range(height):
+		row = y * width
+		for x in range(width):
+			if not check(data[row + x]):
+				continue
+			label = 0
+			neighbours = [labels[row + x - 1] if x > 0 else 0]
+			if y > 0:
+				neighbours.append(labels[row - width + x])
+				if with_diagonal:
+					if x > 0:
+						neighbours.append(labels[row - width + x - 1])
+					if x < width - 1:
+						neighbours.append(labels[row - width + x + 1])
+			for other in neighbours:
+				if not other:
+					continue
+				label = _union(label, other) if label else _find(other)
+			if not label:
+				label = len(parents)
+				parents.append(label)
+			labels[row + x] = label
+	final = [0] * len(parents)
+	sizes = [0]
+	for index, label in enumerate(labels):
+		if label:
+			root = _find(label)
+			if not final[root]:
+				final[root] = len(sizes)
+				sizes.append(0)
+			label = labels[index] = final[root]
+		sizes[label] += 1
+	result = Matrix((width, height), 0, typecode='i')
+	result.data[:] = array.array('i', labels)
+	return result, sizes
+
 def bresenham(start, stop):
 	""" Bresenham's algorithm.
 	Yields points between start and stop (including).
@@ -125,6 +591,72 @@ def bresenham(start, stop):
 			error = error + dx
 			y += sy
 
+class BresenhamCache(object):
+	""" Lazy cache of bresenham lines for repeated queries.
+	Lines depend only on relative offset (dx, dy) between start and stop,
+	so they are stored once per offset as packed arrays of relative coords
+	(x0, y0, x1, y1, ...) and shifted to actual start on each query.
+	Only lines with both |dx| and |dy| <= radius are cached,
+	longer lines are calculated from scratch each time.
+	Counts cache hits/misses (and uncached long lines) for diagnostics.
+	"""
+	def __init__(self, radius):
+		self.radius = radius
+		self.typecode = 'b' if radius < 128 else 'i'
+		self.lines = {}
+		self.hits = 0
+		self.misses = 0
+		self.uncached = 0
+	def __str__(self):
+		total = self.hits + self.misses
+		return '{0} lines, hits: {1}/{2} ({3:.1f}%), uncached: {4}'.format(
+				len(self.lines), self.hits, total,
+				100.0 * self.hits / total if total else 0.0,
+				self.uncached,
+				)
+	def clear(self):
+		""" Drops all cached lines and resets counters. """
+		self.lines.clear()
+		self.hits = self.misses = self.uncached = 0
+	def get_offsets(self, dx, dy):
+		""" Returns packed array of relative coords for line from (0, 0) to (dx, dy).
+		Returns None if line is too long to be cached.
+		"""
+		if abs(dx) > self.radius or abs(dy) > self.radius:
+			self.uncached += 1
+			return None
+		key = (dx, dy)
+		offsets = self.lines.get(key)
+		if offsets is not None:
+			self.hits += 1
+			return offsets
+		self.misses += 1
+		offsets = array.array(self.typecode)
+		for pos in bresenham(Point(0, 0), Point(dx, dy)):
+			offsets.extend(pos.values)
+		self.lines[key] = offsets
+		return offsets
+	def line(self, start, stop):
+		""" Same as bresenham(start, stop), but uses cached lines when possible. """
+		offsets = self.get_offsets(stop.x - start.x, stop.y - start.y)
+		if offsets is None:
+			for pos in bresenham(start, stop):
+				yield pos
+			return
+		start_x, start_y = start.x, start.y
+		for i in range(0, len(offsets), 2):
+			yield Point(start_x + offsets[i], start_y + offsets[i + 1])
+	def in_line_of_sight(self, start, target, is_transparent):
+		""" Same as FieldOfView.in_line_of_sight(), but uses cached lines when possible. """
+		offsets = self.get_offsets(target.x - start.x, target.y - start.y)
+		if offsets is None:
+			return FieldOfView.in_line_of_sight(start, target, is_transparent)
+		start_x, start_y = start.x, start.y
+		for i in range(0, len(offsets) - 2, 2):
+			if not is_transparent(Point(start_x + offsets[i], start_y + offsets[i + 1])):
+				return False
+		return True
+
 class FieldOfView:
 	""" Updatable field of view for grid maps.
 	"""
@@ -132,7 +664,7 @@ class FieldOfView:
 		""" Creates field of view with size of 2R + 1.
 		Does not perform initial update.
 		"""
-		self.sight = Matrix(Size(1 + radius * 2, 1 + radius * 2), 0)
+		self.sight = Matrix(Size(1 + radius * 2, 1 + radius * 2), False, typecode='?')
 		self.center = Point(0, 0)
 		self.half_size = Size(self.sight.size.width // 2, self.sight.size.height // 2)
 	def is_visible(self, x, y):
@@ -158,7 +690,7 @@ class FieldOfView:
 		After that, function is_visible() can be used to check for each cell.
 		"""
 		self.center = new_center
-		self.sight.clear(0)
+		self.sight.clear(False)
 		for pos in self.sight.size.iter_points():
 			rel_pos = Point(
 					self.half_size.width - pos.x,
@@ -177,3 +709,67 @@ class FieldOfView:
 					self.sight.set_cell(fov_pos, True)
 				if not is_transparent(real_world_pos):
 					break
+
+class ShadowcastingFieldOfView(FieldOfView):
+	""" Field of view based on symmetric recursive shadowcasting.
+	Drop-in replacement for FieldOfView: visits each cell within radius
+	only once per octant pair instead of tracing a ray to every cell.
+	Visibility is symmetric: if A sees B, then B sees A.
+	Opaque cells that bound visible area are visible too.
+	"""
+	# (row, col) -> (dx, dy) for each of four quadrants (north, east, south, west).
+	_QUADRANTS = (
+			((0, -1), (1, 0)),
+			((1, 0), (0, 1)),
+			((0, 1), (1, 0)),
+			((-1, 0), (0, 1)),
+			)
+	def update(self, new_center, is_transparent):
+		""" Updates FOV for given new center point.
+		Uses is_transparent(Point):bool to determine if cells is transparent for sight.
+		After that, function is_visible() can be used to check for each cell.
+		Yields newly visible cells (with non-negative coords).
+		"""
+		self.center = new_center
+		self.sight.clear(False)
+		center_x, center_y = new_center
+		half_width, half_height = self.half_size
+		radius = min(half_width, half_height)
+		max_distance = radius * radius
+		sight_data, sight_width = self.sight.data, self.sight.width
+
+		sight_data[half_width + half_height * sight_width] = True
+		if center_x >= 0 and center_y >= 0:
+			yield new_center
+		for (row_dx, row_dy), (col_dx, col_dy) in self._QUADRANTS:
+			# Slopes are stored as fractions (numerator, denominator > 0)
+			# to keep all calculations exact.
+			rows = [(1, -1, 1, 1, 1)]
+			while rows:
+				depth, start_num, start_den, end_num, end_den = rows.pop()
+				if depth > radius:
+					continue
+				min_col = (2 * depth * start_num + start_den) // (2 * start_den)
+				max_col = -((end_den - 2 * depth * end_num) // (2 * end_den))
+				prev_is_wall = None
+				for col in range(min_col, max_col + 1):
+					dx = row_dx * depth + col_dx * col
+					dy = row_dy * depth + col_dy * col
+					pos = Point(center_x + dx, center_y + dy)
+					is_wall = not is_transparent(pos)
+					if dx * dx + dy * dy <= max_distance and (is_wall or (
+							col * start_den >= depth * start_num
+							and col * end_den <= depth * end_num
+							)):
+						index = half_width + dx + (half_height + dy) * sight_width
+						if not sight_data[index]:
+							sight_data[index] = True
+							if pos.x >= 0 and pos.y >= 0:
+								yield pos
+					if prev_is_wall and not is_wall:
+						start_num, start_den = 2 * col - 1, 2 * depth
+					elif prev_is_wall is False and is_wall:
+						rows.append((depth + 1, start_num, start_den, 2 * col - 1, 2 * depth))
+					prev_is_wall = is_wall
+				if prev_is_wall is False:
+					rows.append((depth + 1, start_num, start_den, end_num, end_den))
@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 import re, math
+import functools
 try:
 	math.gcd
 except AttributeError: # pragma: no cover -- py2
 	import fractions
 	math.gcd = fractions.gcd
+try:
+	import numpy
+except ImportError: # pragma: no cover
+	numpy = None
 import clckwrkbdgr.math
 import clckwrkbdgr.utils
 
@@ -112,6 +117,108 @@ def haversine(phi1, lambda1, phi2, lambda2, radius):
 	d = radius * c
 	return d
 
+_CHUNK_SIZE = 1024 # Rows of pairwise distances that are calculated at once.
+
+def _haversine_numpy(phi1, lambda1, phi2, lambda2, radius):
+	phi1, lambda1, phi2, lambda2 = (numpy.radians(numpy.asarray(_, dtype=float)) for _ in (phi1, lambda1, phi2, lambda2))
+	a = numpy.sin((phi2 - phi1) / 2.) ** 2 + numpy.cos(phi1) * numpy.cos(phi2) * numpy.sin((lambda2 - lambda1) / 2.) ** 2
+	return radius * 2 * numpy.arctan2(numpy.sqrt(a), numpy.sqrt(1 - a))
+
+def haversine_many(phi1, lambda1, phi2, lambda2, radius, use_numpy=True):
+	""" Calculates distances between pairs of points on sphere of given radius
+	(see haversine()). Arguments are sequences of angles of the same length,
+	i-th distance is calculated between (phi1[i], lambda1[i]) and (phi2[i], lambda2[i]).
+	Returns list of distances.
+	If use_numpy is True and NumPy is available, calculations are vectorized.
+	"""
+	if use_numpy and numpy is not None:
+		return _haversine_numpy(phi1, lambda1, phi2, lambda2, radius).tolist()
+	return [
+			haversine(_phi1, _lambda1, _phi2, _lambda2, radius)
+			for _phi1, _lambda1, _phi2, _lambda2
+			in zip(phi1, lambda1, phi2, lambda2)
+			]
+
+def _get_angles(coord):
+	""" Returns (latitude, longitude) in degrees for GeoCoord or a pair of numbers. """
+	if isinstance(coord, GeoCoord):
+		return coord.latitude.get_value(), coord.longitude.get_value()
+	return coord
+
+def pairwise_distances(coords, radius=6371.0, use_numpy=True):
+	""" Calculates distances between every pair of given coords
+	(GeoCoord objects or pairs of (latitude, longitude) in degrees).
+	Returns square Matrix of float values (typecode='d'),
+	distance between i-th and j-th coords is stored at (i, j).
+	Rows are calculated by chunks, so only resulting matrix takes N*N memory.
+	If use_numpy is True and NumPy is available, calculations are vectorized.
+	Raises ValueError if there are no coords (Matrix cannot be empty).
+	"""
+	angles = [_get_angles(coord) for coord in coords]
+	count = len(angles)
+	if not count:
+		raise ValueError("Cannot calculate pairwise distances for empty list of coords.")
+	use_numpy = use_numpy and numpy is not None
+	result = clckwrkbdgr.math.Matrix((count, count), 0.0, typecode='d', use_numpy=use_numpy)
+	if use_numpy:
+		phi, lambda_ = numpy.array(angles, dtype=float).T
+		for start in range(0, count, _CHUNK_SIZE):
+			stop = min(start + _CHUNK_SIZE, count)
+			distances = _haversine_numpy(
+					phi[start:stop, None], lambda_[start:stop, None],
+					phi[None, :], lambda_[None, :],
+					radius,
+					)
+			result.data[start * count:stop * count] = distances.ravel()
+		return result
+	radians = [(math.radians(_phi), math.radians(_lambda)) for _phi, _lambda in angles]
+	cosines = [math.cos(_phi) for _phi, _ in radians]
+	for row, (phi1, lambda1) in enumerate(radians):
+		cos_phi1 = cosines[row]
+		offset = row * count
+		for column in range(row + 1, count):
+			phi2, lambda2 = radians[column]
+			a = math.sin((phi2 - phi1) / 2.) ** 2 + cos_phi1 * cosines[column] * math.sin((lambda2 - lambda1) / 2.) ** 2
+			d = radius * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+			result.data[offset + column] = d
+			result.data[column * count + row] = d
+	return result
+
+def k_nearest(target, coords, k=1, max_distance=None, radius=6371.0, use_numpy=True):
+	""" Finds k nearest coords to the target
+	(GeoCoord objects or pairs of (latitude, longitude) in degrees).
+	Returns list of pairs (index in coords, distance) sorted by distance.
+	If max_distance is specified, coords that are further are not returned.
+	They are also quickly discarded by latitude/longitude bounding box
+	before calculating actual distances.
+	If use_numpy is True and NumPy is available, calculations are vectorized.
+	"""
+	target_phi, target_lambda = _get_angles(target)
+	angles = [_get_angles(coord) for coord in coords]
+	candidates = range(len(angles))
+	if max_distance is not None:
+		delta_phi = math.degrees(float(max_distance) / radius)
+		min_phi, max_phi = target_phi - delta_phi, target_phi + delta_phi
+		delta_lambda = None
+		if -90 < min_phi and max_phi < 90: # Otherwise box contains pole and all longitudes.
+			delta_lambda = math.degrees(math.asin(min(1.0, math.sin(math.radians(delta_phi)) / math.cos(math.radians(target_phi)))))
+		candidates = [
+				index for index in candidates
+				if min_phi <= angles[index][0] <= max_phi
+				and (delta_lambda is None or abs((angles[index][1] - target_lambda + 180) % 360 - 180) <= delta_lambda)
+				]
+	candidates = list(candidates)
+	distances = haversine_many(
+			[target_phi] * len(candidates), [target_lambda] * len(candidates),
+			[angles[index][0] for index in candidates],
+			[angles[index][1] for index in candidates],
+			radius, use_numpy=use_numpy,
+			)
+	result = sorted(zip(candidates, distances), key=lambda pair: (pair[1], pair[0]))
+	if max_distance is not None:
+		result = [pair for pair in result if pair[1] <= max_distance]
+	return result[:k]
+
 class GeoCoord(object):
 	""" Geographic coordinates. """
 	def __init__(self, latitude, longitude):
@@ -215,6 +322,11 @@ class RectConnection(object):
 				return pos.y <= self.stop.y and pos.x == self.stop.x
 			else:
 				return min(self.start.x, self.stop.x) <= pos.x <= max(self.start.x, self.stop.x)
+	def get_bounding_rect(self):
+		""" Returns minimal Rect that contains all connection lines. """
+		left, right = sorted((self.start.x, self.stop.x))
+		top, bottom = sorted((self.start.y, self.stop.y))
+		return clckwrkbdgr.math.Rect((left, top), (right - left + 1, bottom - top + 1))
 	def iter_points(self):
 		""" Iterates over integer points on connection lines (beginning segment -> the bridge -> ending segment).
 		"""
@@ -242,3 +354,45 @@ class RectConnection(object):
 						for x in reversed(range(self.stop.x, self.start.x)):
 							yield clckwrkbdgr.math.Point(x, y)
 					lead = self.stop.x
+
+class SpatialIndex(object):
+	""" Static spatial index (uniform grid hash) for point -> shape queries.
+	Shapes are Rects (borders are included) or RectConnections,
+	or any other objects that provide contains(pos) and get_bounding_rect().
+
+	Plane is split into square buckets of cell_size,
+	each shape is registered in every bucket that its bounding rect overlaps,
+	so query checks only few shapes from a single bucket.
+	"""
+	def __init__(self, shapes=(), cell_size=8):
+		self.cell_size = cell_size
+		self._buckets = {}
+		self._count = 0
+		for shape in shapes:
+			self.add(shape)
+	def __len__(self):
+		return self._count
+	def add(self, shape, value=None):
+		""" Registers shape with associated value (shape itself by default).
+		If shapes overlap, the earliest added one wins.
+		"""
+		if isinstance(shape, clckwrkbdgr.math.Rect):
+			bounds = shape
+			contains = functools.partial(shape.contains, with_border=True)
+		else:
+			bounds = shape.get_bounding_rect()
+			contains = shape.contains
+		entry = (contains, shape if value is None else value)
+		cell_size = self.cell_size
+		for column in range(bounds.left // cell_size, bounds.right // cell_size + 1):
+			for row in range(bounds.top // cell_size, bounds.bottom // cell_size + 1):
+				self._buckets.setdefault((column, row), []).append(entry)
+		self._count += 1
+	def get(self, pos, default=None):
+		""" Returns value of the shape that contains pos, or default. """
+		bucket = self._buckets.get((pos[0] // self.cell_size, pos[1] // self.cell_size))
+		if bucket:
+			for contains, value in bucket:
+				if contains(pos):
+					return value
+		return default
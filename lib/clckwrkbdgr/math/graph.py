@@ -1,14 +1,23 @@
 import copy
+from ._base import Point
+from .grid import get_neighbours
 
 class Graph(object):
+	""" Graph of hashable nodes.
+	Keeps both outgoing and incoming adjacency indexes,
+	so all operations on a single node or link are O(1)
+	(or O(degree) for removing a node).
+	"""
 	def __init__(self, directional=False):
 		self._nodes = set()
 		self._connections = dict()
+		self._incoming = dict()
 		self._directional = directional
 	def __copy__(self):
 		new_object = Graph(directional=self._directional)
 		new_object._nodes = copy.copy(self._nodes)
 		new_object._connections = {key:copy.copy(value) for key, value in self._connections.items()}
+		new_object._incoming = {key:copy.copy(value) for key, value in self._incoming.items()}
 		return new_object
 	def to_dot(self):
 		lines = ["graph {"]
@@ -21,13 +30,20 @@ class Graph(object):
 	def all_nodes(self):
 		return self._nodes
 	def all_links(self):
-		yielded = []
-		for node_from in self._connections:
-			for node_to in self._connections[node_from]:
-				if not self._directional and (node_to, node_from) in yielded:
-					continue
-				yielded.append( (node_from, node_to) )
-				yield (node_from, node_to)
+		""" Yields pairs (node_from, node_to).
+		For non-directional graph each link is yielded only once.
+		"""
+		if self._directional:
+			for node_from, links in self._connections.items():
+				for node_to in links:
+					yield (node_from, node_to)
+			return
+		processed = set()
+		for node_from, links in self._connections.items():
+			for node_to in links:
+				if node_to not in processed:
+					yield (node_from, node_to)
+			processed.add(node_from)
 	def add_nodes(self, nodes):
 		nodes = set(nodes)
 		exist = nodes & self._nodes
@@ -43,84 +59,118 @@ class Graph(object):
 	def remove_node(self, node):
 		if node not in self._nodes:
 			raise ValueError("Node {0} does not exist.".format(node))
-		for link in self._connections:
-			if node in self._connections[link]:
-				self._connections[link].remove(node)
-		if node in self._connections:
-			del self._connections[node]
+		incoming = self._incoming if self._directional else self._connections
+		for other in incoming.pop(node, ()):
+			if other != node:
+				self._connections[other].discard(node)
+		if self._directional:
+			for other in self._connections.get(node, ()):
+				if other != node:
+					self._incoming[other].discard(node)
+			self._connections.pop(node, None)
 		self._nodes.remove(node)
 	def connect(self, node, other):
 		if node not in self._nodes:
 			raise ValueError("Node {0} does not present in graph.".format(node))
 		if other not in self._nodes:
 			raise ValueError("Node {0} does not present in graph.".format(other))
-		if node not in self._connections:
-			self._connections[node] = set()
-		if other in self._connections[node]:
+		links = self._connections.setdefault(node, set())
+		if other in links:
 			raise ValueError("Connection {0}->{1} already exists.".format(node, other))
-		self._connections[node].add(other)
-		if not self._directional:
-			if other not in self._connections:
-				self._connections[other] = set()
-			self._connections[other].add(node)
-	def has_connection(self, node, other):
+		links.add(other)
 		if self._directional:
-			if node not in self._connections:
-				return False
-			if other not in self._connections[node]:
-				return False
-			return True
+			self._incoming.setdefault(other, set()).add(node)
 		else:
-			return (node in self._connections and other in self._connections[node]) or (other in self._connections and node in self._connections[other])
+			self._connections.setdefault(other, set()).add(node)
+	def has_connection(self, node, other):
+		return other in self._connections.get(node, ())
 	def all_connections(self, node, with_incoming=False):
-		result = set()
-		if node in self._connections:
-			result |= self._connections[node]
+		result = set(self._connections.get(node, ()))
 		if self._directional and with_incoming:
-			result |= set(other for other in self._connections if node in self._connections[other])
+			result |= self._incoming.get(node, set())
 		return result
 	def disconnect(self, node, other):
 		if node not in self._nodes:
 			raise ValueError("Node {0} does not present in graph.".format(node))
 		if other not in self._nodes:
 			raise ValueError("Node {0} does not present in graph.".format(other))
-		if self._directional:
-			if node not in self._connections:
+		links = self._connections.get(node, set())
+		if other not in links:
+			if self._directional:
 				raise ValueError("Nodes are not connected {0}->{1}".format(node, other))
-			if other not in self._connections[node]:
-				raise ValueError("Nodes are not connected {0}->{1}".format(node, other))
-			self._connections[node].remove(other)
+			raise ValueError("Nodes are not connected {0}<->{1}".format(node, other))
+		links.remove(other)
+		if self._directional:
+			self._incoming[other].remove(node)
 		else:
-			found = False
-			if node in self._connections and other in self._connections[node]:
-				found = True
-				self._connections[node].remove(other)
-			if other in self._connections and node in self._connections[other]:
-				found = True
-				self._connections[other].remove(node)
-			if not found:
-				raise ValueError("Nodes are not connected {0}<->{1}".format(node, other))
+			self._connections[other].discard(node)
 
-def get_clusters(graph):
-	clusters = []
+class DisjointSet(object):
+	""" Union-find structure (with path compression and union by size)
+	to track partitioning of items into disjoint groups.
+	"""
+	def __init__(self, items=()):
+		self._parents = {}
+		self._sizes = {}
+		self.groups_count = 0
+		for item in items:
+			self.add(item)
+	def add(self, item):
+		""" Adds item as a separate group (does nothing if item is already known). """
+		if item in self._parents:
+			return
+		self._parents[item] = item
+		self._sizes[item] = 1
+		self.groups_count += 1
+	def find(self, item):
+		""" Returns representative item of the group. """
+		# Parents are always the stored item objects,
+		# so identity checks are enough (and much cheaper than __eq__).
+		parents = self._parents
+		root = parents[item]
+		while parents[root] is not root:
+			root = parents[root]
+		while parents[item] is not root:
+			parents[item], item = root, parents[item]
+		return root
+	def union(self, item, other):
+		""" Merges groups of both items (adds items if needed).
+		Returns True if groups were different.
+		"""
+		self.add(item)
+		self.add(other)
+		root, other_root = self.find(item), self.find(other)
+		if root is other_root:
+			return False
+		if self._sizes[root] < self._sizes[other_root]:
+			root, other_root = other_root, root
+		self._parents[other_root] = root
+		self._sizes[root] += self._sizes.pop(other_root)
+		self.groups_count -= 1
+		return True
+	def groups(self):
+		""" Returns list of groups (sets of items). """
+		groups = {}
+		for item in self._parents:
+			groups.setdefault(self.find(item), set()).add(item)
+		return list(groups.values())
+
+def _link_nodes(graph):
+	""" Returns DisjointSet of all graph nodes merged by graph links. """
+	clusters = DisjointSet(graph.all_nodes())
 	for a, b in graph.all_links():
-		new_clusters = [{a, b}]
-		for cluster in clusters:
-			for other in new_clusters:
-				if cluster & other:
-					other.update(cluster)
-					break
-			else:
-				new_clusters.append(cluster)
-		clusters = new_clusters
-	for node in graph.all_nodes():
-		if any(node in cluster for cluster in clusters):
-			continue
-		clusters.append({node})
+		clusters.union(a, b)
 	return clusters
 
+def get_clusters(graph):
+	""" Returns list of connected components (sets of nodes).
+	Direction of links is not taken into account.
+	Works with any object that provides all_nodes() and all_links().
+	"""
+	return _link_nodes(graph).groups()
+
 def is_connected(graph):
-	return len(get_clusters(graph)) == 1
+	return _link_nodes(graph).groups_count == 1
 
 def grid_from_matrix(matrix, with_diagonal=False):
 	""" Creates non-directional graph from matrix where neighbouring cells are linked.
@@ -132,16 +182,85 @@ def grid_from_matrix(matrix, with_diagonal=False):
 
 	If with_diagonal is True, diagonal neighbours are linked too.
 	Nodes of created graph are indexes of cells (Points).
+	See also GridGraph for implicit graph that does not store links.
 	"""
-	from clckwrkbdgr.math import Point
 	result = Graph()
-	result.add_nodes(matrix.keys())
-	for column in range(matrix.width):
-		for row in range(matrix.height):
-			if column < matrix.width - 1:
-				result.connect(Point(column, row), Point(column + 1, row))
-			if row < matrix.height - 1:
-				result.connect(Point(column, row), Point(column, row + 1))
-			if with_diagonal and column < matrix.width - 1 and row < matrix.height - 1:
-				result.connect(Point(column, row), Point(column + 1, row + 1))
+	width, height = matrix.width, matrix.height
+	points = [[Point(column, row) for row in range(height)] for column in range(width)]
+	result.add_nodes(point for column in points for point in column)
+	connections = result._connections
+	def _link(node, other):
+		connections[node].add(other)
+		connections[other].add(node)
+	for column in points:
+		for node in column:
+			connections[node] = set()
+	for column in range(width):
+		for row in range(height):
+			node = points[column][row]
+			if column < width - 1:
+				_link(node, points[column + 1][row])
+			if row < height - 1:
+				_link(node, points[column][row + 1])
+			if with_diagonal and column < width - 1 and row < height - 1:
+				_link(node, points[column + 1][row + 1])
 	return result
+
+class GridGraph(object):
+	""" Implicit non-directional graph view over a matrix:
+	nodes are indexes of cells (Points), neighbouring cells are linked.
+	Links are calculated on demand from coordinates, so nothing is stored.
+	Provides the same query API as Graph (read-only).
+
+	If with_diagonal is True, both diagonal neighbours are linked too.
+	Optional is_passable(value) excludes cells (and their links) from graph.
+	"""
+	_FORWARD_SHIFTS = ((1, 0), (0, 1))
+	_FORWARD_SHIFTS_WITH_DIAGONAL = _FORWARD_SHIFTS + ((1, 1), (-1, 1))
+	def __init__(self, matrix, with_diagonal=False, is_passable=None):
+		self.matrix = matrix
+		self.with_diagonal = with_diagonal
+		self.is_passable = is_passable
+	def all_nodes(self):
+		""" Yields all (passable) nodes. """
+		if self.is_passable is None:
+			for node in self.matrix.keys():
+				yield node
+			return
+		for node in self.matrix.keys():
+			if self.is_passable(self.matrix.cell(node)):
+				yield node
+	def has_node(self, node):
+		if not self.matrix.valid(node):
+			return False
+		return self.is_passable is None or self.is_passable(self.matrix.cell(node))
+	def all_links(self):
+		""" Yields pairs (node_from, node_to), each link only once. """
+		shifts = self._FORWARD_SHIFTS_WITH_DIAGONAL if self.with_diagonal else self._FORWARD_SHIFTS
+		width, height = self.matrix.width, self.matrix.height
+		has_node = self.has_node if self.is_passable else None
+		for node in self.all_nodes():
+			x, y = node
+			for shift_x, shift_y in shifts:
+				other_x, other_y = x + shift_x, y + shift_y
+				if not (0 <= other_x < width and other_y < height):
+					continue
+				other = Point(other_x, other_y)
+				if has_node and not has_node(other):
+					continue
+				yield (node, other)
+	def has_connection(self, node, other):
+		if not self.has_node(node) or not self.has_node(other):
+			return False
+		(x, y), (other_x, other_y) = node, other
+		dx, dy = abs(x - other_x), abs(y - other_y)
+		if self.with_diagonal:
+			return max(dx, dy) == 1
+		return dx + dy == 1
+	def all_connections(self, node, with_incoming=False):
+		""" Returns set of linked nodes.
+		Graph is non-directional, so incoming links are the same.
+		"""
+		if not self.has_node(node):
+			return set()
+		return set(get_neighbours(self.matrix, node, check=self.is_passable, with_diagonal=self.with_diagonal))
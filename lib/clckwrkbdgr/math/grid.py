@@ -1,30 +1,77 @@
-from ._base import Point, Size
+from ._base import Point, Size, Rect
+import os
 import copy
 import itertools
+import array
+import collections
 import vintage
+try:
+	import numpy
+except ImportError: # pragma: no cover
+	numpy = None
+try:
+	import concurrent.futures
+except ImportError: # pragma: no cover
+	concurrent = None
 
 class CallableIntProperty(int): # pragma: no cover
 	@vintage.deprecated('Calling property as method is deprecated.')
 	def __call__(self): return self
 
 class CallableSizeProperty(Size): # pragma: no cover
+	__slots__ = ()
 	@vintage.deprecated('Calling property as method is deprecated.')
 	def __call__(self): return self
 
+def _make_buffer(typecode, length, value, use_numpy=False):
+	""" Creates typed buffer of given length filled with value.
+	Typecode is one of the `array` module typecodes or '?' for bools.
+	If use_numpy is True and NumPy is available, creates numpy.ndarray instead.
+	"""
+	if use_numpy and numpy is not None:
+		return numpy.full(length, value or 0, dtype=typecode)
+	if typecode == '?':
+		return bytearray([bool(value)]) * length
+	return array.array(typecode, [value or 0]) * length
+
+def _make_buffer_from(typecode, values, use_numpy=False):
+	""" Creates typed buffer (see _make_buffer()) from iterable of values. """
+	if use_numpy and numpy is not None:
+		return numpy.array(list(values), dtype=typecode)
+	if typecode == '?':
+		return bytearray(bool(value) for value in values)
+	return array.array(typecode, values)
+
 class Matrix(object):
 	""" Represents 2D matrix.
+	By default cells are stored as a list of arbitrary Python objects.
+	For integer, bool and small-enum cells compact typed storage can be requested
+	via typecode (see module `array`), e.g. Matrix(size, False, typecode='?')
+	takes one byte per cell.
 	"""
-	def __init__(self, dims, default=None):
+	typecode = None
+	use_numpy = False
+	def __init__(self, dims, default=None, typecode=None, use_numpy=False):
 		""" Creates Matrix with specified dimensions (iterable len=2) and fills with specified default value:
 		a = Matrix( (3, 3), default='.')
 		b = Matrix( Size(3, 3), default='.')
 		c = Matrix(b) # Creates deepcopy of another matrix.
+		d = Matrix( (3, 3), default=0, typecode='B') # Typed storage.
+
+		Typecode should be one of the `array` module typecodes (for ints and floats)
+		or '?' for bools (stored as bytes, but returned as bool values).
+		If use_numpy is True and NumPy is available, typed cells are stored in numpy.ndarray,
+		otherwise in array.array/bytearray.
 		"""
 		if isinstance(dims, Matrix):
 			other = dims
 			self.dims = copy.copy(other.dims)
+			self.typecode = other.typecode
+			self.use_numpy = other.use_numpy
 			self.data = copy.deepcopy(other.data)
 			return
+		self.typecode = typecode
+		self.use_numpy = use_numpy
 		self.resize(dims, default=default)
 	def resize(self, dims, default=None):
 		""" Resizes matrix to a new size.
@@ -37,17 +84,54 @@ class Matrix(object):
 		assert height > 0
 		self.dims = Size(width, height)
 		# TODO maybe clearing is not the best idea, maybe I should keep old values wherever is possible.
-		self.data = [copy.deepcopy(default) for _ in range(width * height)]
+		if self.typecode:
+			self.data = _make_buffer(self.typecode, width * height, default, use_numpy=self.use_numpy)
+		else:
+			self.data = [copy.deepcopy(default) for _ in range(width * height)]
 	def fill(self, topleft, downright, value):
-		""" Fills rectangle (including borders) with specified value. """
+		""" Fills rectangle (including borders) with specified value.
+		Rows are assigned by slices, so the whole rect is filled at once.
+		Raises KeyError if rect does not fit within matrix.
+		"""
 		topleft = Point(topleft)
 		downright = Point(downright)
-		for x in range(topleft.x, downright.x + 1):
-			for y in range(topleft.y, downright.y + 1):
-				self.set_cell(Point(x, y), value)
-	def clear(self, value): # pragma: no cover
+		if topleft.x > downright.x or topleft.y > downright.y:
+			return
+		for pos in (topleft, downright):
+			if not self.valid(pos):
+				raise KeyError('Invalid cell position: {0}'.format(pos))
+		row_width = downright.x + 1 - topleft.x
+		if self.typecode:
+			row = _make_buffer(self.typecode, row_width, value, use_numpy=self.use_numpy)
+		else:
+			row = [value] * row_width
+		for y in range(topleft.y, downright.y + 1):
+			start = topleft.x + y * self.dims.width
+			self.data[start:start + row_width] = row
+	def clear(self, value):
 		""" Fills the whole map with specified value. """
-		return self.fill(Point(0, 0), Point(self.width - 1, self.height - 1), value)
+		if self.typecode:
+			self.data[:] = _make_buffer(self.typecode, len(self.data), value, use_numpy=self.use_numpy)
+		else:
+			self.data[:] = [value] * len(self.data)
+	def fill_where(self, mask, value):
+		""" Sets value to every cell that is selected by mask.
+		Mask is either a matrix of the same size (cells with true values are selected)
+		or a callable that takes cell value and returns True if cell should be replaced.
+		Raises ValueError if mask matrix has different size.
+		"""
+		if callable(mask):
+			flags = [mask(c) for c in self.values()]
+		elif mask.dims != self.dims:
+			raise ValueError('Mask size {0} does not match matrix size {1}'.format(mask.dims, self.dims))
+		else:
+			flags = mask.values()
+		if numpy is not None and isinstance(self.data, numpy.ndarray):
+			self.data[numpy.array(list(flags), dtype=bool)] = value
+			return
+		for index, flag in enumerate(flags):
+			if flag:
+				self.data[index] = value
 	@property
 	def size(self):
 		""" Returns iterable of size (two-component). """
@@ -65,54 +149,153 @@ class Matrix(object):
 			raise TypeError("Cannot compare matrix with {0}".format(type(other)))
 		if self.dims != other.dims:
 			return False
+		if self.typecode or other.typecode:
+			return list(self.values()) == list(other.values())
 		return self.data == other.data
 	def __ne__(self, other):
 		return not (self == other)
 	def valid(self, pos):
 		""" Returns True if pos is within Matrix boundaries. """
-		pos = Point(pos)
-		return 0 <= pos.x < self.dims.width and 0 <= pos.y < self.dims.height
+		x, y = pos
+		width, height = self.dims.values
+		return 0 <= x < width and 0 <= y < height
 	def cell(self, pos):
 		""" Returns value of specified cell.
 		Raises KeyError is position is invalid.
 		"""
-		pos = Point(pos)
-		if not self.valid(pos):
-			raise KeyError('Invalid cell position: {0}'.format(pos))
-		return self.data[pos.x + pos.y * self.dims.width]
+		x, y = pos
+		width, height = self.dims.values
+		if not (0 <= x < width and 0 <= y < height):
+			raise KeyError('Invalid cell position: {0}'.format(Point(pos)))
+		if self.typecode:
+			return self._unbox(self.data[x + y * width])
+		return self.data[x + y * width]
 	def set_cell(self, pos, value):
 		""" Sets value of specified cell.
 		Raises KeyError is position is invalid.
 		"""
-		pos = Point(pos)
-		if not self.valid(pos):
-			raise KeyError('Invalid cell position: {0}'.format(pos))
-		self.data[pos.x + pos.y * self.dims.width] = value
+		x, y = pos
+		width, height = self.dims.values
+		if not (0 <= x < width and 0 <= y < height):
+			raise KeyError('Invalid cell position: {0}'.format(Point(pos)))
+		self.data[x + y * width] = value
 	def keys(self):
 		""" Iterates over all available positions. """
 		return self.dims.iter_points()
 	def values(self):
 		""" Iterates over all available values. """
+		if self.typecode:
+			if numpy is not None and isinstance(self.data, numpy.ndarray):
+				return iter(self.data.tolist())
+			if self.typecode == '?':
+				return (bool(c) for c in self.data)
 		return iter(self.data)
+	def rows(self):
+		""" Iterates over rows (from top to bottom).
+		Each row is a list of cell values (a copy, not a live object).
+		"""
+		width = self.dims.width
+		for start in range(0, len(self.data), width):
+			yield self._slice(start, start + width)
+	def view(self, rect):
+		""" Returns live rectangular window (MatrixView) over the given rect.
+		View shares storage with this matrix, nothing is copied.
+		Rect should fit within matrix, otherwise KeyError is raised.
+		"""
+		return MatrixView(self, rect)
+	def _slice(self, start, stop):
+		""" Returns list of Python values from the range of raw storage. """
+		chunk = self.data[start:stop]
+		if not self.typecode:
+			return chunk
+		if numpy is not None and isinstance(chunk, numpy.ndarray):
+			return chunk.tolist()
+		if self.typecode == '?':
+			return [bool(c) for c in chunk]
+		return list(chunk)
+	def _unbox(self, value):
+		""" Converts raw value from typed storage to a Python value. """
+		if numpy is not None and isinstance(value, numpy.generic):
+			return value.item()
+		if self.typecode == '?':
+			return bool(value)
+		return value
 	def __iter__(self):
 		""" Iterates over all available positions, see keys(). """
 		return self.keys()
+	def _index_to_pos(self, index):
+		return Point(index % self.dims.width, index // self.dims.width)
 	def find(self, value):
 		""" Yields positions where value is found. """
-		for pos in self.keys():
-			if self.cell(pos) == value:
-				yield pos
+		if numpy is not None and isinstance(self.data, numpy.ndarray):
+			for index in numpy.flatnonzero(self.data == value).tolist():
+				yield self._index_to_pos(index)
+			return
+		if not self.typecode:
+			index = -1
+			while True:
+				try:
+					index = self.data.index(value, index + 1)
+				except ValueError:
+					return
+				yield self._index_to_pos(index)
+		for index, c in enumerate(self.values()):
+			if c == value:
+				yield self._index_to_pos(index)
 	def find_if(self, condition):
 		""" Yields positions where values match given condition. """
-		for pos in self.keys():
-			if condition(self.cell(pos)):
-				yield pos
-	def transform(self, transformer):
+		for index, c in enumerate(self.values()):
+			if condition(c):
+				yield self._index_to_pos(index)
+	def count(self, value):
+		""" Returns number of cells that are equal to the value. """
+		if numpy is not None and isinstance(self.data, numpy.ndarray):
+			return int(numpy.count_nonzero(self.data == value))
+		if not self.typecode:
+			return self.data.count(value)
+		return sum(1 for c in self.values() if c == value)
+	def count_if(self, condition):
+		""" Returns number of cells that match given condition. """
+		return sum(1 for c in self.values() if condition(c))
+	def any_if(self, condition):
+		""" Returns True if at least one cell matches given condition. """
+		return any(condition(c) for c in self.values())
+	def all_if(self, condition):
+		""" Returns True if all cells match given condition. """
+		return all(condition(c) for c in self.values())
+	def transform(self, transformer, typecode=None):
 		""" Returns new instance of matrix with same dimensions
 		and transformer(c) applied for each cell.
+		If typecode is specified, new matrix uses typed storage (see __init__).
+		"""
+		new_matrix = Matrix(self.dims, typecode=typecode, use_numpy=self.use_numpy)
+		if self.typecode:
+			values = (transformer(c) for c in self.values())
+		else:
+			values = (transformer(copy.deepcopy(c)) for c in self.data)
+		if typecode:
+			new_matrix.data = _make_buffer_from(typecode, values, use_numpy=self.use_numpy)
+		else:
+			new_matrix.data = list(values)
+		return new_matrix
+	def transform_rows(self, transformer, typecode=None):
+		""" Returns new instance of matrix with same dimensions
+		and transformer(row) applied for each row (list of cell values, see rows()).
+		Transformer should return iterable of the same width,
+		otherwise ValueError is raised.
+		If typecode is specified, new matrix uses typed storage (see __init__).
 		"""
-		new_matrix = Matrix(self.dims)
-		new_matrix.data = [transformer(copy.deepcopy(c)) for c in self.data]
+		values = []
+		for row in self.rows():
+			row = list(transformer(row))
+			if len(row) != self.dims.width:
+				raise ValueError('Transformed row width {0} does not match matrix width {1}'.format(len(row), self.dims.width))
+			values.extend(row)
+		new_matrix = Matrix(self.dims, typecode=typecode, use_numpy=self.use_numpy)
+		if typecode:
+			new_matrix.data = _make_buffer_from(typecode, values, use_numpy=self.use_numpy)
+		else:
+			new_matrix.data = values
 		return new_matrix
 	@classmethod
 	def from_iterable(cls, iterable):
@@ -155,9 +338,94 @@ class Matrix(object):
 		result = ''
 		if not transformer:
 			transformer = str
-		for start in range(0, len(self.data), self.dims[0]):
-			for c in self.data[start:start+self.dims[0]]:
-				result += transformer(c)
+		for row in self.rows():
+			result += ''.join(transformer(c) for c in row)
+			result += '\n'
+		return result
+
+class MatrixView(object):
+	""" Live rectangular window over a Matrix (see Matrix.view()).
+	Shares storage with the parent matrix: changes are visible both ways.
+	All positions are relative to the topleft corner of the view.
+	"""
+	def __init__(self, matrix, rect):
+		""" Creates view over given rect of the matrix.
+		Rect should fit within matrix, otherwise KeyError is raised.
+		"""
+		rect = Rect(rect.topleft, rect.size)
+		if not matrix.valid(rect.topleft) or not matrix.valid(rect.bottomright):
+			raise KeyError('Invalid view rect: {0}'.format(rect))
+		self.matrix = matrix
+		self.rect = rect
+	def __repr__(self): # pragma: no cover
+		return 'MatrixView({0}, {1})'.format(repr(self.matrix), self.rect)
+	@property
+	def size(self):
+		return self.rect.size
+	@property
+	def width(self):
+		return self.rect.width
+	@property
+	def height(self):
+		return self.rect.height
+	@property
+	def topleft(self):
+		""" Position of the view in the parent matrix. """
+		return self.rect.topleft
+	def valid(self, pos):
+		""" Returns True if pos is within view boundaries. """
+		pos = Point(pos)
+		return 0 <= pos.x < self.rect.width and 0 <= pos.y < self.rect.height
+	def cell(self, pos):
+		""" Returns value of specified cell.
+		Raises KeyError is position is invalid.
+		"""
+		pos = Point(pos)
+		if not self.valid(pos):
+			raise KeyError('Invalid cell position: {0}'.format(pos))
+		return self.matrix.cell((self.rect.left + pos.x, self.rect.top + pos.y))
+	def set_cell(self, pos, value):
+		""" Sets value of specified cell.
+		Raises KeyError is position is invalid.
+		"""
+		pos = Point(pos)
+		if not self.valid(pos):
+			raise KeyError('Invalid cell position: {0}'.format(pos))
+		self.matrix.set_cell((self.rect.left + pos.x, self.rect.top + pos.y), value)
+	def keys(self):
+		""" Iterates over all available positions (relative to the view). """
+		return self.rect.size.iter_points()
+	def __iter__(self):
+		""" Iterates over all available positions, see keys(). """
+		return self.keys()
+	def rows(self):
+		""" Iterates over rows of the view (from top to bottom).
+		Each row is a list of cell values (a copy, not a live object).
+		"""
+		parent_width = self.matrix.dims.width
+		for y in range(self.rect.top, self.rect.top + self.rect.height):
+			start = self.rect.left + y * parent_width
+			yield self.matrix._slice(start, start + self.rect.width)
+	def values(self):
+		""" Iterates over all available values. """
+		return itertools.chain.from_iterable(self.rows())
+	def view(self, rect):
+		""" Returns nested view over the given rect (relative to this view).
+		Nested view addresses the original matrix directly.
+		"""
+		rect = Rect(rect.topleft, rect.size)
+		if not self.valid(rect.topleft) or not self.valid(rect.bottomright):
+			raise KeyError('Invalid view rect: {0}'.format(rect))
+		return MatrixView(self.matrix, Rect(self.rect.topleft + rect.topleft, rect.size))
+	def tostring(self, transformer=None):
+		""" Returns multiline string representation of the view.
+		See Matrix.tostring() for details.
+		"""
+		result = ''
+		if not transformer:
+			transformer = str
+		for row in self.rows():
+			result += ''.join(transformer(c) for c in row)
 			result += '\n'
 		return result
 
@@ -230,6 +498,19 @@ class HexGrid(object):
 		result += ' \n'
 		return result
 
+_NEIGHBOUR_SHIFTS = (
+		(1, 0),
+		(0, 1),
+		(-1, 0),
+		(0, -1),
+		)
+_NEIGHBOUR_SHIFTS_WITH_DIAGONAL = _NEIGHBOUR_SHIFTS + (
+		(1, 1),
+		(-1, 1),
+		(1, -1),
+		(-1, -1),
+		)
+
 def get_neighbours(matrix, pos, check=None, with_diagonal=False):
 	""" Yields points adjacent to given pos (valid points only).
 	By default checks only orthogonal cells.
@@ -237,27 +518,76 @@ def get_neighbours(matrix, pos, check=None, with_diagonal=False):
 	If check is not none, it is applied to value at each pos
 	and yields only if callable returns True.
 	"""
-	pos = Point(pos)
-	neighbours = [
-			pos + Point(1, 0),
-			pos + Point(0, 1),
-			pos - Point(1, 0),
-			pos - Point(0, 1),
-			]
-	if with_diagonal:
-		neighbours += [
-				pos + Point( 1,  1),
-				pos + Point(-1,  1),
-				pos + Point( 1, -1),
-				pos + Point(-1, -1),
-				]
-	for p in neighbours:
+	x, y = pos
+	shifts = _NEIGHBOUR_SHIFTS_WITH_DIAGONAL if with_diagonal else _NEIGHBOUR_SHIFTS
+	for shift_x, shift_y in shifts:
+		p = Point(x + shift_x, y + shift_y)
 		if not matrix.valid(p):
 			continue
 		if check and not check(matrix.cell(p)):
 			continue
 		yield p
 
+class BlockCache(object):
+	""" LRU cache of EndlessMatrix blocks that are out of the 3x3 window.
+	Blocks are keyed by global block coords (in block units).
+	Keeps up to max_blocks in memory. Least recently used blocks above that limit
+	are dropped or, if spill_dir is specified, saved to disk (via serialize.stream)
+	and loaded back when requested again.
+	Cell type for spilled blocks is used for deserialization (see StreamReader.read()).
+	Meta info (dict of name->value) is registered in reader before restoring
+	blocks, if cell type loader needs any (see StreamReader.set_meta_info()).
+	"""
+	SPILL_VERSION = 1
+	def __init__(self, max_blocks=64, spill_dir=None, cell_type=None, meta_info=None):
+		self.max_blocks = max_blocks
+		self.spill_dir = spill_dir
+		self.cell_type = cell_type
+		self.meta_info = meta_info or {}
+		self.blocks = collections.OrderedDict()
+		self.spilled = set()
+	def __len__(self):
+		return len(self.blocks)
+	def __contains__(self, block_pos):
+		return block_pos in self.blocks or block_pos in self.spilled
+	def put(self, block_pos, block):
+		""" Stores block, evicting least recently used ones if needed. """
+		self.blocks.pop(block_pos, None)
+		self.blocks[block_pos] = block
+		while len(self.blocks) > self.max_blocks:
+			old_pos, old_block = self.blocks.popitem(last=False)
+			if self.spill_dir is not None:
+				self._spill(old_pos, old_block)
+	def take(self, block_pos):
+		""" Removes block from cache and returns it.
+		Returns None if block is not cached.
+		"""
+		block = self.blocks.pop(block_pos, None)
+		if block is None and block_pos in self.spilled:
+			block = self._restore(block_pos)
+		return block
+	def _get_spill_filename(self, block_pos):
+		return os.path.join(self.spill_dir, '{0}_{1}.block'.format(block_pos.x, block_pos.y))
+	def _spill(self, block_pos, block):
+		from clckwrkbdgr.serialize import stream
+		with open(self._get_spill_filename(block_pos), 'w') as f:
+			writer = stream.Writer(f, self.SPILL_VERSION)
+			writer.write_size(block.size)
+			for cell in block.data:
+				writer.write(cell)
+		self.spilled.add(block_pos)
+	def _restore(self, block_pos):
+		from clckwrkbdgr.serialize import stream
+		filename = self._get_spill_filename(block_pos)
+		with open(filename, 'r') as f:
+			reader = stream.StreamReader(f)
+			for name, value in self.meta_info.items():
+				reader.set_meta_info(name, value)
+			block = reader.read_matrix(self.cell_type)
+		os.unlink(filename)
+		self.spilled.remove(block_pos)
+		return block
+
 class EndlessMatrix(object):
 	""" Sort of a "window" over an endless map.
 	The global map is divided into blocks of the same size, at every moment only 9 of them are accessible:
@@ -265,21 +595,115 @@ class EndlessMatrix(object):
 	After position of interest is moved, method recalibrate(new_pos) should be called
 	to recalculate available blocks.
 	"""
-	def __init__(self, block_size, builder, default_value=None, cell_type=None):
+	def __init__(self, block_size, builder, default_value=None, cell_type=None, cache=None, prefetch=False, pass_block_pos=False):
 		""" Create 3x3 blocks of given size and fill them using builder callable (accepts a Matrix object).
 		Default filling value can be supplied. It will also be used for recalibration.
 		At the start, anchor pos is considered to be at (0, 0) of the central block.
+
+		If cache (BlockCache) is specified, blocks that went out of the window
+		are stored there instead of being discarded and are reused
+		when window returns to them.
+		If prefetch is True, blocks of the ring around the current window
+		are built in background thread (requires cache, creates default one if not specified).
+		Prefetching starts after each recalibration or by explicit call of prefetch()
+		(initial blocks are built synchronously, so the state of builder could be checked first).
+		All builder calls are serialized in the same thread, in order of requests.
+		Order of requests depends on timing though (queued prefetches are cancelled
+		when blocks are needed right away), so with prefetching the builder
+		should not depend on the order of calls.
+		If pass_block_pos is True, builder is called as builder(block, block_pos),
+		where block_pos are global block coords (initial central block is at (0, 0)),
+		so content could be generated for each block independently
+		(e.g. using RNG forked by block pos).
 		"""
 		self.builder = builder
+		self.pass_block_pos = pass_block_pos
 		self.cell_type = cell_type
 		self.block_size = Size(block_size)
 		self.shift = Point(0, 0) - self.block_size
 		self.blocks = Matrix((3, 3))
 		self.default_value = default_value
+		self.cache = cache
+		self._executor = None
+		self._pending = {}
+		if prefetch:
+			if self.cache is None:
+				self.cache = BlockCache(cell_type=cell_type)
+			self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
 		for row in range(self.blocks.height):
 			for col in range(self.blocks.width):
-				self.blocks.set_cell((col, row), Matrix(self.block_size, self.default_value))
-				self.builder(self.blocks.cell((col, row)))
+				self.blocks.set_cell((col, row), self._build_block(Point(col - 1, row - 1)))
+	def _build_block(self, block_pos):
+		block = Matrix(self.block_size, self.default_value)
+		if self.pass_block_pos:
+			self.builder(block, block_pos)
+		else:
+			self.builder(block)
+		return block
+	def _get_block_origin(self):
+		""" Returns global block coords of the top-left block of the window. """
+		return Point(self.shift.x // self.block_size.width, self.shift.y // self.block_size.height)
+	def _collect_prefetched(self):
+		for block_pos, future in list(self._pending.items()):
+			if future.done():
+				del self._pending[block_pos]
+				self.cache.put(block_pos, future.result())
+	def _fetch_block(self, block_pos):
+		""" Returns block at global block coords: from cache, from prefetching queue
+		or freshly built.
+		Block is needed right now, so it should not wait behind queued prefetches:
+		all of them that are not started yet are cancelled (they will be rescheduled
+		by the next prefetch()), so only currently running one is waited for.
+		"""
+		block = None
+		if self.cache is not None:
+			block = self.cache.take(block_pos)
+		if block is None and self._executor:
+			self._cancel_prefetching(set())
+			future = self._pending.pop(block_pos, None) or self._executor.submit(self._build_block, block_pos)
+			block = future.result()
+		if block is None:
+			block = self._build_block(block_pos)
+		return block
+	def _get_surroundings(self, origin):
+		""" Returns global coords of blocks of the window with given origin
+		and of the ring around it.
+		"""
+		return set(
+				Point(origin.x + col, origin.y + row)
+				for row in range(-1, self.blocks.height + 1)
+				for col in range(-1, self.blocks.width + 1)
+				)
+	def _cancel_prefetching(self, surroundings):
+		""" Cancels scheduled blocks that are not in the surroundings anymore. """
+		for block_pos, future in list(self._pending.items()):
+			if block_pos not in surroundings and future.cancel():
+				del self._pending[block_pos]
+	def prefetch(self):
+		""" Schedules building of blocks around the current window
+		(if prefetching is enabled).
+		"""
+		if not self._executor:
+			return
+		self._collect_prefetched()
+		origin = self._get_block_origin()
+		surroundings = self._get_surroundings(origin)
+		self._cancel_prefetching(surroundings)
+		for block_pos in sorted(surroundings):
+			if self.blocks.valid(block_pos - origin):
+				continue
+			if block_pos in self._pending or block_pos in self.cache:
+				continue
+			self._pending[block_pos] = self._executor.submit(self._build_block, block_pos)
+	def close(self):
+		""" Stops background prefetching (if any).
+		Waits for already scheduled blocks and keeps them in cache.
+		"""
+		if not self._executor:
+			return
+		self._executor.shutdown(wait=True)
+		self._collect_prefetched()
+		self._executor = None
 	def __getstate__(self): # pragma: no cover
 		return {
 				'block_size' : self.block_size,
@@ -351,6 +775,10 @@ class EndlessMatrix(object):
 		if block_pos == Point(1, 1):
 			return
 		block_shift = block_pos - Point(1, 1)
+		origin = self._get_block_origin()
+		if self._executor:
+			# Blocks that are not needed anymore should not delay the new ones.
+			self._cancel_prefetching(self._get_surroundings(origin + block_shift))
 		new_blocks = Matrix((3, 3))
 		for row in range(new_blocks.height):
 			for col in range(new_blocks.width):
@@ -359,13 +787,19 @@ class EndlessMatrix(object):
 				if self.blocks.valid(old_pos):
 					new_blocks.set_cell(pos, self.blocks.cell(old_pos))
 				else:
-					new_blocks.set_cell(pos, Matrix(self.block_size, self.default_value))
-					self.builder(new_blocks.cell(pos))
+					new_blocks.set_cell(pos, self._fetch_block(origin + old_pos))
+		if self.cache is not None:
+			for row in range(self.blocks.height):
+				for col in range(self.blocks.width):
+					pos = Point(col, row)
+					if not new_blocks.valid(pos - block_shift):
+						self.cache.put(origin + pos, self.blocks.cell(pos))
 		self.blocks = new_blocks
 		self.shift += Point(
 				block_shift.x * self.block_size.width,
 				block_shift.y * self.block_size.height,
 				)
+		self.prefetch()
 
 class NestedGrid: # pragma: no cover -- TODO
 	""" A grid, divided into sub-grids recursively.
@@ -389,19 +823,22 @@ class NestedGrid: # pragma: no cover -- TODO
 				stream.write(value.y)
 		def load(self, stream):
 			""" Loads object from a stream. """
-			for value in self.values:
-				value.x = stream.read(int)
-				value.y = stream.read(int)
+			self.values = [
+					Point(stream.read(int), stream.read(int))
+					for _ in self.values
+					]
 		def get_global(self, nested_grid):
 			""" Compresses into global position on the specified NestedGrid.
+			If Coord is shorter than depth of the grid, its values are considered
+			to be the topmost ones, so resulting pos is in units of subgrids of the last given level.
 			"""
-			size = Size(1, 1)
-			result = self.values[-1]
-			for index, value in enumerate(reversed(self.values[:-1])):
-				size.width *= nested_grid.sizes[-1-index].width
-				size.height *= nested_grid.sizes[-1-index].height
-				result += Point(value.x * size.width, value.y * size.height)
-			return result
+			strides = nested_grid.strides[:len(self.values)]
+			unit_width, unit_height = strides[-1]
+			x, y = 0, 0
+			for value, (stride_width, stride_height) in zip(self.values, strides):
+				x += value.x * (stride_width // unit_width)
+				y += value.y * (stride_height // unit_height)
+			return Point(x, y)
 		def __eq__(self, other):
 			if not isinstance(other, NestedGrid.Coord):
 				raise TypeError("Cannot compare NestedGrid.Coord with {0}".format(type(other)))
@@ -419,17 +856,14 @@ class NestedGrid: # pragma: no cover -- TODO
 		def from_global(cls, pos, nested_grid):
 			""" Splits global pos on the specified NestedGrid into a Coord object.
 			"""
-			sizes = [Size(1, 1)]
-			for index in range(len(nested_grid.sizes) - 1):
-				sizes.append(Size(
-					sizes[-1].width * nested_grid.sizes[-1-index].width,
-					sizes[-1].height * nested_grid.sizes[-1-index].height,
-					))
+			x, y = pos
 			values = []
-			for size in reversed(sizes):
-				values.append(Point(pos.x // size.width, pos.y // size.width))
-				pos = Point(pos.x % size.width, pos.y % size.height)
-			return cls(*values)
+			for stride_width, stride_height in nested_grid.strides:
+				values.append(Point(x // stride_width, y // stride_height))
+				x, y = x % stride_width, y % stride_height
+			result = cls.__new__(cls)
+			result.values = values
+			return result
 
 	def __init__(self, sizes, data_classes, cell_type):
 		""" Creates grid of given sizes and and with specified
@@ -455,6 +889,17 @@ class NestedGrid: # pragma: no cover -- TODO
 		self.nested_data = data_classes[1:]
 		self.cell_type = cell_type
 		self._valid_cell = None
+		self.strides = self._make_strides(self.nested_sizes)
+	@staticmethod
+	def _make_strides(nested_sizes):
+		""" Returns tuple of (width, height) for every level:
+		size in cells of a single subgrid element on that level.
+		"""
+		strides = [(1, 1)]
+		for size in reversed(nested_sizes):
+			stride_width, stride_height = strides[0]
+			strides.insert(0, (stride_width * size.width, stride_height * size.height))
+		return tuple(strides)
 	def save(self, stream):
 		""" Save full grid to the stream.
 		Automatically handles sparse grids.
@@ -530,6 +975,36 @@ class NestedGrid: # pragma: no cover -- TODO
 			subgrid = subgrid.cells.cell(pos)
 			result.append(subgrid.data)
 		return result
+	def _subgrid_at_global(self, x, y, strides):
+		""" Walks down by global position for each of specified strides.
+		Returns None if position is out of bounds or subgrid is not created.
+		"""
+		grid = self
+		for stride_width, stride_height in strides:
+			cells = grid.cells
+			width, height = cells.dims.values
+			col, x = divmod(x, stride_width)
+			row, y = divmod(y, stride_height)
+			if col < 0 or row < 0 or col >= width or row >= height:
+				return None
+			grid = cells.data[col + row * width]
+			if grid is None:
+				return None
+		return grid
+	def cell_at_global(self, x, y):
+		""" Returns actual cell at global position (fast path without Coord).
+		Returns None if position is not valid.
+		"""
+		return self._subgrid_at_global(x, y, self.strides)
+	def data_at_global(self, x, y):
+		""" Returns data object of the bottom-level subgrid that contains global position
+		(same as get_data(coord)[-1], fast path without Coord).
+		Returns None if position is not valid.
+		"""
+		subgrid = self._subgrid_at_global(x, y, self.strides[:-1])
+		if subgrid is None:
+			return None
+		return subgrid.data
 	@property
 	def sizes(self):
 		""" List of nested sizes (see c-tor). """
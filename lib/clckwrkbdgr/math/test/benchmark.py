@@ -0,0 +1,252 @@
+""" Micro-benchmarks for clckwrkbdgr.math.
+Not a part of the test suite, should be run manually:
+
+  python -m clckwrkbdgr.math.test.benchmark [name ...]
+
+By default runs all benchmarks.
+"""
+from __future__ import print_function
+import sys
+import timeit
+import random
+try:
+	import tracemalloc
+except ImportError: # Python 2.
+	tracemalloc = None
+from clckwrkbdgr.math import Point, Size, Matrix
+from clckwrkbdgr.math import algorithm, graph, geometry
+from clckwrkbdgr.math.grid import NestedGrid
+from clckwrkbdgr.math.algorithm import FieldOfView, ShadowcastingFieldOfView, BresenhamCache
+
+BENCHMARKS = []
+
+def benchmark(func=None, number=100):
+	""" Registers benchmark function.
+	It should return callable that performs a single measured iteration.
+	Optional number of iterations can be specified: @benchmark(number=N)
+	"""
+	if func is None:
+		return lambda func: benchmark(func, number=number)
+	func.number = number
+	BENCHMARKS.append(func)
+	return func
+
+def measure(name, func, number=100):
+	""" Prints average time per call (in ms)
+	and memory allocated during a single call (peak, in KiB), if tracemalloc is available.
+	"""
+	total = timeit.timeit(func, number=number)
+	if tracemalloc is None:
+		print('{0}: {1:.3f} ms'.format(name, 1000.0 * total / number))
+		return
+	tracemalloc.start()
+	try:
+		func()
+		_, peak = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+	print('{0}: {1:.3f} ms, {2:.1f} KiB allocated'.format(name, 1000.0 * total / number, peak / 1024.0))
+
+@benchmark
+def point_footprint():
+	point = Point(1, 2)
+	print('Point: {0} bytes (object) + {1} bytes (values), has __dict__: {2}'.format(
+		sys.getsizeof(point), sys.getsizeof(point.values),
+		hasattr(point, '__dict__'),
+		))
+	return lambda: Point(1, 2) + Point(3, 4)
+
+def _fov_update(fov_type, radius):
+	field = Matrix(Size(radius * 4, radius * 4), '.')
+	for x in range(field.width):
+		field.set_cell((x, radius * 2 - 3), '#')
+	fov = fov_type(radius)
+	center = Point(radius * 2, radius * 2)
+	is_transparent = lambda pos: field.valid(pos) and field.cell(pos) == '.'
+	return lambda: sum(1 for _ in fov.update(center, is_transparent))
+
+@benchmark
+def fov_update():
+	return _fov_update(FieldOfView, 10)
+
+@benchmark
+def fov_update_r30():
+	return _fov_update(FieldOfView, 30)
+
+@benchmark
+def shadowcasting_fov_update():
+	return _fov_update(ShadowcastingFieldOfView, 10)
+
+@benchmark
+def shadowcasting_fov_update_r30():
+	return _fov_update(ShadowcastingFieldOfView, 30)
+
+def _line_of_sight(in_line_of_sight):
+	field = Matrix(Size(21, 21), '.')
+	for x in range(field.width):
+		field.set_cell((x, 7), '#')
+	center = Point(10, 10)
+	is_transparent = lambda pos: field.cell(pos) == '.'
+	targets = list(field.size.iter_points())
+	return lambda: sum(1 for target in targets if in_line_of_sight(center, target, is_transparent))
+
+@benchmark
+def line_of_sight():
+	return _line_of_sight(FieldOfView.in_line_of_sight)
+
+@benchmark
+def line_of_sight_cached():
+	return _line_of_sight(BresenhamCache(10).in_line_of_sight)
+
+def _make_field(size, wall_ratio=0.2, seed=0):
+	""" Returns matrix of '.' and '#' with random walls and free corners. """
+	rng = random.Random(seed)
+	field = Matrix(size, '.')
+	for pos in field:
+		if rng.random() < wall_ratio:
+			field.set_cell(pos, '#')
+	field.set_cell((0, 0), '.')
+	field.set_cell((size.width - 1, size.height - 1), '.')
+	return field
+
+def _pathfinder(base_class):
+	class _Pathfinder(base_class):
+		def is_passable(self, p, _):
+			return self.matrix.cell(p) == '.'
+	return _Pathfinder
+
+def _pathfinding(wave_type):
+	field = _make_field(Size(80, 40))
+	wave = _pathfinder(wave_type)(field)
+	start, target = Point(0, 0), Point(field.width - 1, field.height - 1)
+	return lambda: wave.run(start, target)
+
+@benchmark
+def pathfinding_wave():
+	return _pathfinding(algorithm.MatrixWave)
+
+@benchmark
+def pathfinding_astar():
+	return _pathfinding(algorithm.MatrixAStar)
+
+@benchmark
+def pathfinding_jps():
+	return _pathfinding(algorithm.JumpPointSearch)
+
+def _distance_map_field():
+	field = _make_field(Size(80, 40))
+	for pos in (Point(40, 20), Point(41, 20)):
+		field.set_cell(pos, '.')
+	return field
+
+@benchmark
+def distance_map_update():
+	distance_map = _pathfinder(algorithm.DistanceMap)(_distance_map_field(), max_distance=20)
+	return lambda: distance_map.update([Point(40, 20)])
+
+@benchmark
+def distance_map_move_source():
+	distance_map = _pathfinder(algorithm.DistanceMap)(_distance_map_field(), max_distance=20)
+	sources = [Point(40, 20), Point(41, 20)]
+	distance_map.update(sources[:1])
+	def _move():
+		sources.reverse()
+		distance_map.move_sources(sources[:1])
+	return _move
+
+@benchmark
+def astar_per_monster():
+	field = _distance_map_field()
+	monsters = [pos for pos in field.find('.') if 30 <= pos.x <= 50 and pos.y % 5 == 0][::4]
+	wave = _pathfinder(algorithm.MatrixAStar)(field)
+	print('{0} monsters'.format(len(monsters)))
+	return lambda: [wave.run(monster, Point(40, 20)) for monster in monsters]
+
+@benchmark(number=10)
+def floodfill():
+	field = _make_field(Size(160, 100))
+	def _fill():
+		area = Matrix(field.size, '.')
+		area.data = list(field.data)
+		spread = lambda p: [x for x in graph.get_neighbours(area, p) if area.cell(x) == '.']
+		for pos in algorithm.floodfill(Point(0, 0), spread):
+			area.set_cell(pos, '*')
+	return _fill
+
+@benchmark(number=10)
+def scanline_floodfill():
+	field = _make_field(Size(160, 100))
+	return lambda: sum(1 for _ in algorithm.scanline_floodfill(field, Point(0, 0), lambda c: c == '.'))
+
+@benchmark(number=10)
+def label_components():
+	field = _make_field(Size(160, 100))
+	return lambda: algorithm.label_components(field, lambda c: c == '.')
+
+@benchmark(number=5)
+def graph_from_matrix():
+	matrix = Matrix(Size(256, 256), '.')
+	return lambda: graph.is_connected(graph.grid_from_matrix(matrix))
+
+@benchmark(number=5)
+def grid_graph():
+	matrix = Matrix(Size(256, 256), '.')
+	return lambda: graph.is_connected(graph.GridGraph(matrix))
+
+class _NestedData(object):
+	pass
+
+def _nested_grid_viewport():
+	""" Returns 131072x131072 sparse world with one zone filled
+	and 80x25 viewport inside it.
+	"""
+	world = NestedGrid([(256, 256), (32, 32), (16, 16)], [None, _NestedData, _NestedData], str)
+	zone = world.make_subgrid(Point(100, 100))
+	for field_index in zone.cells:
+		zone.make_subgrid(field_index).cells.clear('.')
+	topleft = Point(100 * 32 * 16 + 40, 100 * 32 * 16 + 40)
+	return world, [Point(topleft.x + x, topleft.y + y) for y in range(25) for x in range(80)]
+
+@benchmark
+def nested_grid_viewport_coord():
+	world, viewport = _nested_grid_viewport()
+	return lambda: [world.cell(NestedGrid.Coord.from_global(pos, world)) for pos in viewport]
+
+@benchmark
+def nested_grid_viewport_global():
+	world, viewport = _nested_grid_viewport()
+	return lambda: [world.cell_at_global(pos.x, pos.y) for pos in viewport]
+
+@benchmark
+def matrix_viewport():
+	matrix = Matrix(Size(160, 100), '.')
+	viewport = [Point(40 + x, 40 + y) for y in range(25) for x in range(80)]
+	return lambda: [matrix.cell(pos) for pos in viewport]
+
+def _geo_coords(count, seed=0):
+	rng = random.Random(seed)
+	return [(rng.uniform(-89, 89), rng.uniform(-180, 180)) for _ in range(count)]
+
+@benchmark(number=5)
+def pairwise_distances():
+	coords = _geo_coords(500)
+	return lambda: geometry.pairwise_distances(coords, use_numpy=False)
+
+@benchmark(number=5)
+def pairwise_distances_numpy():
+	coords = _geo_coords(500)
+	return lambda: geometry.pairwise_distances(coords)
+
+@benchmark
+def k_nearest():
+	coords = _geo_coords(10000)
+	return lambda: geometry.k_nearest((50, 10), coords, k=5, max_distance=500)
+
+def main(names):
+	for func in BENCHMARKS:
+		if names and func.__name__ not in names:
+			continue
+		measure(func.__name__, func(), number=func.number)
+
+if __name__ == '__main__': # pragma: no cover
+	main(sys.argv[1:])
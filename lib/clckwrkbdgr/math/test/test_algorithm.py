@@ -2,7 +2,7 @@ from clckwrkbdgr import unittest
 import textwrap
 import clckwrkbdgr.math
 from clckwrkbdgr.math import algorithm, Matrix, Point, Size
-from clckwrkbdgr.math.algorithm import bresenham, FieldOfView
+from clckwrkbdgr.math.algorithm import bresenham, BresenhamCache, FieldOfView, ShadowcastingFieldOfView
 
 class TestMatrix(unittest.TestCase):
 	def should_flood_fill_area(self):
@@ -27,6 +27,86 @@ class TestMatrix(unittest.TestCase):
 		#########
 		"""))
 		self.assertEqual(matrix, expected, msg='\n{0}vs\n{1}'.format(matrix.tostring(), expected.tostring()))
+	def should_flood_fill_area_by_scanlines(self):
+		matrix = Matrix.fromstring(textwrap.dedent("""\
+		#########
+		# #   # #
+		# # # # #
+		#   # ###
+		# # #   #
+		######## 
+		"""))
+		self.assertEqual(list(algorithm.scanline_floodfill(matrix, Point(0, 0), lambda c: c == ' ')), [])
+		area = list(algorithm.scanline_floodfill(matrix, Point(1, 1), lambda c: c == ' '))
+		self.assertEqual(len(area), len(set(area)))
+		self.assertEqual(set(algorithm.scanline_floodfill(matrix, Point(6, 4), lambda c: c == ' ')), set(area))
+		for point in area:
+			matrix.set_cell(point, '.')
+		expected = Matrix.fromstring(textwrap.dedent("""\
+		#########
+		#.#...# #
+		#.#.#.# #
+		#...#.###
+		#.#.#...#
+		######## 
+		"""))
+		self.assertEqual(matrix, expected, msg='\n{0}vs\n{1}'.format(matrix.tostring(), expected.tostring()))
+
+		for point in algorithm.scanline_floodfill(matrix, Point(1, 1), lambda c: c != '#', with_diagonal=True):
+			matrix.set_cell(point, '*')
+		expected = Matrix.fromstring(textwrap.dedent("""\
+		#########
+		#*#***# #
+		#*#*#*# #
+		#***#*###
+		#*#*#***#
+		########*
+		"""))
+		self.assertEqual(matrix, expected, msg='\n{0}vs\n{1}'.format(matrix.tostring(), expected.tostring()))
+
+		with self.assertRaises(KeyError):
+			list(algorithm.scanline_floodfill(matrix, Point(-1, 0), lambda c: c != '#'))
+		with self.assertRaises(KeyError):
+			list(algorithm.scanline_floodfill(matrix, Point(0, 6), lambda c: c != '#'))
+	def should_check_python_values_of_typed_matrices(self):
+		flags = Matrix((3, 2), False, typecode='?')
+		flags.set_cell((1, 0), True)
+		flags.set_cell((1, 1), True)
+		self.assertEqual(sorted(algorithm.scanline_floodfill(flags, Point(1, 1), lambda c: c is True)), [Point(1, 0), Point(1, 1)])
+		labels, sizes = algorithm.label_components(flags, lambda c: c is True)
+		self.assertEqual(sizes, [4, 2])
+
+		numbers = Matrix((3, 2), 0, typecode='B', use_numpy=True)
+		numbers.set_cell((0, 1), 5)
+		self.assertEqual(list(algorithm.scanline_floodfill(numbers, Point(0, 1), lambda c: type(c) is int and c > 0)), [Point(0, 1)])
+		labels, sizes = algorithm.label_components(numbers, lambda c: type(c) is int and c > 0)
+		self.assertEqual(sizes, [5, 1])
+	def should_label_connected_components(self):
+		matrix = Matrix.fromstring(textwrap.dedent("""\
+		..#..#
+		#.#.##
+		...#..
+		##.#.#
+		"""))
+		labels, sizes = algorithm.label_components(matrix, lambda c: c == '.')
+		self.assertEqual(labels.transform(str).tostring(), textwrap.dedent("""\
+		110220
+		010200
+		111033
+		001030
+		"""))
+		self.assertEqual(sizes, [11, 7, 3, 3])
+
+		labels, sizes = algorithm.label_components(matrix, lambda c: c == '.', with_diagonal=True)
+		self.assertEqual(labels.transform(str).tostring(), textwrap.dedent("""\
+		110110
+		010100
+		111011
+		001010
+		"""))
+		self.assertEqual(sizes, [11, 13])
+		labels, sizes = algorithm.label_components(matrix, lambda c: c == '#', with_diagonal=True)
+		self.assertEqual(sizes, [13, 7, 1, 2, 1])
 
 class TestWavePathfinder(unittest.TestCase):
 	class _CustomWave(algorithm.Wave):
@@ -191,6 +271,163 @@ class TestMatrixWave(unittest.TestCase):
 				####################
 				"""))
 
+class TestAStar(unittest.TestCase):
+	class _CustomAStar(algorithm.AStar):
+		def __init__(self, matrix):
+			self.matrix = matrix
+		def get_links(self, pos):
+			return clckwrkbdgr.math.get_neighbours(self.matrix, pos, check=lambda cell: cell != '#')
+	class _CustomMatrixAStar(algorithm.MatrixAStar):
+		def is_passable(self, p, _):
+			return self.matrix.cell(p) != '#'
+	class _CustomJPS(algorithm.JumpPointSearch):
+		def is_passable(self, p, _):
+			return self.matrix.cell(p) != '#'
+	MAZE = textwrap.dedent("""\
+			####################
+			#...#....#...#######
+			#.#.####.#.#.......#
+			#.#....#...#.###...#
+			#.#....#.###.###...#
+			#.#......#.........#
+			####################
+			""")
+
+	def _assertPath(self, matrix, path, start, target, length):
+		self.assertEqual(path[0], start)
+		self.assertEqual(path[-1], target)
+		self.assertEqual(len(path), length)
+		for prev, current in zip(path[:-1], path[1:]):
+			self.assertEqual(clckwrkbdgr.math.distance(prev, current), 1)
+			self.assertNotEqual(matrix.cell(current), '#')
+	def should_find_path(self):
+		matrix = Matrix.fromstring(textwrap.dedent("""\
+		#########
+		#<#567  #
+		#0#4#8# #
+		#123#9###
+		# # #ab>#
+		#########
+		"""))
+		wave = self._CustomAStar(matrix)
+		path = wave.run(next(matrix.find('<')), next(matrix.find('>')))
+		self.assertEqual(''.join(matrix.cell(p) for p in path), '<0123456789ab>')
+		self.assertIsNone(wave.run(next(matrix.find('<')), next(matrix.find('>')), depth=12))
+	def should_find_shortest_path_in_matrix(self):
+		matrix = Matrix.fromstring(self.MAZE)
+		start, target = Point(17, 4), Point(1, 1)
+		expected_length = len(TestMatrixWave._CustomWave(matrix).run(start, target))
+		for wave_type in (self._CustomMatrixAStar, self._CustomJPS):
+			path = wave_type(matrix).run(start, target)
+			self._assertPath(matrix, path, start, target, expected_length)
+			path = wave_type(matrix).run(target, start)
+			self._assertPath(matrix, path, target, start, expected_length)
+	def should_not_find_path_if_target_is_out_of_reach(self):
+		matrix = Matrix.fromstring(self.MAZE)
+		matrix.set_cell((7, 5), '#')
+		for wave_type in (self._CustomMatrixAStar, self._CustomJPS):
+			self.assertIsNone(wave_type(matrix).run(Point(17, 4), Point(1, 1)))
+			self.assertIsNone(wave_type(matrix).run(Point(17, 4), lambda wave: None))
+	def should_find_path_within_region(self):
+		matrix = Matrix((10, 5), '.')
+		region = clckwrkbdgr.math.Rect((1, 1), (8, 3))
+		for wave_type in (self._CustomMatrixAStar, self._CustomJPS):
+			path = wave_type(matrix, region=region).run(Point(1, 1), Point(8, 1))
+			self._assertPath(matrix, path, Point(1, 1), Point(8, 1), 8)
+			self.assertTrue(all(region.contains(p, with_border=True) for p in path))
+			self.assertIsNone(wave_type(matrix, region=region).run(Point(1, 1), Point(9, 1)))
+	def should_jump_around_corners(self):
+		matrix = Matrix.fromstring(textwrap.dedent("""\
+				.###
+				.###
+				....
+				##..
+				"""))
+		path = self._CustomJPS(matrix).run(Point(0, 0), Point(3, 3))
+		self.assertEqual(path, [Point(0, 0), Point(0, 1), Point(1, 2), Point(2, 3), Point(3, 3)])
+		path = self._CustomJPS(matrix).run(Point(3, 3), Point(0, 0))
+		self._assertPath(matrix, path, Point(3, 3), Point(0, 0), 5)
+	def should_find_path_to_the_first_fit_target(self):
+		matrix = Matrix.fromstring(self.MAZE)
+		find_target = lambda wave: next((p for p in sorted(wave) if p.x < 8), None)
+		expected = TestMatrixWave._CustomWave(matrix).run(Point(17, 4), find_target)
+		for wave_type in (self._CustomMatrixAStar, self._CustomJPS):
+			path = wave_type(matrix).run(Point(17, 4), find_target)
+			self._assertPath(matrix, path, Point(17, 4), expected[-1], len(expected))
+			self.assertIsNone(wave_type(matrix).run(Point(17, 4), find_target, depth=len(expected) - 2))
+
+class TestDistanceMap(unittest.TestCase):
+	class _CustomDistanceMap(algorithm.DistanceMap):
+		def is_passable(self, p, _):
+			return self.matrix.cell(p) != '#'
+
+	def _tostring(self, distance_map):
+		return ''.join(
+				''.join(
+					'#' if distance_map.matrix.cell((x, y)) == '#'
+					else '-' if distance_map.distance(Point(x, y)) is None
+					else str(distance_map.distance(Point(x, y)))
+					for x in range(distance_map.matrix.width)
+					) + '\n'
+				for y in range(distance_map.matrix.height)
+				)
+	def should_calculate_distances_from_multiple_sources(self):
+		matrix = Matrix.fromstring(textwrap.dedent("""\
+				.....#...
+				.###.#.#.
+				...#...#.
+				"""))
+		distance_map = self._CustomDistanceMap(matrix)
+		distance_map.update([Point(0, 0), Point(8, 2)])
+		self.assertEqual(self._tostring(distance_map), textwrap.dedent("""\
+				01234#322
+				1###4#3#1
+				223#544#0
+				"""))
+		self.assertIsNone(distance_map.downhill(Point(0, 0)))
+		self.assertEqual(distance_map.downhill(Point(4, 2)), Point(5, 2))
+		self.assertEqual(distance_map.downhill(Point(4, 2), preferred=Point(4, 1)), Point(4, 1))
+		self.assertEqual(distance_map.downhill(Point(6, 0), preferred=Point(6, 1)), Point(7, 0))
+	def should_limit_distance_map(self):
+		matrix = Matrix((6, 3), '.')
+		distance_map = self._CustomDistanceMap(matrix, max_distance=2, region=clckwrkbdgr.math.Rect((0, 0), (6, 2)))
+		distance_map.update([Point(0, 0)])
+		self.assertEqual(self._tostring(distance_map), textwrap.dedent("""\
+				012---
+				112---
+				------
+				"""))
+		self.assertIsNone(distance_map.distance(Point(3, 0)))
+		self.assertIsNone(distance_map.downhill(Point(3, 0)))
+	def should_update_distance_map_incrementally(self):
+		matrix = Matrix.fromstring(textwrap.dedent("""\
+				.........
+				.#######.
+				.#.....#.
+				.#.###.#.
+				.........
+				"""))
+		distance_map = self._CustomDistanceMap(matrix, max_distance=7)
+		expected = self._CustomDistanceMap(matrix, max_distance=7)
+		distance_map.update([Point(0, 0)])
+		for sources in [
+				[Point(1, 0)],
+				[Point(2, 0), Point(2, 2)],
+				[Point(2, 2)],
+				[Point(3, 2)],
+				[Point(8, 4)],
+				[Point(7, 4)],
+				[Point(0, 4), Point(8, 0)],
+				[Point(4, 4)],
+				[Point(4, 2)],
+				[Point(5, 2)],
+				[Point(2, 2)],
+				]:
+			distance_map.move_sources(sources)
+			expected.update(sources)
+			self.assertEqual(distance_map.sources, sources)
+			self.assertEqual(distance_map.distances, expected.distances, msg=str(sources))
+
 class TestGeometry(unittest.TestCase):
 	def should_generate_bresenham_lines(self):
 		self.assertEqual(list(bresenham(Point(0, 0), Point(3, 9))), [Point(*x) for x in [
@@ -212,6 +449,49 @@ class TestGeometry(unittest.TestCase):
 			(0,0), (0,1), (0,2), (0,3), (0,4), (0,5), (0,6), (0,7), (0,8), (0,9),
 			]])
 
+	def should_cache_bresenham_lines(self):
+		cache = BresenhamCache(5)
+		self.assertEqual(str(cache), '0 lines, hits: 0/0 (0.0%), uncached: 0')
+		for start, stop in [
+				(Point(0, 0), Point(3, 5)),
+				(Point(10, 7), Point(13, 12)),
+				(Point(10, 7), Point(6, 3)),
+				(Point(2, 2), Point(2, 2)),
+				(Point(0, 0), Point(3, 9)),
+				]:
+			self.assertEqual(list(cache.line(start, stop)), list(bresenham(start, stop)))
+		self.assertEqual(sorted(cache.lines.keys()), [(-4, -4), (0, 0), (3, 5)])
+		self.assertEqual(list(cache.lines[(-4, -4)]), [0, 0, -1, -1, -2, -2, -3, -3, -4, -4])
+		self.assertEqual(str(cache), '3 lines, hits: 1/4 (25.0%), uncached: 1')
+		cache.clear()
+		self.assertEqual(cache.lines, {})
+		self.assertEqual(str(cache), '0 lines, hits: 0/0 (0.0%), uncached: 0')
+	def should_check_line_of_sight_using_cached_lines(self):
+		matrix = Matrix(Size(20, 7), '.')
+		matrix.data = list(textwrap.dedent("""\
+				####################
+				#                  #
+				#                  #
+				#            ###   #
+				#            #     #
+				#                  #
+				####################
+				""").replace('\n', ''))
+		source = Point(11, 2)
+		is_transparent=lambda p: matrix.valid(p) and matrix.cell(p) != '#'
+		cache = BresenhamCache(4)
+		for _ in range(2):
+			for p in matrix.size.iter_points():
+				self.assertEqual(
+						cache.in_line_of_sight(source, p, is_transparent),
+						FieldOfView.in_line_of_sight(source, p, is_transparent),
+						msg=str(p),
+						)
+		cached_area = 9 * 7 # Offsets within radius, clipped by matrix.
+		self.assertEqual(cache.misses, cached_area)
+		self.assertEqual(cache.hits, cached_area)
+		self.assertEqual(cache.uncached, 2 * (matrix.width * matrix.height - cached_area))
+
 class TestMapAlgorithms(unittest.TestCase):
 	def should_calculate_field_of_view(self):
 		matrix = Matrix(Size(20, 7), '.')
@@ -269,6 +549,71 @@ class TestMapAlgorithms(unittest.TestCase):
 				#                  #
 				####################
 				"""))
+	def should_calculate_field_of_view_using_shadowcasting(self):
+		matrix = Matrix(Size(20, 7), '.')
+		matrix.data = list(textwrap.dedent("""\
+				####################
+				#                  #
+				#                  #
+				#            #     #
+				#                  #
+				#                  #
+				####################
+				""").replace('\n', ''))
+		fov = ShadowcastingFieldOfView(3)
+		seen = list(fov.update(Point(11, 2), is_transparent=lambda p: matrix.valid(p) and matrix.cell(p) != '#'))
+		self.assertEqual(len(seen), len(set(seen)))
+		for p in seen:
+			if matrix.cell(p) == '#':
+				matrix.set_cell(p, '%')
+			else:
+				matrix.set_cell(p, '.')
+		self.assertTrue(fov.is_visible(11, 2))
+		self.assertFalse(fov.is_visible(14, 3))
+		self.assertTrue(fov.is_visible(14, 2))
+		self.assertFalse(fov.is_visible(15, 2))
+		self.assertEqual(matrix.tostring(), textwrap.dedent("""\
+				#########%%%%%######
+				#        .....     #
+				#       .......    #
+				#        ....%     #
+				#        .....     #
+				#          .       #
+				####################
+				"""))
+	def should_calculate_symmetric_field_of_view(self):
+		matrix = Matrix(Size(9, 7), '.')
+		matrix.data = list(textwrap.dedent("""\
+				#########
+				#   #   #
+				# #   # #
+				#   @ # #
+				## #  # #
+				#     # #
+				#########
+				""").replace('\n', ''))
+		is_transparent = lambda p: matrix.valid(p) and matrix.cell(p) != '#'
+		fov = ShadowcastingFieldOfView(5)
+		source = Point(4, 3)
+		visible = [p for p in fov.update(source, is_transparent) if is_transparent(p)]
+		for p in visible:
+			other = ShadowcastingFieldOfView(5)
+			list(other.update(p, is_transparent))
+			self.assertTrue(other.is_visible(source.x, source.y), p)
+		for p in matrix.size.iter_points():
+			if is_transparent(p) and p not in visible:
+				other = ShadowcastingFieldOfView(5)
+				list(other.update(p, is_transparent))
+				self.assertFalse(other.is_visible(source.x, source.y), p)
+	def should_skip_negative_coords_in_shadowcasting_field_of_view(self):
+		fov = ShadowcastingFieldOfView(2)
+		self.assertEqual(sorted(fov.update(Point(0, 0), lambda p: True)), [
+			Point(0, 0), Point(0, 1), Point(0, 2),
+			Point(1, 0), Point(1, 1),
+			Point(2, 0),
+			])
+		self.assertTrue(fov.is_visible(-1, -1))
+		self.assertFalse(list(fov.update(Point(-5, 0), lambda p: True)))
 	def should_check_direct_line_of_sight(self):
 		matrix = Matrix(Size(20, 7), '.')
 		matrix.data = list(textwrap.dedent("""\
@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 from clckwrkbdgr import unittest
+try:
+	import numpy
+except ImportError: # pragma: no cover
+	numpy = None
 import clckwrkbdgr.math
 from clckwrkbdgr.math import geometry
 from clckwrkbdgr.math import Point
@@ -119,6 +123,55 @@ class TestGeoCoords(unittest.TestCase):
 			geometry.GeoCoord.from_string(u"15\u00b047\u203256\u2033S 47\u00b052\u20320\u2033W")
 			), 10801.62, 1)
 
+class TestGeoDistances(unittest.TestCase):
+	CITIES = [
+			(51.48, 0.0), # Greenwich
+			(46.2, 6.15), # Geneva
+			(40.77, -73.98), # New York
+			(-33.86, 151.21), # Sydney
+			]
+	def _assert_distances(self, use_numpy):
+		with self.assertRaises(ValueError):
+			geometry.pairwise_distances([], use_numpy=use_numpy)
+		distances = geometry.haversine_many([51.48, -33.86], [0.0, 151.21], [46.2, 40.77], [6.15, -73.98], 6371.0, use_numpy=use_numpy)
+		self.assertEqual(len(distances), 2)
+		self.assertAlmostEqual(distances[0], 739.2, 1)
+		self.assertAlmostEqual(distances[1], 15990.9, 1)
+
+		matrix = geometry.pairwise_distances([geometry.GeoCoord.from_string(u"51\u00b028\u203248\u2033N", u"0\u00b00\u20320\u2033E")] + self.CITIES[1:], use_numpy=use_numpy)
+		self.assertEqual(matrix.size, clckwrkbdgr.math.Size(4, 4))
+		for i, j in matrix.keys():
+			self.assertAlmostEqual(matrix.cell((i, j)), matrix.cell((j, i)))
+			if i == j:
+				self.assertEqual(matrix.cell((i, j)), 0.0)
+		self.assertAlmostEqual(matrix.cell((0, 1)), 739.2, 1)
+		self.assertAlmostEqual(matrix.cell((2, 3)), 15990.9, 1)
+
+		london = (51.5, -0.12)
+		nearest = geometry.k_nearest(london, self.CITIES, k=3, use_numpy=use_numpy)
+		self.assertEqual([index for index, _ in nearest], [0, 1, 2])
+		nearest = geometry.k_nearest(london, self.CITIES, k=3, max_distance=1000, use_numpy=use_numpy)
+		self.assertEqual([index for index, _ in nearest], [0, 1])
+		self.assertAlmostEqual(nearest[1][1], geometry.GeoCoord.from_string(u"51\u00b030\u20320\u2033N", u"0\u00b07\u203212\u2033W").distance_to(
+			geometry.GeoCoord.from_string(u"46\u00b012\u20320\u2033N", u"6\u00b09\u20320\u2033E")
+			))
+	def should_calculate_batch_distances(self):
+		self._assert_distances(use_numpy=False)
+	@unittest.skipUnless(numpy, "NumPy is not detected.")
+	def should_calculate_batch_distances_using_numpy(self): # pragma: no cover -- TODO needs mocks instead of just skipping.
+		self._assert_distances(use_numpy=True)
+		with unittest.mock.patch.object(geometry, '_CHUNK_SIZE', 3):
+			chunked = geometry.pairwise_distances(self.CITIES * 2)
+		plain = geometry.pairwise_distances(self.CITIES * 2, use_numpy=False)
+		for pos in plain.keys():
+			self.assertAlmostEqual(chunked.cell(pos), plain.cell(pos))
+	def should_prefilter_nearest_coords_by_bounding_box(self):
+		coords = [(10.0, 179.9), (10.0, -179.9), (10.0, 170.0), (89.5, 0.0), (89.5, 180.0)]
+		nearest = geometry.k_nearest((10.0, 179.95), coords, k=10, max_distance=100)
+		self.assertEqual([index for index, _ in nearest], [0, 1]) # Across antimeridian.
+		nearest = geometry.k_nearest((89.9, 90.0), coords, k=10, max_distance=100)
+		self.assertEqual([index for index, _ in nearest], [3, 4]) # Box contains pole.
+
 class TestRectConnection(unittest.TestCase):
 	def should_create_and_validate_connection(self):
 		with self.assertRaises(ValueError):
@@ -186,3 +239,25 @@ class TestRectConnection(unittest.TestCase):
 		self.assertTrue(conn.contains((5, 5)))
 		self.assertFalse(conn.contains((0, 5)))
 		self.assertFalse(conn.contains((2, 3)))
+
+class TestSpatialIndex(unittest.TestCase):
+	def should_get_bounding_rect_of_connection(self):
+		conn = geometry.RectConnection((0, 5), (5, 2), 'H', 2)
+		self.assertEqual(conn.get_bounding_rect(), clckwrkbdgr.math.Rect((0, 2), (6, 4)))
+		conn = geometry.RectConnection((4, 0), (1, 5), 'V', 2)
+		self.assertEqual(conn.get_bounding_rect(), clckwrkbdgr.math.Rect((1, 0), (4, 6)))
+	def should_find_shape_by_point(self):
+		room = clckwrkbdgr.math.Rect((0, 0), (4, 3))
+		other_room = clckwrkbdgr.math.Rect((10, 10), (6, 4))
+		tunnel = geometry.RectConnection((3, 1), (10, 11), 'H', 2)
+		index = geometry.SpatialIndex([room, tunnel], cell_size=4)
+		index.add(other_room, 'other')
+		self.assertEqual(len(index), 3)
+		self.assertEqual(index.get(Point(0, 0)), room)
+		self.assertEqual(index.get(Point(3, 1)), room) # Overlaps, first added wins.
+		self.assertEqual(index.get(Point(5, 5)), tunnel)
+		self.assertEqual(index.get(Point(8, 11)), tunnel)
+		self.assertEqual(index.get(Point(15, 13)), 'other')
+		self.assertIsNone(index.get(Point(6, 6)))
+		self.assertIsNone(index.get(Point(100, 100)))
+		self.assertEqual(index.get(Point(-1, 0), 'void'), 'void')
@@ -2,7 +2,7 @@ from clckwrkbdgr import unittest
 import textwrap, copy
 from clckwrkbdgr.math import Point
 import clckwrkbdgr.math.graph
-from clckwrkbdgr.math.graph import get_clusters, is_connected, grid_from_matrix
+from clckwrkbdgr.math.graph import get_clusters, is_connected, grid_from_matrix, DisjointSet, GridGraph
 
 class TestGraph(unittest.TestCase):
 	def should_clone_graph(self):
@@ -74,6 +74,21 @@ class TestGraph(unittest.TestCase):
 		self.assertFalse(graph.has_connection('A', 'B'))
 		self.assertFalse(graph.has_connection('A', 'C'))
 		self.assertTrue(graph.has_connection('B', 'C'))
+	def should_remove_node_in_directional_graph(self):
+		graph = clckwrkbdgr.math.graph.Graph(directional=True)
+		graph.add_nodes(['A', 'B', 'C'])
+		graph.connect('A', 'B')
+		graph.connect('B', 'C')
+		graph.connect('C', 'A')
+		graph.connect('A', 'A')
+		graph.remove_node('A')
+		self.assertFalse(graph.has_node('A'))
+		self.assertEqual(set(graph.all_links()), {('B', 'C')})
+		self.assertEqual(graph.all_connections('B', with_incoming=True), {'C'})
+		self.assertEqual(graph.all_connections('C', with_incoming=True), {'B'})
+		graph.add_node('A')
+		graph.connect('C', 'A')
+		self.assertEqual(graph.all_connections('A', with_incoming=True), {'C'})
 	def should_get_all_nodes(self):
 		graph = clckwrkbdgr.math.graph.Graph()
 		graph.add_node('A')
@@ -211,6 +226,41 @@ class TestGraph(unittest.TestCase):
 			('B', 'C'),
 			})
 
+	def should_yield_self_loops_only_once(self):
+		graph = clckwrkbdgr.math.graph.Graph()
+		graph.add_nodes(['A', 'B'])
+		graph.connect('A', 'A')
+		graph.connect('A', 'B')
+		self.assertEqual(sorted(tuple(sorted(link)) for link in graph.all_links()), [
+			('A', 'A'),
+			('A', 'B'),
+			])
+		graph.disconnect('A', 'A')
+		graph.remove_node('B')
+		self.assertEqual(list(graph.all_links()), [])
+		self.assertEqual(graph.all_connections('A'), set())
+
+class TestDisjointSet(unittest.TestCase):
+	def should_merge_groups(self):
+		groups = DisjointSet('ABCDE')
+		self.assertEqual(groups.groups_count, 5)
+		self.assertTrue(groups.union('A', 'B'))
+		self.assertTrue(groups.union('C', 'D'))
+		self.assertTrue(groups.union('D', 'B'))
+		self.assertFalse(groups.union('A', 'C'))
+		self.assertEqual(groups.find('A'), groups.find('D'))
+		self.assertNotEqual(groups.find('A'), groups.find('E'))
+		self.assertEqual(groups.groups_count, 2)
+		self.assertCountEqual(groups.groups(), [{'A', 'B', 'C', 'D'}, {'E'}])
+	def should_add_new_items_on_union(self):
+		groups = DisjointSet()
+		groups.add('A')
+		groups.add('A')
+		self.assertEqual(groups.groups_count, 1)
+		groups.union('B', 'C')
+		self.assertEqual(groups.groups_count, 2)
+		self.assertCountEqual(groups.groups(), [{'A'}, {'B', 'C'}])
+
 class TestAlgorithms(unittest.TestCase):
 	def should_get_all_clusters(self):
 		graph = clckwrkbdgr.math.graph.Graph(directional=True)
@@ -273,3 +323,66 @@ class TestAlgorithms(unittest.TestCase):
 		self.assertFalse(grid.has_connection(Point(0, 0), Point(0, 2)))
 		self.assertFalse(grid.has_connection(Point(0, 0), Point(2, 0)))
 		self.assertFalse(grid.has_connection(Point(0, 0), Point(2, 2)))
+	def should_create_large_graph_from_matrix(self):
+		m = clckwrkbdgr.math.Matrix((100, 100), '.')
+		grid = grid_from_matrix(m)
+		self.assertEqual(len(grid.all_nodes()), 100 * 100)
+		self.assertEqual(sum(1 for _ in grid.all_links()), 2 * 99 * 100)
+		self.assertTrue(is_connected(grid))
+
+class TestGridGraph(unittest.TestCase):
+	def should_link_neighbouring_cells(self):
+		m = clckwrkbdgr.math.Matrix.fromstring("ABC\nDEF\n123")
+		grid = GridGraph(m)
+		self.assertEqual(set(grid.all_nodes()), set(m.keys()))
+		self.assertTrue(grid.has_node(Point(2, 2)))
+		self.assertFalse(grid.has_node(Point(3, 2)))
+		self.assertTrue(grid.has_connection(Point(0, 0), Point(0, 1)))
+		self.assertTrue(grid.has_connection(Point(0, 0), Point(1, 0)))
+		self.assertFalse(grid.has_connection(Point(0, 0), Point(0, 0)))
+		self.assertFalse(grid.has_connection(Point(0, 0), Point(1, 1)))
+		self.assertFalse(grid.has_connection(Point(0, 0), Point(0, 2)))
+		self.assertFalse(grid.has_connection(Point(2, 2), Point(3, 2)))
+		self.assertEqual(grid.all_connections(Point(1, 0)), {Point(0, 0), Point(2, 0), Point(1, 1)})
+		self.assertEqual(grid.all_connections(Point(1, 0), with_incoming=True), {Point(0, 0), Point(2, 0), Point(1, 1)})
+		self.assertEqual(grid.all_connections(Point(-1, 0)), set())
+		expected = grid_from_matrix(m)
+		self.assertEqual(
+				set(frozenset(link) for link in grid.all_links()),
+				set(frozenset(link) for link in expected.all_links()),
+				)
+		self.assertTrue(is_connected(grid))
+	def should_link_diagonal_cells(self):
+		m = clckwrkbdgr.math.Matrix.fromstring("ABC\nDEF\n123")
+		grid = GridGraph(m, with_diagonal=True)
+		self.assertTrue(grid.has_connection(Point(0, 0), Point(1, 1)))
+		self.assertTrue(grid.has_connection(Point(1, 0), Point(0, 1)))
+		self.assertFalse(grid.has_connection(Point(0, 0), Point(2, 2)))
+		self.assertEqual(grid.all_connections(Point(0, 0)), {Point(1, 0), Point(0, 1), Point(1, 1)})
+		links = list(grid.all_links())
+		self.assertEqual(len(links), 12 + 8)
+		self.assertEqual(len(set(frozenset(link) for link in links)), 12 + 8)
+	def should_skip_impassable_cells(self):
+		m = clckwrkbdgr.math.Matrix.fromstring(textwrap.dedent("""\
+				..#..
+				..#..
+				###.#
+				..#..
+				"""))
+		grid = GridGraph(m, is_passable=lambda c: c == '.')
+		self.assertFalse(grid.has_node(Point(2, 0)))
+		self.assertFalse(grid.has_connection(Point(1, 0), Point(2, 0)))
+		self.assertEqual(grid.all_connections(Point(2, 0)), set())
+		self.assertEqual(grid.all_connections(Point(3, 2)), {Point(3, 1), Point(3, 3)})
+		self.assertEqual(len(list(grid.all_nodes())), 13)
+		self.assertCountEqual(get_clusters(grid), [
+			{Point(0, 0), Point(1, 0), Point(0, 1), Point(1, 1)},
+			{Point(3, 0), Point(4, 0), Point(3, 1), Point(4, 1), Point(3, 2), Point(3, 3), Point(4, 3)},
+			{Point(0, 3), Point(1, 3)},
+			])
+		self.assertFalse(is_connected(grid))
+
+		grid = GridGraph(m, with_diagonal=True, is_passable=lambda c: c == '.')
+		self.assertEqual(len(get_clusters(grid)), 3)
+		m.set_cell((2, 2), '.')
+		self.assertTrue(is_connected(grid))
@@ -1,8 +1,18 @@
 from clckwrkbdgr import unittest
+import os
+import threading
 import textwrap
-from .._base import Point
+try:
+	import concurrent.futures
+except ImportError: # pragma: no cover
+	concurrent = None
+try:
+	import numpy
+except ImportError: # pragma: no cover
+	numpy = None
+from .._base import Point, Size, Rect
 from ..grid import Matrix, HexGrid, get_neighbours
-from ..grid import EndlessMatrix
+from ..grid import EndlessMatrix, BlockCache, NestedGrid
 
 class TestMatrix(unittest.TestCase):
 	def should_create_matrix(self):
@@ -176,6 +186,168 @@ class TestMatrix(unittest.TestCase):
 				""")
 		actual = m.tostring()
 		self.assertEqual(actual, expected)
+		with self.assertRaises(KeyError):
+			m.fill(Point(8, 3), Point(10, 3), 'X')
+	def should_clear_matrix(self):
+		m = Matrix((3, 2), '.')
+		data = m.data
+		m.clear('#')
+		self.assertIs(m.data, data)
+		self.assertEqual(m.tostring(), '###\n###\n')
+		m = Matrix((3, 2), 1, typecode='B')
+		m.clear(2)
+		self.assertEqual(m.tostring(), '222\n222\n')
+	def should_fill_cells_by_mask(self):
+		m = Matrix.fromstring('.#.\n#..')
+		mask = Matrix.fromstring('X.X\n.XX').transform(lambda c: c == 'X', typecode='?')
+		m.fill_where(mask, '*')
+		self.assertEqual(m.tostring(), '*#*\n#**\n')
+		m.fill_where(lambda c: c == '#', '.')
+		self.assertEqual(m.tostring(), '*.*\n.**\n')
+		with self.assertRaises(ValueError):
+			m.fill_where(Matrix((2, 2)), '.')
+	def should_count_values_in_matrix(self):
+		for typecode in (None, 'B'):
+			m = Matrix.fromstring('010\n110').transform(int, typecode=typecode)
+			self.assertEqual(m.count(1), 3)
+			self.assertEqual(m.count(2), 0)
+			self.assertEqual(list(m.find(1)), [Point(1, 0), Point(0, 1), Point(1, 1)])
+			self.assertEqual(m.count_if(lambda c: c < 1), 3)
+			self.assertTrue(m.any_if(lambda c: c > 0))
+			self.assertFalse(m.any_if(lambda c: c > 1))
+			self.assertTrue(m.all_if(lambda c: c < 2))
+			self.assertFalse(m.all_if(lambda c: c > 0))
+	def should_transform_matrix_by_rows(self):
+		m = Matrix.fromstring('ab\ncd')
+		reversed_rows = m.transform_rows(lambda row: reversed(row))
+		self.assertEqual(reversed_rows.tostring(), 'ba\ndc\n')
+		codes = m.transform_rows(lambda row: [ord(c) - ord('a') for c in row], typecode='B')
+		self.assertEqual(codes.typecode, 'B')
+		self.assertEqual(list(codes.values()), [0, 1, 2, 3])
+		with self.assertRaises(ValueError):
+			m.transform_rows(lambda row: row[:1])
+
+class TestMatrixView(unittest.TestCase):
+	def _matrix(self):
+		return Matrix.fromstring(textwrap.dedent("""\
+				abcd
+				efgh
+				ijkl
+				"""))
+	def should_iterate_over_rows(self):
+		m = self._matrix()
+		self.assertEqual(list(m.rows()), [list('abcd'), list('efgh'), list('ijkl')])
+	def should_create_view_over_matrix(self):
+		m = self._matrix()
+		view = m.view(Rect((1, 1), (2, 2)))
+		self.assertEqual(view.size, Size(2, 2))
+		self.assertEqual(view.width, 2)
+		self.assertEqual(view.height, 2)
+		self.assertEqual(view.topleft, Point(1, 1))
+		self.assertEqual(view.tostring(), 'fg\njk\n')
+		self.assertEqual(list(view), [Point(0, 0), Point(1, 0), Point(0, 1), Point(1, 1)])
+		self.assertEqual(list(view.keys()), list(view))
+		self.assertEqual(list(view.values()), list('fgjk'))
+		self.assertEqual(list(view.rows()), [list('fg'), list('jk')])
+		with self.assertRaises(KeyError):
+			m.view(Rect((2, 2), (3, 3)))
+	def should_share_storage_with_matrix(self):
+		m = self._matrix()
+		view = m.view(Rect((1, 0), (2, 2)))
+		self.assertEqual(view.cell((0, 1)), 'f')
+		view.set_cell((0, 1), '*')
+		self.assertEqual(m.cell((1, 1)), '*')
+		m.set_cell((2, 0), '#')
+		self.assertEqual(view.cell((1, 0)), '#')
+		self.assertTrue(view.valid((1, 1)))
+		self.assertFalse(view.valid((2, 1)))
+		with self.assertRaises(KeyError):
+			view.cell((2, 0))
+		with self.assertRaises(KeyError):
+			view.set_cell((-1, 0), '*')
+	def should_create_nested_view(self):
+		m = self._matrix()
+		view = m.view(Rect((1, 0), (3, 3))).view(Rect((1, 1), (2, 2)))
+		self.assertEqual(view.topleft, Point(2, 1))
+		self.assertEqual(view.tostring(), 'gh\nkl\n')
+		with self.assertRaises(KeyError):
+			view.view(Rect((1, 1), (2, 2)))
+	def should_view_typed_matrix(self):
+		m = Matrix((3, 3), False, typecode='?')
+		view = m.view(Rect((1, 1), (2, 2)))
+		view.set_cell((1, 1), True)
+		self.assertEqual(list(view.rows()), [[False, False], [False, True]])
+		self.assertEqual(m.tostring(lambda c: '*' if c else '.'), '...\n...\n..*\n')
+
+class TestTypedMatrix(unittest.TestCase):
+	def should_create_typed_matrix(self):
+		m = Matrix((3, 2), default=7, typecode='B')
+		self.assertEqual(m.size, (3, 2))
+		self.assertEqual(m.typecode, 'B')
+		self.assertEqual(len(m.data), 6)
+		self.assertEqual(m.data.itemsize, 1)
+		self.assertEqual(list(m.values()), [7] * 6)
+		m.resize((2, 2))
+		self.assertEqual(list(m.values()), [0] * 4)
+	def should_store_bools_as_bytes(self):
+		m = Matrix((2, 2), default=False, typecode='?')
+		self.assertTrue(isinstance(m.data, bytearray))
+		m.set_cell((1, 0), True)
+		self.assertIs(m.cell((1, 0)), True)
+		self.assertIs(m.cell((0, 0)), False)
+		self.assertEqual(list(m.values()), [False, True, False, False])
+		self.assertEqual(list(m.find(True)), [Point(1, 0)])
+		self.assertEqual(m.tostring(lambda c: '*' if c else '.'), '.*\n..\n')
+		with self.assertRaises(KeyError):
+			m.set_cell((2, 2), True)
+	def should_copy_typed_matrix(self):
+		original = Matrix((2, 2), default=1, typecode='h')
+		copy = Matrix(original)
+		copy.set_cell((0, 0), -1)
+		self.assertEqual(copy.typecode, 'h')
+		self.assertEqual(original.cell((0, 0)), 1)
+		self.assertEqual(copy.cell((0, 0)), -1)
+	def should_compare_typed_and_untyped_matrices(self):
+		typed = Matrix((2, 2), default=1, typecode='i')
+		untyped = Matrix((2, 2), default=1)
+		self.assertEqual(typed, untyped)
+		typed.set_cell((1, 1), 2)
+		self.assertNotEqual(typed, untyped)
+	def should_fill_typed_matrix(self):
+		m = Matrix((4, 3), default=0, typecode='b')
+		m.fill((1, 0), (2, 1), 5)
+		self.assertEqual(m.tostring(), '0550\n0550\n0000\n')
+		m.fill((2, 2), (1, 1), 9)
+		self.assertEqual(m.tostring(), '0550\n0550\n0000\n')
+		with self.assertRaises(KeyError):
+			m.fill((1, 1), (4, 4), 1)
+	def should_transform_typed_matrix(self):
+		m = Matrix.fromstring('.#\n#.').transform(lambda c: c == '#', typecode='?')
+		self.assertTrue(isinstance(m.data, bytearray))
+		self.assertEqual(list(m.values()), [False, True, True, False])
+		m = m.transform(int, typecode='B')
+		self.assertEqual(list(m.data), [0, 1, 1, 0])
+		m = m.transform(str)
+		self.assertEqual(m.data, ['0', '1', '1', '0'])
+	@unittest.skipUnless(numpy, "NumPy is not detected.")
+	def should_store_cells_in_numpy_array(self): # pragma: no cover -- TODO needs mocks instead of just skipping.
+		m = Matrix((2, 2), default=False, typecode='?', use_numpy=True)
+		self.assertTrue(isinstance(m.data, numpy.ndarray))
+		m.set_cell((1, 0), True)
+		self.assertIs(m.cell((1, 0)), True)
+		self.assertEqual(list(m.values()), [False, True, False, False])
+		m = m.transform(int, typecode='B')
+		self.assertTrue(isinstance(m.data, numpy.ndarray))
+		self.assertIs(type(m.cell((1, 0))), int)
+		m.fill((0, 1), (1, 1), 3)
+		self.assertEqual(m.tostring(), '01\n33\n')
+		self.assertEqual(Matrix(m), m)
+		self.assertEqual(m.count(3), 2)
+		self.assertEqual(list(m.find(3)), [Point(0, 1), Point(1, 1)])
+		m.fill_where(lambda c: c == 3, 2)
+		self.assertEqual(m.tostring(), '01\n22\n')
+		m.clear(0)
+		self.assertEqual(m.tostring(), '00\n00\n')
 
 class TestHexGrid(unittest.TestCase):
 	def should_convert_hex_to_string_representation(self):
@@ -350,3 +522,208 @@ class TestEndlessMatrix(unittest.TestCase):
 		self.field.recalibrate((20, 20))
 		self.assertEqual(self.field.shift, Point(15, 15))
 		self.assertEqual(self.to_string(self.field), completely_new)
+
+class _CountingBuilder(object):
+	""" Fills each block with a new letter. """
+	def __init__(self):
+		self.built = 0
+	def __call__(self, block):
+		block.clear(chr(ord('a') + self.built))
+		self.built += 1
+
+class TestEndlessMatrixCache(unittest.TestCase):
+	to_string = staticmethod(TestEndlessMatrix.to_string)
+	def should_reuse_cached_blocks_when_returning_back(self):
+		builder = _CountingBuilder()
+		field = EndlessMatrix(block_size=(1, 1), builder=builder, cache=BlockCache())
+		original = unittest.dedent("""\
+		abc
+		def
+		ghi
+		""")
+		self.assertEqual(self.to_string(field), original)
+		field.recalibrate((1, 0))
+		self.assertEqual(self.to_string(field), unittest.dedent("""\
+		bcj
+		efk
+		hil
+		"""))
+		self.assertEqual(len(field.cache), 3)
+		field.recalibrate((0, 0))
+		self.assertEqual(self.to_string(field), original)
+		self.assertEqual(builder.built, 12)
+		self.assertEqual(len(field.cache), 3)
+		self.assertTrue(Point(2, -1) in field.cache)
+		self.assertFalse(Point(-1, -1) in field.cache)
+	def should_drop_least_recently_used_blocks(self):
+		builder = _CountingBuilder()
+		field = EndlessMatrix(block_size=(1, 1), builder=builder, cache=BlockCache(max_blocks=4))
+		field.recalibrate((1, 0))
+		field.recalibrate((2, 0))
+		self.assertEqual(len(field.cache), 4)
+		field.recalibrate((1, 0))
+		field.recalibrate((0, 0))
+		self.assertEqual(self.to_string(field), unittest.dedent("""\
+		pbc
+		qef
+		ghi
+		"""))
+
+class _UpperCell(object):
+	@classmethod
+	def load(cls, reader):
+		return reader.get_meta_info('Case')(reader.read_raw())
+
+class TestEndlessMatrixSpill(unittest.fs.TestCase):
+	def should_spill_blocks_to_disk(self):
+		self.fs.create_dir('/cache')
+		builder = _CountingBuilder()
+		cache = BlockCache(max_blocks=1, spill_dir='/cache', cell_type=str)
+		field = EndlessMatrix(block_size=(2, 1), builder=builder, cache=cache)
+		field.recalibrate((2, 0))
+		self.assertEqual(len(cache), 1)
+		self.assertTrue(Point(-1, 1) in cache.blocks)
+		self.assertTrue(Point(-1, -1) in cache)
+		self.assertEqual(sorted(os.listdir('/cache')), ['-1_-1.block', '-1_0.block'])
+		field.recalibrate((0, 0))
+		self.assertEqual(sorted(os.listdir('/cache')), ['2_-1.block', '2_0.block'])
+		self.assertEqual(TestEndlessMatrix.to_string(field), unittest.dedent("""\
+		aabbcc
+		ddeeff
+		gghhii
+		"""))
+		self.assertEqual(builder.built, 12)
+	def should_pass_meta_info_to_restored_blocks(self):
+		self.fs.create_dir('/cache')
+		builder = _CountingBuilder()
+		cache = BlockCache(max_blocks=1, spill_dir='/cache', cell_type=_UpperCell, meta_info={'Case':str.upper})
+		field = EndlessMatrix(block_size=(1, 1), builder=builder, cache=cache)
+		field.recalibrate((2, 0))
+		field.recalibrate((0, 0))
+		self.assertEqual(TestEndlessMatrix.to_string(field), unittest.dedent("""\
+		ABc
+		DEf
+		Ghi
+		""")) # Last put block is still in memory.
+
+@unittest.skipUnless(concurrent, "concurrent.futures is not detected.")
+class TestEndlessMatrixPrefetch(unittest.TestCase):
+	def should_prefetch_surrounding_blocks(self):
+		builder = _CountingBuilder()
+		field = EndlessMatrix(block_size=(1, 1), builder=builder, prefetch=True)
+		self.assertEqual(builder.built, 9)
+		field.prefetch()
+		field.close()
+		self.assertEqual(builder.built, 9 + 16)
+		self.assertEqual(len(field.cache), 16)
+
+		field = EndlessMatrix(block_size=(1, 1), builder=builder, prefetch=True)
+		field.prefetch()
+		field.recalibrate((1, 0))
+		field.recalibrate((2, 0))
+		field.close()
+		self.assertEqual(TestEndlessMatrix.to_string(field).replace('\n', ''), ''.join(
+			field.blocks.cell((col, row)).cell((0, 0))
+			for row in range(3) for col in range(3)
+			))
+		built_blocks = builder.built
+		field.recalibrate((1, 0))
+		self.assertEqual(builder.built, built_blocks)
+		field.close()
+	def _make_gated_field(self, builder):
+		""" Returns field (with initial blocks already built)
+		and gate event that should be set to let background builder proceed.
+		"""
+		self.started = threading.Event()
+		gate = threading.Event()
+		main_thread = threading.current_thread()
+		def _gated_builder(block):
+			if threading.current_thread() is not main_thread:
+				self.started.set()
+				gate.wait()
+			builder(block)
+		field = EndlessMatrix(block_size=(1, 1), builder=_gated_builder, prefetch=True)
+		return field, gate
+	def _recalibrate_while_prefetching(self, field, gate, anchor_pos):
+		""" Recalibrates while the first prefetched block (see prefetch()) is still being built.
+		Background builder proceeds only after the queued prefetches are cancelled
+		for the block that is needed right away.
+		"""
+		self.started.wait()
+		queued = [future for future in field._pending.values() if not future.running()]
+		cancel_prefetching = field._cancel_prefetching
+		def _cancel_and_proceed(surroundings):
+			cancel_prefetching(surroundings)
+			if not surroundings:
+				gate.set()
+		with unittest.mock.patch.object(field, '_cancel_prefetching', side_effect=_cancel_and_proceed):
+			field.recalibrate(anchor_pos)
+		self.assertTrue(all(future.cancelled() for future in queued))
+	def should_cancel_obsolete_prefetching(self):
+		builder = _CountingBuilder()
+		field, gate = self._make_gated_field(builder)
+		field.prefetch()
+		self._recalibrate_while_prefetching(field, gate, (20, 20))
+		self.assertEqual(len(field.cache), 9 + 1) # Old window and the only prefetched block that was started.
+		self.assertEqual(builder.built, 9 + 1 + 9)
+		field.close()
+		self.assertEqual(builder.built, 9 + 1 + 9 + 16)
+	def should_not_wait_for_queued_prefetching_when_block_is_needed(self):
+		builder = _CountingBuilder()
+		field, gate = self._make_gated_field(builder)
+		field.prefetch()
+		with unittest.mock.patch.object(field, 'prefetch'):
+			self._recalibrate_while_prefetching(field, gate, (1, 0))
+		self.assertEqual(builder.built, 9 + 1 + 3) # Only the started prefetching and the new column.
+		field.close()
+	def should_build_blocks_independently_of_order(self):
+		def _builder(block, block_pos):
+			block.clear('{0},{1}'.format(block_pos.x, block_pos.y))
+		field = EndlessMatrix(block_size=(1, 1), builder=_builder, prefetch=True, pass_block_pos=True)
+		self.assertEqual(field.cell((0, 0)), '0,0')
+		self.assertEqual(field.cell((-1, 1)), '-1,1')
+		field.prefetch()
+		field.recalibrate((5, 3))
+		field.recalibrate((6, 3))
+		field.close()
+		for y in range(2, 5):
+			for x in range(5, 8):
+				self.assertEqual(field.cell((x, y)), '{0},{1}'.format(x, y))
+
+class _NestedData(object):
+	pass
+
+class TestNestedGrid(unittest.TestCase):
+	def _make_grid(self):
+		grid = NestedGrid([(4, 3), (3, 2), (2, 2)], [None, _NestedData, _NestedData], str)
+		zone = grid.make_subgrid(Point(1, 2))
+		for field_index in zone.cells:
+			field = zone.make_subgrid(field_index)
+			for pos in field.cells:
+				field.cells.set_cell(pos, '{0}{1}'.format(field_index.x, field_index.y))
+		return grid
+	def should_calculate_strides(self):
+		grid = self._make_grid()
+		self.assertEqual(grid.strides, ((6, 4), (2, 2), (1, 1)))
+		self.assertEqual(grid.full_size, Size(24, 12))
+	def should_convert_global_pos_to_coord_and_back(self):
+		grid = self._make_grid()
+		coord = NestedGrid.Coord.from_global(Point(9, 11), grid)
+		self.assertEqual(coord, NestedGrid.Coord(Point(1, 2), Point(1, 1), Point(1, 1)))
+		self.assertEqual(coord.get_global(grid), Point(9, 11))
+		self.assertEqual(NestedGrid.Coord(Point(1, 2), Point(1, 1)).get_global(grid), Point(4, 5))
+		self.assertEqual(NestedGrid.Coord(Point(1, 2)).get_global(grid), Point(1, 2))
+	def should_access_cells_by_global_pos(self):
+		grid = self._make_grid()
+		self.assertEqual(grid.cell_at_global(9, 11), '11')
+		self.assertEqual(grid.cell_at_global(6, 8), '00')
+		self.assertEqual(grid.cell_at_global(11, 9), '20')
+		for pos in [Point(9, 11), Point(6, 8), Point(11, 9)]:
+			coord = NestedGrid.Coord.from_global(pos, grid)
+			self.assertEqual(grid.cell_at_global(pos.x, pos.y), grid.cell(coord))
+			self.assertIs(grid.data_at_global(pos.x, pos.y), grid.get_data(coord)[-1])
+		self.assertIsNone(grid.cell_at_global(0, 0)) # Sparse.
+		self.assertIsNone(grid.data_at_global(0, 0))
+		self.assertIsNone(grid.cell_at_global(-1, 8))
+		self.assertIsNone(grid.cell_at_global(9, 12))
+		self.assertIsNone(grid.data_at_global(30, 8))
@@ -1,5 +1,7 @@
 from clckwrkbdgr import unittest
 import json
+import copy
+import pickle
 try:
 	import jsonpickle
 except ImportError: # pragma: no cover
@@ -80,6 +82,34 @@ class TestSize(unittest.TestCase):
 		self.assertEqual(indexes, '00 10 01 11')
 
 class TestPoint(unittest.TestCase):
+	def should_be_immutable(self):
+		p = Point(1, 2)
+		with self.assertRaises(AttributeError):
+			p.x = 3
+		with self.assertRaises(AttributeError):
+			p.extra = 3
+		self.assertEqual(hash(p), hash((1, 2)))
+		self.assertIs(Rect(p, (1, 1)).topleft, p)
+	def should_perform_arithmetics_on_points(self):
+		self.assertEqual(Point(1, -2) + (1, 1), Point(2, -1))
+		self.assertEqual(Point(1, -2) - Point(1, 1), Point(0, -3))
+		self.assertEqual(abs(Point(1, -2)), Point(1, 2))
+		self.assertEqual(Point(1, -2) * 2, Point(2, -4))
+		self.assertEqual(Point(3, -3) // 2, Point(1, -2))
+		self.assertEqual(type(Size(1, 2) + Point(1, 1)), Size)
+		self.assertTrue(Point(1, 2) < (1, 3))
+		self.assertTrue(Point(1, 2) < MyVector(2, 2))
+		self.assertTrue(Point(1, 2) == MyVector(1, 2))
+		self.assertFalse(Point(1, 2) != Size(1, 2))
+		self.assertFalse(Point(1, 2) == None)
+	def should_pickle_points(self):
+		p = pickle.loads(pickle.dumps(Point(1, 2), protocol=2))
+		self.assertEqual(p, Point(1, 2))
+		self.assertEqual(p.__getstate__(), [1, 2])
+		p.__setstate__({'x': 3, 'y': 4})
+		self.assertEqual(p, Point(3, 4))
+		s = copy.deepcopy(Size(3, 4))
+		self.assertEqual((s.width, s.height, s.x, s.y), (3, 4, 3, 4))
 	def should_yield_all_surrounding_neighbours(self):
 		actual = set(Point(1, 2).neighbours())
 		expected = set(map(Point, [
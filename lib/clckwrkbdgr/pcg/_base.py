@@ -1,26 +1,46 @@
 from __future__ import division
 import random
+import itertools, bisect
+import hashlib
+try:
+	import numpy
+except ImportError: # pragma: no cover
+	numpy = None
 try:
 	random.choices
 except AttributeError: # pragma: no cover -- py3.5
 	random.choices = lambda *args, **kwargs: random_choices(random, *args, **kwargs)
 from clckwrkbdgr.math import Point, Size
 
+def cumulative_weights(weights):
+	""" Returns list of cumulative weights (see random_choices()).
+	Empty weights produce empty list.
+	"""
+	result = []
+	for value in weights: # py2 itertools has no accumulate()
+		result.append(result[-1] + value if result else value)
+	return result
+
+def choice_by_cumulative_weights(rng, population, cumulative_weights):
+	""" Picks single item from population using precalculated cumulative weights.
+	Consumes the same random value as random_choices() for each item.
+	"""
+	total = cumulative_weights[-1] + 0.0   # convert to float
+	return population[bisect.bisect(cumulative_weights, rng.random() * total, 0, len(population) - 1)]
+
 def random_choices(rng, population, weights, k=1):
 	""" Re-implementation of random.choices for backward compatibility purposes.
 	"""
-	n = len(population)
-	cumulative_weights = []
-	it = iter(weights)
-	cumulative_weights.append(next(it))
-	for value in it: # py2 itertools has no accumulate()
-		cumulative_weights.append(cumulative_weights[-1] + value)
-	assert len(cumulative_weights) == n
-	total = cumulative_weights[-1] + 0.0   # convert to float
-	import itertools, bisect
-	return [population[bisect.bisect(cumulative_weights, rng.random() * total, 0, n - 1)]
+	cumulative = cumulative_weights(weights)
+	assert len(cumulative) == len(population)
+	return [choice_by_cumulative_weights(rng, population, cumulative)
 			for i in itertools.repeat(None, k)]
 
+def _key_to_str(key):
+	if isinstance(key, (tuple, list)):
+		return '(' + ','.join(map(_key_to_str, key)) + ')'
+	return '{0}'.format(key)
+
 class RNG:
 	""" Linear Conguential Generator.
 	Parameters from glibc.
@@ -28,6 +48,7 @@ class RNG:
 	mult_a = 1103515245
 	inc_c = 12345
 	mod_m = 2**31
+	_NUMPY_THRESHOLD = 64 # Python loop is faster for short arrays.
 	def __init__(self, seed=None):
 		""" If seed is omitted, current timestamp is used as seed.
 
@@ -50,6 +71,81 @@ class RNG:
 		if max_value is None:
 			min_value, max_value = 0, min_value
 		return int(self.get() * (max_value - min_value)) + min_value
+	def _raw_array(self, amount, use_numpy=True):
+		""" Returns next raw values as list (or NumPy array) and advances generator. """
+		if amount <= 0:
+			return []
+		if not use_numpy or numpy is None or amount < self._NUMPY_THRESHOLD:
+			mult, inc, mod = self.mult_a, self.inc_c, self.mod_m
+			value = self.value
+			result = [0] * amount
+			for index in range(amount):
+				value = (mult * value + inc) % mod
+				result[index] = value
+			self.value = value
+			return result
+		# Values are extended by doubling: x[k+n] = A_n * x[k] + C_n.
+		# Modulo is a power of 2, so uint64 overflow does not affect result.
+		mask = numpy.uint64(self.mod_m - 1)
+		result = numpy.empty(amount, dtype=numpy.uint64)
+		result[0] = (self.mult_a * self.value + self.inc_c) % self.mod_m
+		filled = 1
+		mult, inc = self.mult_a, self.inc_c
+		while filled < amount:
+			count = min(filled, amount - filled)
+			result[filled:filled + count] = (numpy.uint64(mult) * result[:count] + numpy.uint64(inc)) & mask
+			mult, inc = (mult * mult) % self.mod_m, (inc * (mult + 1)) % self.mod_m
+			filled += count
+		self.value = int(result[-1])
+		return result
+	def random_array(self, amount, use_numpy=True):
+		""" Returns list of next `amount` values [0; 1),
+		the same as `amount` sequential calls of get().
+		If use_numpy is True and NumPy is available, values are calculated at once.
+		"""
+		values = self._raw_array(amount, use_numpy=use_numpy)
+		if isinstance(values, list):
+			return [value / self.mod_m for value in values]
+		return (values / float(self.mod_m)).tolist()
+	def range_array(self, min_value, max_value, amount, use_numpy=True):
+		""" Returns list of next `amount` random ints in range [a; b),
+		the same as `amount` sequential calls of range(a, b).
+		If use_numpy is True and NumPy is available, values are calculated at once.
+		"""
+		values = self._raw_array(amount, use_numpy=use_numpy)
+		if isinstance(values, list):
+			return [int(value / self.mod_m * (max_value - min_value)) + min_value for value in values]
+		values = (values / float(self.mod_m) * (max_value - min_value)).astype(numpy.int64) + min_value
+		return values.tolist()
+	def shuffle(self, seq):
+		""" Shuffles mutable sequence in place (Fisher-Yates),
+		the same as swapping each item from the end with seq[range(i + 1)].
+		"""
+		values = self.random_array(len(seq) - 1)
+		for index, value in zip(range(len(seq) - 1, 0, -1), values):
+			other = int(value * (index + 1))
+			seq[index], seq[other] = seq[other], seq[index]
+	def skip(self, steps):
+		""" Advances generator by given number of steps in O(log(steps)),
+		as if get() was called that many times.
+		"""
+		mult, inc = 1, 0
+		step_mult, step_inc = self.mult_a, self.inc_c
+		while steps > 0:
+			if steps & 1:
+				mult, inc = (mult * step_mult) % self.mod_m, (inc * step_mult + step_inc) % self.mod_m
+			step_mult, step_inc = (step_mult * step_mult) % self.mod_m, (step_inc * (step_mult + 1)) % self.mod_m
+			steps >>= 1
+		self.value = (mult * self.value + inc) % self.mod_m
+	def fork(self, key):
+		""" Returns new independent RNG for given key.
+		Its seed depends only on the original seed and the key
+		(not on the current state), so substreams could be created
+		and used in any order.
+		Key could be a string, a number or a tuple/list of them.
+		"""
+		key = '{0}/{1}'.format(self.seed, _key_to_str(key))
+		return type(self)(int(hashlib.md5(key.encode('utf-8')).hexdigest()[:8], 16) % self.mod_m)
 	def choice(self, seq):
 		""" Evenly distributed choice. """
 		return seq[self.range(len(seq))]
@@ -99,6 +195,46 @@ def weighted_choices(rng, weights_and_items, amount=1):
 	args = zip(*(map(reversed, weights_and_items)))
 	return rng.choices(*args, k=amount)
 
+class AliasSampler(object):
+	""" Weighted random choice in O(1) using precalculated alias table
+	(Vose's variant of Walker's alias method).
+	Built once from list of tuples: (<weight>, <item>), ...
+	Each choice consumes exactly one value from RNG,
+	but results differ from weighted_choices() for the same RNG.
+	"""
+	def __init__(self, weights_and_items):
+		weights_and_items = list(weights_and_items)
+		if not weights_and_items:
+			raise ValueError("Cannot sample from empty population.")
+		self.items = [item for _, item in weights_and_items]
+		count = len(self.items)
+		total = float(sum(weight for weight, _ in weights_and_items))
+		scaled = [weight * count / total for weight, _ in weights_and_items]
+		self.probabilities = [1.0] * count
+		self.aliases = list(range(count))
+		small = [index for index, value in enumerate(scaled) if value < 1.0]
+		large = [index for index, value in enumerate(scaled) if value >= 1.0]
+		while small and large:
+			less, more = small.pop(), large.pop()
+			self.probabilities[less] = scaled[less]
+			self.aliases[less] = more
+			scaled[more] = (scaled[more] + scaled[less]) - 1.0
+			if scaled[more] < 1.0:
+				small.append(more)
+			else:
+				large.append(more)
+		# Leftovers (if any) are due to float rounding and should be 1.0 anyway.
+	def choice(self, rng):
+		""" Returns single item. """
+		value = rng.random() * len(self.items)
+		index = int(value)
+		if value - index >= self.probabilities[index]:
+			index = self.aliases[index]
+		return self.items[index]
+	def choices(self, rng, amount=1):
+		""" Returns list of items. """
+		return [self.choice(rng) for _ in range(amount)]
+
 def point(rng, size):
 	""" Boundaries are NOT included. """
 	return Point(rng.randrange(size.width or 1), rng.randrange(size.height or 1))
@@ -1,7 +1,12 @@
+import array
 import logging
 Log = logging.getLogger(__name__)
+try:
+	import numpy
+except ImportError: # pragma: no cover
+	numpy = None
 from ..math import Point, Matrix
-from ..math.grid import get_neighbours
+from ..math.algorithm import label_components
 """
 Map generation using cellular automatas.
 """
@@ -19,20 +24,12 @@ NEIGHS_2 = [
 		(+2, -2), (+2, -1), (+2, 0), (+2, 1), (+2, 2),
 		]
 
-def cave(rng, size):
-	""" Generates Matrix with cave-like structure.
-	All caverns are connected.
-	Returns Matrix of integer cells: zero means "wall", non-zero - empty space.
-	"""
-	grid = Matrix(size, 0)
-	for x in range(1, grid.size.width - 1):
-		for y in range(1, grid.size.height - 1):
-			grid.set_cell((x, y), 0 if rng.get() < 0.50 else 1)
-	Log.debug("Initial state:\n{0}".format(repr(grid)))
+DROP_WALL_2_AT = 4 # Last step is performed without 2-cell neighbourhood rule.
 
-	new_layer = Matrix(grid.size)
-	drop_wall_2_at = 4
-	for step in range(drop_wall_2_at+1):
+def _run_automaton(grid):
+	""" Pure Python backend: counts neighbours cell by cell. """
+	new_layer = Matrix(grid.size, -1, typecode='b') # Borders are left undefined.
+	for step in range(DROP_WALL_2_AT+1):
 		for x in range(1, grid.size.width - 1):
 			for y in range(1, grid.size.height - 1):
 				wall_count = 0
@@ -44,7 +41,7 @@ def cave(rng, size):
 				if wall_count >= 5:
 					new_layer.set_cell((x, y), 0)
 					continue
-				if step < drop_wall_2_at:
+				if step < DROP_WALL_2_AT:
 					wall_2_count = 0
 					for n in NEIGHS_2:
 						n = Point(x + n[0], y + n[1])
@@ -60,35 +57,65 @@ def cave(rng, size):
 				new_layer.set_cell((x, y), 1)
 		grid, new_layer = new_layer, grid
 		Log.debug("Step {1}:\n{0}".format(repr(grid), step))
-	
-	cavern = next(pos for pos in grid.size.iter_points() if grid.cell(pos) == 1)
-	caverns = []
-	while cavern:
-		area = []
-		already_affected = {cavern}
-		last_wave = {cavern}
-		area.append(cavern)
-		while last_wave:
-			Log.debug('Last wave: {0}'.format(len(last_wave)))
-			wave = set()
-			for point in last_wave:
-				wave |= {x for x in get_neighbours(grid, point) if grid.cell(x) == 1}
-			for point in wave - already_affected:
-				area.append(point)
-			last_wave = wave - already_affected
-			already_affected |= wave
+	return grid
+
+def _run_automaton_numpy(grid):
+	""" NumPy backend: neighbour counts are sums of shifted wall masks.
+	Replicates pure Python backend exactly, including undefined (-1) borders
+	of the second layer that are not counted as walls on every other step.
+	"""
+	width, height = grid.size.width, grid.size.height
+	layer = numpy.array(grid.data, dtype=numpy.int8).reshape(height, width)
+	new_layer = numpy.full((height, width), -1, dtype=numpy.int8)
+	for step in range(DROP_WALL_2_AT+1):
+		walls = (layer == 0).astype(numpy.int32)
+		wall_count = sum(
+				walls[1+dy:height-1+dy, 1+dx:width-1+dx]
+				for dx, dy in NEIGHS
+				)
+		inner = numpy.ones((height - 2, width - 2), dtype=numpy.int8)
+		if step < DROP_WALL_2_AT:
+			walls = numpy.pad(walls, 2, mode='constant') # Cells outside grid are skipped.
+			wall_2_count = sum(
+					walls[3+dy:height+1+dy, 3+dx:width+1+dx]
+					for dx, dy in NEIGHS_2
+					)
+			inner[wall_2_count <= 2] = 0
+		inner[wall_count >= 5] = 0
+		new_layer[1:height-1, 1:width-1] = inner
+		layer, new_layer = new_layer, layer
+	result = Matrix(grid.size, 0, typecode='b')
+	result.data[:] = array.array('b', layer.ravel().tolist())
+	return result
+
+def cave(rng, size, use_numpy=True):
+	""" Generates Matrix with cave-like structure.
+	All caverns are connected.
+	Returns Matrix of integer cells: zero means "wall", non-zero - empty space.
+	Cells are stored as bytes during generation; resulting label of the cavern
+	could be larger, so result is stored as short (or int for extremely large maps).
+	If use_numpy is True and NumPy is available, automaton steps are vectorized.
+	Result is the same for both backends.
+	"""
+	grid = Matrix(size, 0, typecode='b')
+	noise = iter(rng.random_array(max(0, grid.size.width - 2) * max(0, grid.size.height - 2)))
+	for x in range(1, grid.size.width - 1):
+		for y in range(1, grid.size.height - 1):
+			grid.set_cell((x, y), 0 if next(noise) < 0.50 else 1)
+	Log.debug("Initial state:\n{0}".format(repr(grid)))
+
+	if use_numpy and numpy is not None:
+		grid = _run_automaton_numpy(grid)
+	else:
+		grid = _run_automaton(grid)
 
-		count = 0
-		for point in area:
-			count += 1
-			grid.set_cell(point, 2 + len(caverns))
-		caverns.append(count)
-		Log.debug("Filling cavern #{1}:\n{0}".format(repr(grid), len(caverns)))
-		cavern = next((pos for pos in grid.size.iter_points() if grid.cell(pos) == 1), None)
-	max_cavern = 2 + caverns.index(max(caverns))
-	for pos in grid.size.iter_points():
-		if grid.cell(pos) in [0, max_cavern]:
-			continue
-		grid.set_cell(pos, 0)
+	labels, caverns = label_components(grid, lambda value: value == 1)
+	Log.debug("Caverns: {0}".format(caverns[1:]))
+	max_cavern = 1 + caverns.index(max(caverns[1:]), 1)
+	grid = Matrix(grid.size, 0, typecode='h' if max_cavern < 2**15 else 'i')
+	grid.data[:] = array.array(grid.typecode, [
+		max_cavern if label + 1 == max_cavern else 0
+		for label in labels.data
+		])
 	Log.debug("Finalized cave:\n{0}".format(repr(grid)))
 	return grid
@@ -27,16 +27,18 @@ class Maze:
 		elif direction == 3:
 			cDir = [Point(1, 0), Point(-1, 0), Point(0, 1), Point(0, -1)]
 		return cDir
+	def _get_layout_size(self):
+		return Size(
+				# Layout size should be odd (for connections between cells).
+				(self.size.width - 2 - (1 - self.size.width % 2)) // self.cell_size.width,
+				(self.size.height - 2 - (1 - self.size.height % 2)) // self.cell_size.height,
+				) # For walls.
 	def build(self):
 		""" Plans layout for the maze.
 		Returns matrix of boolean cells: True for empty space, False for walls.
 		Note: outer walls are note included.
 		"""
-		layout_size = Size(
-				# Layout size should be odd (for connections between cells).
-				(self.size.width - 2 - (1 - self.size.width % 2)) // self.cell_size.width,
-				(self.size.height - 2 - (1 - self.size.height % 2)) // self.cell_size.height,
-				) # For walls.
+		layout_size = self._get_layout_size()
 		layout = Matrix(layout_size, False)
 
 		# 0 is the most random, randomisation gets lower after that
@@ -54,7 +56,6 @@ class Maze:
 					self.rng.range(((layout_size.width + 1) // 2)) * 2,
 					self.rng.range(((layout_size.height + 1) // 2)) * 2,
 					)
-				Log.debug((current, layout_size))
 				if current.x > 1 and not layout.cell((current.x - 2, current.y)):
 					potential_exits += 1
 				if current.y > 1 and not layout.cell((current.x, current.y - 2)):
@@ -100,3 +101,45 @@ class Maze:
 					break
 		Log.debug("Done {0}/{1} cells:\n{2}".format(intDone, expected, layout.tostring(lambda c:'.' if c else '#')))
 		return layout
+
+class BacktrackingMaze(Maze):
+	""" The same maze, but built with iterative recursive backtracker:
+	each cell is visited exactly once, so it takes linear time
+	regardless of the maze size (original algorithm slows down
+	as maze fills up, because it picks random cells until it finds
+	one that can be expanded).
+	Produces different layouts than Maze for the same RNG.
+	"""
+	SHIFTS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+	def build(self):
+		""" Plans layout for the maze.
+		Returns matrix of boolean cells: True for empty space, False for walls.
+		Note: outer walls are note included.
+		"""
+		layout_size = self._get_layout_size()
+		layout = Matrix(layout_size, False)
+		width, height = layout_size.width, layout_size.height
+		data = layout.data
+		start = (
+			self.rng.range(((width + 1) // 2)) * 2,
+			self.rng.range(((height + 1) // 2)) * 2,
+			)
+		data[start[0] + start[1] * width] = True
+		path = [start]
+		while path:
+			x, y = path[-1]
+			exits = []
+			for shift_x, shift_y in self.SHIFTS:
+				new_x, new_y = x + shift_x * 2, y + shift_y * 2
+				if 0 <= new_x < width and 0 <= new_y < height and not data[new_x + new_y * width]:
+					exits.append((shift_x, shift_y))
+			if not exits:
+				path.pop()
+				continue
+			shift_x, shift_y = exits[self.rng.range(len(exits))] if len(exits) > 1 else exits[0]
+			data[x + shift_x + (y + shift_y) * width] = True
+			new_x, new_y = x + shift_x * 2, y + shift_y * 2
+			data[new_x + new_y * width] = True
+			path.append((new_x, new_y))
+		Log.debug("Done:\n{0}".format(layout.tostring(lambda c:'.' if c else '#')))
+		return layout
@@ -3,6 +3,7 @@ import logging
 Log = logging.getLogger(__name__)
 from ..math import Point, Size, Matrix, Rect
 from ..math.geometry import RectConnection
+from ..math.graph import DisjointSet
 """
 Original Rogue's dungeon: grid or rooms connected by straight tunnels.
 """
@@ -93,23 +94,10 @@ class Dungeon(object):
 				new_config[other].remove(node)
 
 			all_links = set(tuple(sorted((node_from, node_to))) for node_from in new_config for node_to in new_config[node_from])
-			clusters = []
+			clusters = DisjointSet(new_config.keys())
 			for a, b in all_links:
-				new_clusters = [{a, b}]
-				for cluster in clusters:
-					for other in new_clusters:
-						if cluster & other:
-							other.update(cluster)
-							break
-					else:
-						new_clusters.append(cluster)
-				clusters = new_clusters
-			for node in new_config.keys():
-				if any(node in cluster for cluster in clusters):
-					continue
-				clusters.append({node})
-			is_connected = len(clusters) == 1
-			if is_connected:
+				clusters.union(a, b)
+			if clusters.groups_count == 1:
 				self.maze = new_config
 	def generate_tunnels(self):
 		""" Generate tunnels from connections between rooms.
@@ -0,0 +1,64 @@
+""" Benchmarks for clckwrkbdgr.pcg.
+Not a part of the test suite, should be run manually:
+
+  python -m clckwrkbdgr.pcg.test.benchmark [name ...]
+
+By default runs all benchmarks.
+"""
+from __future__ import print_function
+import sys
+from clckwrkbdgr.math import Size
+from clckwrkbdgr.math.test.benchmark import measure
+from clckwrkbdgr import pcg
+from clckwrkbdgr.pcg import RNG, cellular, maze
+
+CAVE_SIZES = [Size(80, 25), Size(160, 100), Size(256, 256), Size(512, 512)]
+MAZE_SIZES = [Size(80, 25), Size(160, 100), Size(256, 256)]
+
+def _cave(size, use_numpy):
+	return lambda: cellular.cave(RNG(0), size, use_numpy=use_numpy)
+
+def _maze(size, maze_type):
+	return lambda: maze_type(RNG(0), size).build()
+
+WEIGHTED_ITEMS = [(1 + index % 7, index) for index in range(50)]
+
+def _weighted_choices():
+	rng = RNG(0)
+	return lambda: [pcg.weighted_choices(rng, WEIGHTED_ITEMS)[0] for _ in range(1000)]
+
+def _alias_sampler():
+	rng = RNG(0)
+	sampler = pcg.AliasSampler(WEIGHTED_ITEMS)
+	return lambda: sampler.choices(rng, 1000)
+
+def _scalar_random(amount):
+	rng = RNG(0)
+	return lambda: [rng.get() for _ in range(amount)]
+
+def _random_array(amount, use_numpy):
+	rng = RNG(0)
+	return lambda: rng.random_array(amount, use_numpy=use_numpy)
+
+def iter_benchmarks():
+	""" Yields pairs (name, callable). """
+	for size in CAVE_SIZES:
+		for backend, use_numpy in (('python', False), ('numpy', True)):
+			yield 'cave_{0}x{1}_{2}'.format(size.width, size.height, backend), _cave(size, use_numpy)
+	for size in MAZE_SIZES:
+		for maze_type in (maze.Maze, maze.BacktrackingMaze):
+			yield 'maze_{0}x{1}_{2}'.format(size.width, size.height, maze_type.__name__), _maze(size, maze_type)
+	yield 'weighted_choices_1000', _weighted_choices()
+	yield 'alias_sampler_1000', _alias_sampler()
+	yield 'random_100000_scalar', _scalar_random(100000)
+	for backend, use_numpy in (('python', False), ('numpy', True)):
+		yield 'random_array_100000_{0}'.format(backend), _random_array(100000, use_numpy)
+
+def main(names):
+	for name, func in iter_benchmarks():
+		if names and name not in names:
+			continue
+		measure(name, func, number=1)
+
+if __name__ == '__main__': # pragma: no cover
+	main(sys.argv[1:])
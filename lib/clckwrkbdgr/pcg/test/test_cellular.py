@@ -1,5 +1,9 @@
 from clckwrkbdgr import unittest
 import textwrap
+try:
+	import numpy
+except ImportError: # pragma: no cover
+	numpy = None
 from clckwrkbdgr.math import Size, Point, Matrix
 from .._base import RNG
 from .. import cellular
@@ -7,7 +11,7 @@ from .. import cellular
 class TestCave(unittest.TestCase):
 	def should_generate_cave(self):
 		rng = RNG(0)
-		grid = cellular.cave(rng, Size(80, 25))
+		grid = cellular.cave(rng, Size(80, 25), use_numpy=False)
 		self.maxDiff = None
 		expected = textwrap.dedent("""\
 				################################################################################
@@ -37,3 +41,10 @@ class TestCave(unittest.TestCase):
 				################################################################################
 				""")
 		self.assertEqual(grid.tostring(lambda c:'.' if c else '#'), expected)
+	@unittest.skipUnless(numpy, "NumPy is not detected.")
+	def should_generate_the_same_cave_using_numpy(self): # pragma: no cover -- TODO needs mocks instead of just skipping.
+		for size in [Size(80, 25), Size(33, 17)]:
+			for seed in range(3):
+				expected = cellular.cave(RNG(seed), size, use_numpy=False)
+				grid = cellular.cave(RNG(seed), size, use_numpy=True)
+				self.assertEqual(list(grid.data), list(expected.data))
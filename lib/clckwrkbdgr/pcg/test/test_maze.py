@@ -80,3 +80,27 @@ class TestMaze(unittest.TestCase):
 				...#.....#.......#.
 				""")
 		self.assertEqual(layout.tostring(lambda c:'.' if c else '#'), expected)
+
+class TestBacktrackingMaze(unittest.TestCase):
+	def should_generate_maze(self):
+		rng = RNG(0)
+		builder = maze.BacktrackingMaze(rng, Size(21, 9))
+		layout = builder.build()
+		self.maxDiff = None
+		expected = textwrap.dedent("""\
+				...#.............#.
+				.#.#.#####.#####.#.
+				.#...#.....#...#.#.
+				######.#######.#.#.
+				...#...#.......#.#.
+				##.#.###.###.###.#.
+				.....#.....#.......
+				""")
+		self.assertEqual(layout.tostring(lambda c:'.' if c else '#'), expected)
+	def should_visit_every_cell_exactly_once(self):
+		rng = RNG(2087627623)
+		layout = maze.BacktrackingMaze(rng, Size(80, 23)).build()
+		cells = [pos for pos in layout.keys() if pos.x % 2 == 0 and pos.y % 2 == 0]
+		self.assertTrue(all(layout.cell(pos) for pos in cells))
+		passages = sum(1 for pos in layout.keys() if layout.cell(pos))
+		self.assertEqual(passages, 2 * len(cells) - 1) # Spanning tree without loops.
@@ -1,4 +1,8 @@
 from clckwrkbdgr import unittest
+try:
+	import numpy
+except ImportError: # pragma: no cover
+	numpy = None
 from .. import _base as pcg
 from clckwrkbdgr.math import Point, Size, Rect
 
@@ -22,6 +26,59 @@ class TestRNG(unittest.TestCase):
 		self.assertEqual(rng.range(0, 100), 65)
 		rng = pcg.RNG(12345)
 		self.assertEqual(rng.range(20, 100), 72)
+	def _assert_arrays(self, amount, use_numpy):
+		rng, expected = pcg.RNG(12345), pcg.RNG(12345)
+		self.assertEqual(rng.random_array(amount, use_numpy=use_numpy), [expected.get() for _ in range(amount)])
+		self.assertEqual(rng.value, expected.value)
+		self.assertEqual(rng.range_array(-5, 17, amount, use_numpy=use_numpy), [expected.range(-5, 17) for _ in range(amount)])
+		self.assertEqual(rng.value, expected.value)
+	def should_generate_arrays_of_random_values(self):
+		self.assertEqual(pcg.RNG(0).random_array(0), [])
+		self.assertEqual(pcg.RNG(0).range_array(0, 10, -1), [])
+		self._assert_arrays(10, use_numpy=False)
+		self._assert_arrays(1000, use_numpy=False)
+	@unittest.skipUnless(numpy, "NumPy is not detected.")
+	def should_generate_arrays_of_random_values_using_numpy(self): # pragma: no cover -- TODO needs mocks instead of just skipping.
+		self._assert_arrays(10, use_numpy=True)
+		self._assert_arrays(1000, use_numpy=True)
+		self._assert_arrays(4097, use_numpy=True)
+	def should_shuffle_sequence(self):
+		rng = pcg.RNG(12345)
+		items = list(range(10))
+		rng.shuffle(items)
+		expected = list(range(10))
+		expected_rng = pcg.RNG(12345)
+		for index in reversed(range(1, 10)):
+			other = expected_rng.range(index + 1)
+			expected[index], expected[other] = expected[other], expected[index]
+		self.assertEqual(items, expected)
+		self.assertEqual(sorted(items), list(range(10)))
+		self.assertEqual(rng.value, expected_rng.value)
+		items = []
+		rng.shuffle(items)
+		self.assertEqual(items, [])
+	def should_skip_ahead(self):
+		rng = pcg.RNG(12345)
+		expected = pcg.RNG(12345)
+		for _ in range(1000):
+			expected.get()
+		rng.skip(1000)
+		self.assertEqual(rng.value, expected.value)
+		rng.skip(0)
+		self.assertEqual(rng.value, expected.value)
+		rng.skip(1)
+		self.assertEqual(rng.get(), [expected.get(), expected.get()][-1])
+	def should_fork_independent_substreams(self):
+		rng = pcg.RNG(12345)
+		first = rng.fork('overworld')
+		rng.get()
+		second = rng.fork('overworld')
+		self.assertEqual(first.seed, second.seed)
+		self.assertEqual(first.get(), second.get())
+		self.assertEqual(rng.fork(('zone', 1, 2)).seed, pcg.RNG(12345).fork(['zone', 1, 2]).seed)
+		self.assertNotEqual(rng.fork(('zone', 1, 2)).seed, rng.fork(('zone', 2, 1)).seed)
+		self.assertNotEqual(rng.fork('overworld').seed, pcg.RNG(54321).fork('overworld').seed)
+		self.assertEqual(rng.fork('overworld').fork('x').seed, first.fork('x').seed)
 	def should_select_random_item_from_sequence(self):
 		rng = pcg.RNG(12345)
 		self.assertEqual(rng.choice('abcde'), 'd')
@@ -44,12 +101,28 @@ class TestUtils(unittest.TestCase):
 		self.assertEqual(pcg.TryCheck(pcg.point).check(lambda p: p.y > 50).tryouts(2)(rng, Size(80, 25)), Point(24, 16))
 
 class TestPrimitives(unittest.TestCase):
+	def should_calculate_cumulative_weights(self):
+		self.assertEqual(pcg.cumulative_weights([1, 2, 3]), [1, 3, 6])
+		self.assertEqual(pcg.cumulative_weights(iter([5])), [5])
+		self.assertEqual(pcg.cumulative_weights([]), [])
 	def should_select_random_item_based_on_weights(self):
 		rng = pcg.RNG(12345)
 		self.assertEqual(pcg.weighted_choices(rng,
 			[(1, 'a'), (2, 'b'), (3, 'c'), (4, 'd'), (5, 'e')], amount=10),
 						 ['d', 'c', 'e', 'b', 'd', 'd', 'd', 'c', 'c', 'c'],
 						 )
+	def should_select_random_item_using_alias_table(self):
+		with self.assertRaises(ValueError):
+			pcg.AliasSampler([])
+		sampler = pcg.AliasSampler([(1, 'a'), (2, 'b'), (3, 'c'), (4, 'd'), (5, 'e')])
+		self.assertEqual(sampler.aliases, [4, 4, 2, 3, 3])
+		self.assertEqual(sampler.probabilities[2:4], [1.0, 1.0])
+		rng = pcg.RNG(12345)
+		self.assertEqual(sampler.choice(rng), 'd')
+		self.assertEqual(sampler.choices(rng, 9), ['b', 'd', 'e', 'c', 'c', 'd', 'e', 'b', 'e'])
+		sampler = pcg.AliasSampler([(0, 'never'), (1, 'always')])
+		rng = pcg.RNG(0)
+		self.assertEqual(set(sampler.choices(rng, 100)), {'always'})
 	def should_generate_raw_pos(self):
 		rng = pcg.RNG(0)
 		self.assertEqual(pcg.point(rng, Size(80, 25)), Point(0, 16))
@@ -1,8 +1,60 @@
 import os
+import sys
+import io
+import array
+import struct
+import codecs
+import zlib
 import contextlib
+import time
+import timeit
+import threading
+import logging
+Log = logging.getLogger('savefile')
+try:
+	import lzma
+except ImportError: # pragma: no cover
+	lzma = None
 from clckwrkbdgr.math import Point, Size, Matrix
 import vintage
 
+_RAW_TYPES = {str, int, float, type(None)} # Written as is, see Writer.write().
+
+_os_replace = getattr(os, 'replace', None) # Python 3.3+
+
+def _replace_file(src, dst):
+	""" Renames src to dst, overwriting dst if it exists. """
+	if _os_replace is not None:
+		return _os_replace(src, dst)
+	if os.name == 'nt' and os.path.exists(dst): # pragma: no cover -- Windows only.
+		os.unlink(dst)
+	os.rename(src, dst)
+
+class SerializationStats(object):
+	""" Collects number of objects and time spent on their (de)serialization
+	by class name.
+	Times are inclusive, i.e. nested objects are counted in their parent's time too.
+
+	Usage:
+	>>> stats = writer.collect_stats()
+	>>> <save objects>
+	>>> print('\\n'.join(stats.report()))
+	"""
+	def __init__(self):
+		self.counts = {}
+		self.times = {}
+	def add(self, name, seconds):
+		""" Registers one more processed object of given class. """
+		self.counts[name] = self.counts.get(name, 0) + 1
+		self.times[name] = self.times.get(name, 0.0) + seconds
+	def report(self):
+		""" Returns list of lines "<class name>: <count> objects, <total time> ms",
+		the slowest classes first.
+		"""
+		return ['{0}: {1} objects, {2:.3f} ms'.format(name, self.counts[name], 1000.0 * self.times[name])
+			for name in sorted(self.times, key=lambda name: (-self.times[name], name))
+			]
+
 class AutoSavefile:
 	""" Context manager to automatically load/save object from savefile.
 
@@ -36,45 +88,69 @@ class AutoSavefile:
 class StreamReader:
 	""" Provides read access to savefile (file-like object).
 	Savefile version is available as field .version
+	See collect_stats() to measure time spent on loading of custom types.
 	"""
-	CHUNK_SIZE = 4096
+	CHUNK_SIZE = 65536
+	stats = None
 	def __init__(self, f):
 		""" Initializes reader over file and reads version.
 		If f is an iterator, it should be over list of string values.
 		"""
 		self._buffer = ''
+		self._values = []
 		self.stream = f
 		self.version = self.read_int()
 		self.meta_info = {}
-	def set_meta_info(self, name, value): # pragma: no cover -- TODO
+	def collect_stats(self, stats=None):
+		""" Starts measuring time spent on loading of objects of custom types
+		(see read()) by their actual class.
+		Returns SerializationStats (new one, if not specified), also available as .stats
+		Regular reading is not affected until stats are requested.
+		"""
+		self.stats = stats or SerializationStats()
+		self.read = self._read_measured
+		return self.stats
+	def _read_measured(self, custom_type=None, optional=False):
+		if not (custom_type and hasattr(custom_type, 'load')):
+			return type(self).read(self, custom_type, optional=optional)
+		start = timeit.default_timer()
+		obj = type(self).read(self, custom_type, optional=optional)
+		if obj is not None:
+			self.stats.add(type(obj).__name__, timeit.default_timer() - start)
+		return obj
+	def set_meta_info(self, name, value):
 		""" Registers meta info for custom readers (see read()). """
 		self.meta_info[name] = value
-	def get_meta_info(self, name): # pragma: no cover -- TODO
+	def get_meta_info(self, name):
 		""" Should be used from within custom reader to get associated meta info
 		(see read()).
 		"""
 		return self.meta_info[name]
 	def read_raw(self):
-		""" Reads raw data unit. """
-		if not self._buffer:
-			self._buffer = self.stream.read(self.CHUNK_SIZE)
-			assert self._buffer
-		data = None
+		""" Reads raw data unit.
+		Each chunk is split only once, complete values are kept in a list
+		(in reversed order, to be popped) and only the incomplete tail
+		is carried over to the next chunk.
+		"""
+		if self._values:
+			return self._values.pop()
 		while True:
-			try:
-				data, self._buffer = self._buffer.split('\0', 1)
-				break
-			except ValueError:
-				new_chunk = self.stream.read(self.CHUNK_SIZE)
-				if not new_chunk:
-					data = self._buffer
-					break
-				self._buffer += new_chunk
-		return data
+			new_chunk = self.stream.read(self.CHUNK_SIZE)
+			if not new_chunk:
+				assert self._buffer
+				data, self._buffer = self._buffer, ''
+				return data
+			values = (self._buffer + new_chunk).split('\0')
+			self._buffer = values.pop()
+			if values:
+				values.reverse()
+				self._values = values
+				return values.pop()
 	def read(self, custom_type=None, optional=False):
 		""" Reads current value from stream.
 		If custom_type is specified:
 		- if it has class method .load(<reader>), it is used instead;
+		- bool values are read via read_bool();
 		- otherwise value is cast to that type directly.
 		Custom loaders should create and return fully-prepared objects.
 		If any external data is needed for deserialization, it can be
@@ -87,6 +163,8 @@ class StreamReader:
 		if optional:
 			if not self.read_bool():
 				return None
+		if custom_type is bool:
+			return self.read_bool()
 		if custom_type and hasattr(custom_type, 'load'):
 			return custom_type.load(self)
 		value = self.read_raw()
@@ -118,20 +196,31 @@ class StreamReader:
 		Otherwise it is considered built-in type.
 		"""
 		count = self.read_int()
-		result = []
-		for _ in range(count):
-			result.append(self.read(element_type))
-		return result
-	def read_matrix(self, element_type=None):
+		read = self.read_raw if element_type is None else lambda: self.read(element_type)
+		return [read() for _ in range(count)]
+	def read_matrix(self, element_type=None, typecode=None):
 		""" Reads matrix of elements: Size.
 		If element_type is specified, its load() is used.
 		Otherwise it is considered built-in type.
+		If typecode is specified, creates Matrix with typed storage (see Matrix).
 		"""
 		size = self.read_size()
-		result = Matrix(size, None)
+		result = Matrix(size, None, typecode=typecode)
+		read = self.read_raw if element_type is None else lambda: self.read(element_type)
 		for _ in range(size.width * size.height):
-			result.data[_] = self.read(element_type)
+			result.data[_] = read()
 		return result
+	def read_section(self):
+		""" Reads section written by Writer.write_section() without parsing it.
+		Returns Section object to load actual data on demand.
+		"""
+		count = self.read_int()
+		return Section('\0'.join([self.read_raw() for _ in range(count)]), self)
+	def _open_section(self, data):
+		values = data.split('\0')
+		reader = StreamReader(io.StringIO(values[0]))
+		reader._values = values[:0:-1]
+		return reader
 
 class Reader(StreamReader): # pragma: no cover -- deprecated
 	def __init__(self, f):
@@ -145,20 +234,78 @@ class Reader(StreamReader): # pragma: no cover -- deprecated
 	def read_raw(self):
 		return next(self.stream)
 
+class Section(object):
+	""" Serialized data of a self-contained section:
+	either read but not parsed yet (see StreamReader.read_section())
+	or just written (see Writer.write_section()).
+	Section can be written again as is, without re-serializing the original object.
+	Data is a string for text savefiles and bytes for binary savefiles.
+	"""
+	def __init__(self, data, reader=None):
+		self.data = data
+		self.reader = reader
+	def get_reader(self):
+		""" Returns new reader over section data to load actual objects.
+		Available only for sections that were read.
+		Meta info (and stats, if collected) are shared with the original reader.
+		"""
+		reader = self.reader._open_section(self.data)
+		reader.meta_info = self.reader.meta_info
+		if self.reader.stats is not None:
+			reader.collect_stats(self.reader.stats)
+		return reader
+
+def _compile_write_plan(item_type):
+	""" Returns name of Writer method to write items of given type.
+	Each type is inspected only once per writer, see Writer.write().
+	"""
+	if hasattr(item_type, 'save'):
+		return '_write_saveable'
+	for base, method in (
+			(bool, 'write_bool'),
+			(Point, 'write_point'),
+			(Size, 'write_size'),
+			(list, 'write_list'),
+			(Matrix, 'write_matrix'),
+			):
+		if issubclass(item_type, base):
+			return method
+	return 'write_raw'
+
 class Writer:
 	""" Provides read access to savefile (file-like object).
 	Savefile version is available as field .version
+	See collect_stats() to measure time spent on saving of custom types.
 	"""
+	_STREAM = io.StringIO # For nested writers, see write_section().
+	stats = None
 	def __init__(self, f, version):
 		""" Initializes writer over stream and writes version.
 		"""
 		self.version = version
 		self.f = f
+		self._plans = {} # Item class: bound method to write it, see write().
 		self.f.write(str(version))
+	def collect_stats(self, stats=None):
+		""" Starts measuring time spent on saving of items with custom save()
+		by their class.
+		Returns SerializationStats (new one, if not specified), also available as .stats
+		Regular writing is not affected until stats are requested.
+		"""
+		self.stats = stats or SerializationStats()
+		self.write = self._write_measured
+		return self.stats
+	def _write_measured(self, item, optional=False):
+		if type(item) in _RAW_TYPES or self._get_plan(type(item)) != self._write_saveable:
+			return type(self).write(self, item, optional=optional)
+		start = timeit.default_timer()
+		type(self).write(self, item, optional=optional)
+		self.stats.add(type(item).__name__, timeit.default_timer() - start)
 	def write(self, item, optional=False):
 		""" Writes string representation of item to the file.
 		Several built-in types are recognized as special serialization.
 		Additional, if item has method save(<writer>), it is used instead.
+		Method is resolved only once for each item class.
 
 		If optional is True, detects if item is None and writes flag False.
 		Otherwise, is item is not None, writes flag True and the serializes item.
@@ -167,19 +314,19 @@ class Writer:
 			if item is None:
 				return self.write_bool(False)
 			self.write_bool(True)
-		if hasattr(item, 'save'):
-			return item.save(self)
-		if isinstance(item, bool):
-			return self.write_bool(item)
-		if isinstance(item, Point):
-			return self.write_point(item)
-		if isinstance(item, Size):
-			return self.write_size(item)
-		if isinstance(item, list):
-			return self.write_list(item)
-		if isinstance(item, Matrix):
-			return self.write_matrix(item)
-		return self.write_raw(item)
+		if type(item) in _RAW_TYPES:
+			return self.write_raw(item)
+		return self._get_plan(type(item))(item)
+	def _get_plan(self, item_type):
+		plan = self._plans.get(item_type)
+		if plan is None:
+			plan = self._plans[item_type] = getattr(self, _compile_write_plan(item_type))
+		return plan
+	def _write_saveable(self, item):
+		return item.save(self)
+	def flush(self):
+		""" Flushes buffered data (if any) to the stream. """
+		pass
 	def write_raw(self, item):
 		""" Writer RAW string representation of the value. """
 		self.f.write('\0')
@@ -203,19 +350,461 @@ class Writer:
 	def write_matrix(self, matrix):
 		""" Writes size of the matrix and then each item consequently. """
 		self.write(matrix.size)
-		for cell in matrix.data:
+		for cell in matrix.values():
 			self.write(cell)
+	def _write_nested(self, item):
+		""" Returns data of item written by separate writer of the same type. """
+		writer = type(self)(self._STREAM(), self.version)
+		if self.stats is not None:
+			writer.collect_stats(self.stats)
+		writer.write(item)
+		writer.flush()
+		return writer.f.getvalue()
+	def write_section(self, item):
+		""" Writes item as a self-contained section, which could be skipped on reading
+		and parsed later on demand (see StreamReader.read_section()).
+		Sections (see Section) are written back as is.
+		Stored as number of values followed by values themselves (starting with version).
+		Returns Section with written data.
+		"""
+		if not isinstance(item, Section):
+			data = self._write_nested(item)
+		elif isinstance(item.data, bytes):
+			raise ValueError('Cannot write section of binary savefile to text savefile.')
+		else:
+			data = item.data
+		self.write_raw(data.count('\0') + 1)
+		self.f.write('\0')
+		self.f.write(data)
+		return Section(data)
+
+# Binary format: every value is prefixed with a one-byte tag.
+# Strings are stored once, repeated strings are stored as back references (by index).
+_NONE, _INT, _FLOAT, _STR, _REF, _ARRAY, _BITS, _STRINGS = range(8)
+_PACKED_TAGS = (_ARRAY, _BITS, _STRINGS)
+_DOUBLE = struct.Struct('<d')
+# Typecodes with platform-dependent item size are stored as fixed-size ones.
+_FIXED_TYPECODES = {'l':'q', 'L':'Q'}
+_INT_TYPECODES = [('b', -2**7, 2**7), ('h', -2**15, 2**15), ('i', -2**31, 2**31), ('q', -2**63, 2**63)]
+# Unpacked bits (one byte per bit) for every value of a packed byte, and vice versa.
+_BYTE_BITS = [bytes(bytearray((byte >> bit) & 1 for bit in range(8))) for byte in range(256)]
+_BITS_BYTE = dict((bits, byte) for byte, bits in enumerate(_BYTE_BITS))
+
+def _as_text(value):
+	""" Returns value as it would be read from text savefile. """
+	if isinstance(value, str):
+		return value
+	return str(value)
+
+def _get_converter(custom_type):
+	""" Returns function to convert raw binary value to custom type
+	in the same way StreamReader.read() treats text values.
+	"""
+	if custom_type is None:
+		return _as_text
+	if custom_type is bool:
+		return lambda value: value == 1 or value == '1'
+	if isinstance(custom_type, type):
+		return custom_type
+	return lambda value: custom_type(_as_text(value))
+
+def _pack_bits(values):
+	""" Packs sequence of bool-like values into bytes (eight per byte). """
+	values = bytes(bytearray(1 if value else 0 for value in values))
+	values += b'\0' * (-len(values) % 8)
+	return bytes(bytearray(_BITS_BYTE[values[index:index+8]] for index in range(0, len(values), 8)))
+
+def _unpack_bits(packed, count):
+	""" Returns bytearray of 0/1 values. """
+	return bytearray(b''.join(_BYTE_BITS[byte] for byte in bytearray(packed))[:count])
+
+def _to_little_endian(values):
+	if sys.byteorder == 'big': # pragma: no cover -- TODO no big-endian test platform.
+		values = array.array(values.typecode, values)
+		values.byteswap()
+	return values
+
+def _get_packed_array(matrix):
+	""" Returns values of typed (except bools) or int matrix as array.array
+	or None if they could not be packed.
+	"""
+	if matrix.typecode:
+		typecode = _FIXED_TYPECODES.get(matrix.typecode, matrix.typecode)
+		if isinstance(matrix.data, array.array) and matrix.data.typecode == typecode:
+			return matrix.data
+		return array.array(typecode, matrix.data.tolist() if hasattr(matrix.data, 'tolist') else matrix.data)
+	if any(type(value) is not int for value in matrix.data):
+		return None
+	min_value, max_value = min(matrix.data), max(matrix.data)
+	for typecode, lower, upper in _INT_TYPECODES:
+		if lower <= min_value and max_value < upper:
+			return array.array(typecode, matrix.data)
+	return None
+
+class BinaryReader(StreamReader):
+	""" Provides read access to binary savefile (file-like object over bytes).
+	Values are returned in the same form as for the text savefile,
+	so the same load() methods work with both formats.
+	See BinaryWriter for details on format.
+	"""
+	def __init__(self, f):
+		""" Initializes reader over binary stream and reads version. """
+		self._buffer = bytearray()
+		self._pos = 0
+		self._strings = []
+		self.stream = f
+		self.version = self.read_int()
+		self.meta_info = {}
+	def _fill(self, size):
+		""" Tries to make at least size bytes available in buffer after cursor.
+		Returns False if there is less data left in the stream.
+		"""
+		while len(self._buffer) - self._pos < size:
+			new_chunk = self.stream.read(max(self.CHUNK_SIZE, size))
+			if not new_chunk:
+				return False
+			self._buffer = self._buffer[self._pos:] + bytearray(new_chunk)
+			self._pos = 0
+		return True
+	def _read_bytes(self, size):
+		if not self._fill(size):
+			raise EOFError('Unexpected end of binary savefile.')
+		data = self._buffer[self._pos:self._pos + size]
+		self._pos += size
+		return bytes(data)
+	def _read_varint(self):
+		result, shift = 0, 0
+		while True:
+			byte = bytearray(self._read_bytes(1))[0]
+			result |= (byte & 0x7f) << shift
+			if byte < 0x80:
+				return result
+			shift += 7
+	def _read_packed(self, tag):
+		""" Returns array.array (or bytearray for bits, or list for strings). """
+		if tag == _STRINGS:
+			strings = [self.read_raw() for _ in range(self._read_varint())]
+			return [strings[index] for index in self.read_raw()]
+		if tag == _BITS:
+			count = self._read_varint()
+			return _unpack_bits(self._read_bytes((count + 7) // 8), count)
+		typecode = str(self._read_bytes(1).decode('ascii'))
+		values = array.array(typecode)
+		values.frombytes(self._read_bytes(self._read_varint() * values.itemsize))
+		return _to_little_endian(values)
+	def _read_value(self):
+		""" Reads tagged value of any type. """
+		tag = bytearray(self._read_bytes(1))[0]
+		if tag == _NONE:
+			return None
+		if tag == _FLOAT:
+			return _DOUBLE.unpack(self._read_bytes(_DOUBLE.size))[0]
+		if tag in _PACKED_TAGS:
+			return self._read_packed(tag)
+		number = self._read_varint()
+		if tag == _INT:
+			return (number >> 1) if not (number & 1) else -((number + 1) >> 1)
+		if tag == _REF:
+			return self._strings[number]
+		if tag == _STR:
+			value = self._read_bytes(number).decode('utf-8')
+			self._strings.append(value)
+			return value
+		raise ValueError('Unknown value tag in binary savefile: {0}'.format(tag))
+	def read_raw(self):
+		""" Reads raw data unit: None, int, float, string
+		(or array/bytearray for packed matrix data).
+		"""
+		buffer, pos = self._buffer, self._pos
+		if pos + 1 >= len(buffer):
+			self._fill(2)
+			buffer, pos = self._buffer, self._pos
+		# Fast path: most of values are small ints and repeated strings,
+		# i.e. tag and a single-byte varint.
+		if pos + 1 < len(buffer) and buffer[pos + 1] < 0x80:
+			tag = buffer[pos]
+			if tag == _REF:
+				self._pos = pos + 2
+				return self._strings[buffer[pos + 1]]
+			if tag == _INT:
+				self._pos = pos + 2
+				number = buffer[pos + 1]
+				return (number >> 1) if not (number & 1) else -((number + 1) >> 1)
+		return self._read_value()
+	def _read_text(self):
+		""" Reads value as it would be read from text savefile. """
+		value = self.read_raw()
+		return value if isinstance(value, str) else _as_text(value)
+	def read(self, custom_type=None, optional=False):
+		""" Reads current value from stream.
+		See StreamReader.read() for details.
+		"""
+		if optional:
+			if not self.read_bool():
+				return None
+		if custom_type and hasattr(custom_type, 'load'):
+			return custom_type.load(self)
+		value = self.read_raw()
+		if custom_type is None and isinstance(value, str):
+			return value
+		return _get_converter(custom_type)(value)
+	def read_int(self):
+		""" Reads value as integer. """
+		return int(self.read_raw())
+	def read_str(self):
+		""" Reads value as string.
+		Recognizes None.
+		"""
+		value = self.read_raw()
+		if value is None or value == 'None':
+			return None
+		return _as_text(value)
+	def read_bool(self):
+		""" Reads value as bool. """
+		value = self.read_raw()
+		return value == 1 or value == '1'
+	def read_list(self, element_type=None):
+		""" Reads list of elements: int len.
+		See StreamReader.read_list() for details.
+		"""
+		count = self.read_int()
+		read = self._read_text if element_type is None else lambda: self.read(element_type)
+		return [read() for _ in range(count)]
+	def read_matrix(self, element_type=None, typecode=None):
+		""" Reads matrix of elements: Size.
+		Packed matrix data (see BinaryWriter.write_matrix()) is unpacked at once.
+		See StreamReader.read_matrix() for details.
+		"""
+		size = self.read_size()
+		result = Matrix(size, None, typecode=typecode)
+		if not self._fill(1):
+			raise EOFError('Unexpected end of binary savefile.')
+		tag = self._buffer[self._pos]
+		if tag not in _PACKED_TAGS:
+			read = self._read_text if element_type is None else lambda: self.read(element_type)
+			for _ in range(size.width * size.height):
+				result.data[_] = read()
+			return result
+		self._pos += 1
+		values = self._read_packed(tag)
+		if element_type is bool and tag == _BITS:
+			result.data = values if typecode == '?' else [bool(value) for value in values]
+		elif element_type is int and tag == _ARRAY and typecode:
+			result.data = values if values.typecode == typecode else array.array(typecode, values)
+		elif element_type is int and tag == _ARRAY:
+			result.data = values.tolist()
+		elif element_type is None and tag == _STRINGS and not typecode:
+			result.data = values
+		else:
+			convert = _get_converter(element_type)
+			for index, value in enumerate(values):
+				result.data[index] = convert(value)
+		return result
+	def read_section(self):
+		""" Reads section written by BinaryWriter.write_section() without parsing it.
+		Returns Section object to load actual data on demand.
+		"""
+		return Section(self._read_bytes(self.read_int()), self)
+	def _open_section(self, data):
+		return BinaryReader(io.BytesIO(data))
+
+class BinaryWriter(Writer):
+	""" Provides write access to binary savefile (file-like object over bytes).
+
+	Each value is stored with one-byte type tag:
+	- None;
+	- int: zigzag-encoded varint (bools are stored as ints);
+	- float: 8-byte IEEE double;
+	- string: varint length and UTF-8 bytes (any other object is stored as str()),
+	  repeated strings are stored as varint index of the first occurrence;
+	- packed array of ints/floats (for typed or int matrices);
+	- packed bits (for bool matrices);
+	- list of distinct strings and packed array of their indexes (for string matrices).
+	Data is buffered, call flush() at the end.
+	"""
+	CHUNK_SIZE = 65536
+	_STREAM = io.BytesIO
+	def __init__(self, f, version):
+		""" Initializes writer over binary stream and writes version. """
+		self.version = version
+		self.f = f
+		self._buffer = bytearray()
+		self._strings = {}
+		self._plans = {}
+		self.write_raw(version)
+	def flush(self):
+		""" Writes buffered data to the stream. """
+		if self._buffer:
+			self.f.write(bytes(self._buffer))
+			self._buffer = bytearray()
+	def _write_varint(self, value):
+		buffer = self._buffer
+		while value >= 0x80:
+			buffer.append((value & 0x7f) | 0x80)
+			value >>= 7
+		buffer.append(value)
+	def write_raw(self, item):
+		""" Writes tagged binary representation of the value. """
+		if len(self._buffer) >= self.CHUNK_SIZE:
+			self.flush()
+		buffer = self._buffer
+		if item is None:
+			buffer.append(_NONE)
+			return
+		if isinstance(item, int):
+			buffer.append(_INT)
+			number = (item << 1) if item >= 0 else ((-item << 1) - 1)
+			if number < 0x80:
+				buffer.append(number)
+			else:
+				self._write_varint(number)
+			return
+		if isinstance(item, float):
+			buffer.append(_FLOAT)
+			buffer.extend(_DOUBLE.pack(item))
+			return
+		item = str(item)
+		index = self._strings.get(item)
+		if index is None:
+			self._strings[item] = len(self._strings)
+			data = item.encode('utf-8')
+			buffer.append(_STR)
+			self._write_varint(len(data))
+			buffer.extend(data)
+		elif index < 0x80:
+			buffer.append(_REF)
+			buffer.append(index)
+		else:
+			buffer.append(_REF)
+			self._write_varint(index)
+	def _write_array(self, values):
+		self._buffer.append(_ARRAY)
+		self._buffer.extend(values.typecode.encode('ascii'))
+		self._write_varint(len(values))
+		self._buffer.extend(_to_little_endian(values).tobytes())
+	def write_matrix(self, matrix):
+		""" Writes size of the matrix and then its values.
+		Bool matrices are packed as bits,
+		typed (see Matrix) and int matrices are packed as arrays,
+		string matrices are packed as distinct strings and array of indexes,
+		other matrices are written cell by cell.
+		"""
+		self.write(matrix.size)
+		if matrix.typecode == '?' or all(type(value) is bool for value in matrix.data):
+			self._buffer.append(_BITS)
+			self._write_varint(len(matrix.data))
+			self._buffer.extend(_pack_bits(matrix.data))
+			return self.flush()
+		values = _get_packed_array(matrix)
+		if values is not None:
+			self._write_array(values)
+			return self.flush()
+		if not all(type(value) is str for value in matrix.data):
+			for cell in matrix.values():
+				self.write(cell)
+			return
+		strings = {}
+		indexes = [strings.setdefault(value, len(strings)) for value in matrix.data]
+		self._buffer.append(_STRINGS)
+		self._write_varint(len(strings))
+		for value, _ in sorted(strings.items(), key=lambda item: item[1]):
+			self.write_raw(value)
+		self._write_array(array.array('B' if len(strings) <= 0x100 else 'i', indexes))
+		self.flush()
+	def write_section(self, item):
+		""" Writes item as a self-contained section (see Writer.write_section()).
+		Stored as byte size followed by binary data of the section (starting with version).
+		Each section has its own table of strings.
+		Returns Section with written data.
+		"""
+		if not isinstance(item, Section):
+			data = self._write_nested(item)
+		elif not isinstance(item.data, bytes):
+			raise ValueError('Cannot write section of text savefile to binary savefile.')
+		else:
+			data = item.data
+		self.write_raw(len(data))
+		self._buffer.extend(data)
+		return Section(data)
+
+class _TextStream(object):
+	""" Text stream over binary file with already read first bytes. """
+	def __init__(self, f, prefix):
+		self.f = f
+		self.prefix = prefix
+		self.decoder = codecs.getincrementaldecoder('utf-8')()
+	def read(self, size):
+		while True:
+			data = self.f.read(size)
+			if self.prefix:
+				data, self.prefix = self.prefix + data, b''
+			text = self.decoder.decode(data, final=not data)
+			if text or not data:
+				return text
+
+_COMPRESSION = {
+		None : 0,
+		'zlib' : 1,
+		'lzma' : 2,
+		}
+
+def _make_compressor(compression):
+	if compression == 'zlib':
+		return zlib.compressobj()
+	return lzma.LZMACompressor()
+
+def _make_decompressor(compression):
+	if compression == 'zlib':
+		return zlib.decompressobj()
+	return lzma.LZMADecompressor()
+
+class _CompressingStream(object):
+	""" Write-only stream that compresses data on the fly. """
+	def __init__(self, f, compression):
+		self.f = f
+		self.compressor = _make_compressor(compression)
+	def write(self, data):
+		self.f.write(self.compressor.compress(data))
+	def close(self):
+		self.f.write(self.compressor.flush())
+
+class _DecompressingStream(object):
+	""" Read-only stream that decompresses data on the fly. """
+	def __init__(self, f, compression):
+		self.f = f
+		self.decompressor = _make_decompressor(compression)
+	def read(self, size):
+		while True:
+			data = self.f.read(size)
+			if not data:
+				return b''
+			data = self.decompressor.decompress(data)
+			if data:
+				return data
 
 class Savefile:
 	""" Versioned save file to serialize/deserialize objects.
 	Provides wrapper interface for Reader/Writer objects.
 
 	Default implementation is a text file: set of string values separated by NULL character.
+	If binary is True, values are saved in binary format (see BinaryWriter),
+	optionally compressed ('zlib' or 'lzma', if available).
+	Format is detected automatically on loading.
 
 	See load()/save()
 	"""
-	def __init__(self, filename):
+	BINARY_MAGIC = b'\0SAV'
+	BINARY_FORMAT_VERSION = 1
+	def __init__(self, filename, binary=False, compression=None):
+		if compression not in _COMPRESSION:
+			raise ValueError('Unknown compression: {0}'.format(compression))
+		if compression and not binary:
+			raise ValueError('Compression is supported only for binary savefiles.')
+		if compression == 'lzma' and lzma is None: # pragma: no cover
+			raise ValueError('LZMA compression is not available.')
 		self.filename = str(filename)
+		self.binary = binary
+		self.compression = compression
 	def exists(self):
 		""" Should return True if file exists. """
 		return os.path.exists(self.filename)
@@ -242,8 +831,18 @@ class Savefile:
 		if not self.exists():
 			yield None
 			return
-		with open(self.filename, 'r') as f:
-			yield StreamReader(f)
+		with open(self.filename, 'rb') as f:
+			header = f.read(len(self.BINARY_MAGIC))
+			if header != self.BINARY_MAGIC:
+				yield StreamReader(_TextStream(f, header))
+				return
+			format_version, compression = bytearray(f.read(2))
+			if format_version != self.BINARY_FORMAT_VERSION:
+				raise ValueError('Unsupported binary savefile format: {0}'.format(format_version))
+			compression = next(name for name, value in _COMPRESSION.items() if value == compression)
+			if compression:
+				f = _DecompressingStream(f, compression)
+			yield BinaryReader(f)
 	@contextlib.contextmanager
 	def save(self, version):
 		""" Should be used as context manager.
@@ -251,19 +850,134 @@ class Savefile:
 		Automatically closes file upon exiting context.
 		"""
 		try:
-			with open(self.filename, 'w') as f:
-				writer = Writer(f, version)
+			with self._open_for_writing(self.filename) as f:
+				stream = f
+				if self.binary:
+					f.write(self._get_binary_header())
+					if self.compression:
+						stream = _CompressingStream(f, self.compression)
+					writer = BinaryWriter(stream, version)
+				else:
+					writer = Writer(f, version)
 				yield writer
-				# Otherwise if stream ends with a series of empty values
-				# separated by \x00, that tail would be cut off
-				# on the next loading.
-				# File should be ended with something non-NULL.
-				writer.write('EOF')
+				self._finalize(writer)
+				if stream is not f:
+					stream.close()
 		except:
 			self.unlink()
 			raise
+	def _open_for_writing(self, filename):
+		# Text savefiles are always read back as UTF-8 without newline translation
+		# (see _TextStream), so they should be written the same way
+		# regardless of locale and platform.
+		if self.binary:
+			return open(filename, 'wb')
+		return io.open(filename, 'w', encoding='utf-8', newline='')
+	def _get_binary_header(self):
+		return self.BINARY_MAGIC + bytes(bytearray([self.BINARY_FORMAT_VERSION, _COMPRESSION[self.compression]]))
+	def _finalize(self, writer):
+		# Otherwise if stream ends with a series of empty values
+		# separated by \x00, that tail would be cut off
+		# on the next loading.
+		# File should be ended with something non-NULL.
+		writer.write('EOF')
+		writer.flush()
+	def make_snapshot(self, version, obj):
+		""" Serializes object (using obj.save(<writer>)) into memory.
+		Returns data that could be written to the file later (see write_snapshot()),
+		e.g. in background thread while object keeps changing.
+		"""
+		writer = BinaryWriter(io.BytesIO(), version) if self.binary else Writer(io.StringIO(), version)
+		obj.save(writer)
+		self._finalize(writer)
+		return writer.f.getvalue()
+	def write_snapshot(self, data):
+		""" Writes data of make_snapshot() to the file (compressing it, if needed).
+		Data is written to a temporary file first, which then replaces the savefile,
+		so the previous save stays intact if writing fails.
+		"""
+		temp_filename = self.filename + '.tmp'
+		try:
+			with self._open_for_writing(temp_filename) as f:
+				if self.binary:
+					f.write(self._get_binary_header())
+					if self.compression:
+						compressor = _make_compressor(self.compression)
+						data = compressor.compress(data) + compressor.flush()
+				f.write(data)
+			_replace_file(temp_filename, self.filename)
+		except:
+			if os.path.exists(temp_filename):
+				os.unlink(temp_filename)
+			raise
 	def unlink(self):
 		""" Removes save file if exists. """
 		if not self.exists():
 			return
 		os.unlink(self.filename)
+
+class BackgroundSaver(object):
+	""" Periodically saves object to the savefile without blocking the caller for long.
+	Object is serialized in the calling thread (see Savefile.make_snapshot()),
+	so it should support fast incremental saving to keep the pause short;
+	compression and writing to the file are performed in background thread.
+
+	Usage:
+	>>> saver = BackgroundSaver(savefile, <version>, interval=300)
+	>>> <in main loop>: saver.update(obj)
+	>>> saver.wait() # Before exit or final save.
+	"""
+	def __init__(self, savefile, version, interval):
+		""" Interval is a minimal time (in seconds) between saves. """
+		self.savefile = savefile
+		self.version = version
+		self.interval = interval
+		self.last_save_time = time.time()
+		self._thread = None
+		self._error = None
+	def update(self, obj):
+		""" Saves object if interval has passed since the last save
+		and previous save is finished.
+		Errors (of this or previous save) are logged, not raised,
+		so autosave never breaks the caller.
+		Returns True if saving was started.
+		"""
+		if time.time() - self.last_save_time < self.interval:
+			return False
+		if self._thread is not None and self._thread.is_alive():
+			return False
+		self.last_save_time = time.time()
+		try:
+			self.wait()
+		except Exception as e:
+			Log.error('Autosave failed: {0}'.format(e))
+		try:
+			self.save(obj)
+		except Exception as e:
+			Log.error('Autosave failed: {0}'.format(e))
+			return False
+		return True
+	def save(self, obj):
+		""" Takes snapshot of the object and starts writing it in background.
+		Waits for the previous save to finish first.
+		"""
+		data = self.savefile.make_snapshot(self.version, obj)
+		self.wait()
+		self._thread = threading.Thread(target=self._write, args=(data,))
+		self._thread.start()
+		self.last_save_time = time.time()
+	def _write(self, data):
+		try:
+			self.savefile.write_snapshot(data)
+		except Exception as e:
+			self._error = e
+	def wait(self):
+		""" Waits for the current save (if any) to finish.
+		Re-raises error from background thread, if there was any.
+		"""
+		if self._thread is not None:
+			self._thread.join()
+			self._thread = None
+		error, self._error = self._error, None
+		if error is not None:
+			raise error
@@ -0,0 +1,101 @@
+""" Benchmarks for clckwrkbdgr.serialize.
+Not a part of the test suite, should be run manually:
+
+  python -m clckwrkbdgr.serialize.test.benchmark [name ...]
+
+By default runs all benchmarks.
+"""
+from __future__ import print_function
+import sys
+import zlib
+from io import BytesIO
+try:
+	from cStringIO import StringIO
+except ImportError: # pragma: no cover
+	from io import StringIO
+from clckwrkbdgr.math import Point, Size, Matrix
+from clckwrkbdgr.math.test.benchmark import measure
+from clckwrkbdgr.serialize.stream import StreamReader, Writer, BinaryReader, BinaryWriter
+
+class _SplittingReader(StreamReader):
+	""" Previous implementation: splits (copies) the whole buffer for every value. """
+	CHUNK_SIZE = 4096
+	def read_raw(self):
+		if not self._buffer:
+			self._buffer = self.stream.read(self.CHUNK_SIZE)
+		while True:
+			try:
+				data, self._buffer = self._buffer.split('\0', 1)
+				return data
+			except ValueError:
+				new_chunk = self.stream.read(self.CHUNK_SIZE)
+				if not new_chunk:
+					data, self._buffer = self._buffer, ''
+					return data
+				self._buffer += new_chunk
+
+def _make_data(size):
+	""" Returns a map of given size, a bool matrix of visited cells
+	and a list of objects (one per 16 cells).
+	"""
+	visited = Matrix(size, False, typecode='?')
+	for pos in visited.size.iter_points():
+		visited.set_cell(pos, pos.x % 3 == 0)
+	objects = [Point(x, y) for y in range(0, size.height, 4) for x in range(0, size.width, 4)]
+	return Matrix(size, '.'), visited, objects
+
+def _make_save(data, writer_type=Writer, stream_type=StringIO):
+	""" Returns content of a savefile with given data (see _make_data()). """
+	terrain, visited, objects = data
+	stream = stream_type()
+	writer = writer_type(stream, 1)
+	writer.write(terrain)
+	writer.write(visited)
+	writer.write(len(objects))
+	for pos in objects:
+		writer.write(pos)
+		writer.write('object name')
+	writer.write('EOF')
+	writer.flush()
+	return stream.getvalue()
+
+def _save(data, writer_type, stream_type):
+	return lambda: _make_save(data, writer_type, stream_type)
+
+def _load(data, reader_type, stream_type=StringIO):
+	def _read():
+		reader = reader_type(stream_type(data))
+		reader.read_matrix()
+		reader.read_matrix(bool, typecode='?')
+		for _ in range(reader.read_int()):
+			reader.read_point()
+			reader.read()
+		assert reader.read() == 'EOF'
+	return _read
+
+SAVE_SIZES = [Size(256, 256), Size(1024, 1024)]
+
+def iter_benchmarks():
+	""" Yields pairs (name, callable). """
+	for size in SAVE_SIZES:
+		name = '{0}x{1}'.format(size.width, size.height)
+		save_data = _make_data(size)
+		data = _make_save(save_data)
+		binary_data = _make_save(save_data, BinaryWriter, BytesIO)
+		print('{0}: text {1} bytes, binary {2} bytes, binary+zlib {3} bytes'.format(
+			name, len(data), len(binary_data), len(zlib.compress(binary_data)),
+			))
+		yield 'save_{0}_text'.format(name), _save(save_data, Writer, StringIO)
+		yield 'save_{0}_binary'.format(name), _save(save_data, BinaryWriter, BytesIO)
+		yield 'load_{0}_split'.format(name), _load(data, _SplittingReader)
+		yield 'load_{0}_text'.format(name), _load(data, StreamReader)
+		yield 'load_{0}_binary'.format(name), _load(binary_data, BinaryReader, BytesIO)
+
+def main(names):
+	for name, func in iter_benchmarks():
+		if names and name not in names:
+			continue
+		measure(name, func, number=1)
+
+if __name__ == '__main__': # pragma: no cover
+	main(sys.argv[1:])
@@ -1,13 +1,16 @@
 from clckwrkbdgr import unittest
 from clckwrkbdgr.unittest import mock
-import os, sys, tempfile
+import os, sys, tempfile, shutil, threading
+from io import BytesIO
 try:
 	from cStringIO import StringIO
 except: # pragma: no cover
 	from io import StringIO
 BUILTIN_OPEN = 'builtins.open' if sys.version_info[0] >= 3 else '__builtin__.open'
 from ..stream import StreamReader, Writer
-from ..stream import Savefile, AutoSavefile
+from ..stream import BinaryReader, BinaryWriter
+from ..stream import Savefile, AutoSavefile, SerializationStats, Section
+from ..stream import BackgroundSaver
 from clckwrkbdgr.math import Point, Size, Matrix
 
 class MockSerializableObject:
@@ -21,6 +24,23 @@ class MockSerializableObject:
 		writer.write(self.value)
 		writer.write(self.data)
 
+class MockPoint(Point):
+	pass
+
+class TestSerializationStats(unittest.TestCase):
+	def should_report_slowest_classes_first(self):
+		stats = SerializationStats()
+		stats.add('Floor', 0.001)
+		stats.add('Wall', 0.0005)
+		stats.add('Floor', 0.002)
+		stats.add('Door', 0.0005)
+		self.assertEqual(stats.counts, {'Floor':2, 'Wall':1, 'Door':1})
+		self.assertEqual(stats.report(), [
+			'Floor: 2 objects, 3.000 ms',
+			'Door: 1 objects, 0.500 ms',
+			'Wall: 1 objects, 0.500 ms',
+			])
+
 class TestAutoSavefile(unittest.TestCase):
 	def should_save_autosavefile_if_ok(self):
 		mock_savefile = mock.MagicMock()
@@ -59,6 +79,13 @@ class TestReader(unittest.TestCase):
 		reader = StreamReader(stream)
 		self.assertEqual(reader.read(), '123')
 		self.assertEqual(reader.read(), 'game data' + '0'*4096)
+	def should_read_values_across_chunk_boundaries(self):
+		values = ['', 'a', 'game data', '0'*20, '', 'bc', 'EOF']
+		for chunk_size in (1, 2, 3, 7, 64):
+			stream = StringIO('\x00'.join(['666'] + values))
+			with mock.patch.object(StreamReader, 'CHUNK_SIZE', chunk_size):
+				reader = StreamReader(stream)
+				self.assertEqual([reader.read() for _ in values], values)
 	def should_read_custom_types(self):
 		stream = StringIO('666\x00123\x00game data')
 		reader = StreamReader(stream)
@@ -107,6 +134,32 @@ class TestReader(unittest.TestCase):
 		self.assertEqual(result[0].data, 'foo')
 		self.assertEqual(result[1].value, 500)
 		self.assertEqual(result[1].data, 'bar')
+	def should_collect_stats_for_custom_objects(self):
+		stream = StringIO('666\x002\x00100\x00foo\x00500\x00bar\x000\x0042')
+		reader = StreamReader(stream)
+		stats = reader.collect_stats()
+		self.assertIs(reader.stats, stats)
+		result = reader.read_list(MockSerializableObject)
+		self.assertEqual([obj.value for obj in result], [100, 500])
+		self.assertIsNone(reader.read(MockSerializableObject, optional=True))
+		self.assertEqual(reader.read(int), 42)
+		self.assertEqual(stats.counts, {'MockSerializableObject':2})
+	def should_read_sections_on_demand(self):
+		stream = StringIO('666\x00start\x003\x00666\x00100\x00foo\x00end')
+		reader = StreamReader(stream)
+		reader.set_meta_info('key', 'value')
+		stats = reader.collect_stats()
+		self.assertEqual(reader.read(), 'start')
+		section = reader.read_section()
+		self.assertTrue(isinstance(section, Section))
+		self.assertEqual(reader.read(), 'end')
+
+		section_reader = section.get_reader()
+		self.assertEqual(section_reader.version, 666)
+		self.assertEqual(section_reader.get_meta_info('key'), 'value')
+		obj = section_reader.read(MockSerializableObject)
+		self.assertEqual((obj.value, obj.data), (100, 'foo'))
+		self.assertEqual(stats.counts, {'MockSerializableObject':1})
 	def should_read_matrices(self):
 		stream = StringIO('666\x003\x002\x000\x000;0\x0010\x001;0\x0020\x002;0\x001\x000;1\x0011\x001;1\x0021\x002;1')
 		reader = StreamReader(stream)
@@ -124,6 +177,16 @@ class TestReader(unittest.TestCase):
 		self.assertEqual(matrix.cell((2, 0)).data, '2;0')
 		self.assertEqual(matrix.cell((2, 1)).value, 21)
 		self.assertEqual(matrix.cell((2, 1)).data, '2;1')
+	def should_read_typed_matrices(self):
+		stream = StringIO('666\x002\x002\x001\x000\x000\x001')
+		reader = StreamReader(stream)
+		matrix = reader.read_matrix(lambda c: c == '1', typecode='?')
+		self.assertEqual(matrix.typecode, '?')
+		self.assertEqual(list(matrix.values()), [True, False, False, True])
+	def should_read_booleans_as_custom_type(self):
+		stream = StringIO('666\x001\x000')
+		reader = StreamReader(stream)
+		self.assertEqual([reader.read(bool), reader.read(bool)], [True, False])
 	def should_read_optional_objects(self):
 		stream = StringIO('666\x001\x00123\x00game data')
 		reader = StreamReader(stream)
@@ -150,6 +213,15 @@ class TestWriter(unittest.TestCase):
 		obj = MockSerializableObject(123, 'game data')
 		writer.write(obj)
 		self.assertEqual(stream.getvalue(), '666\x00123\x00game data')
+	def should_resolve_save_method_once_per_class(self):
+		from .. import stream as stream_module
+		stream = StringIO()
+		writer = Writer(stream, 666)
+		with mock.patch.object(stream_module, '_compile_write_plan', wraps=stream_module._compile_write_plan) as compile_plan:
+			writer.write(MockSerializableObject(1, 'a'))
+			writer.write(MockSerializableObject(2, 'b'))
+		compile_plan.assert_called_once_with(MockSerializableObject)
+		self.assertEqual(stream.getvalue(), '666\x001\x00a\x002\x00b')
 	def should_write_bool_values(self):
 		stream = StringIO()
 		writer = Writer(stream, 666)
@@ -179,6 +251,45 @@ class TestWriter(unittest.TestCase):
 			MockSerializableObject(500, 'bar'),
 			])
 		self.assertEqual(stream.getvalue(), '666\x002\x00100\x00foo\x00500\x00bar')
+	def should_write_subclasses_of_builtin_types(self):
+		stream = StringIO()
+		writer = Writer(stream, 666)
+		writer.write(MockPoint(1, 2))
+		writer.write(MockPoint(3, 4))
+		writer.write(True)
+		writer.write(['a'])
+		self.assertEqual(stream.getvalue(), '666\x001\x002\x003\x004\x001\x001\x00a')
+	def should_collect_stats_for_custom_objects(self):
+		stream = StringIO()
+		writer = Writer(stream, 666)
+		stats = writer.collect_stats()
+		self.assertIs(writer.stats, stats)
+		writer.write([
+			MockSerializableObject(100, 'foo'),
+			MockSerializableObject(500, 'bar'),
+			])
+		writer.write(None, optional=True)
+		writer.write(Point(1, 2))
+		self.assertEqual(stream.getvalue(), '666\x002\x00100\x00foo\x00500\x00bar\x000\x001\x002')
+		self.assertEqual(stats.counts, {'MockSerializableObject':2})
+	def should_write_sections(self):
+		stream = StringIO()
+		writer = Writer(stream, 666)
+		stats = writer.collect_stats()
+		writer.write_section(MockSerializableObject(100, 'foo'))
+		self.assertEqual(stream.getvalue(), '666\x003\x00666\x00100\x00foo')
+		self.assertEqual(stats.counts, {'MockSerializableObject':1})
+
+		reader = StreamReader(StringIO(stream.getvalue()))
+		section = reader.read_section()
+		stream = StringIO()
+		writer = Writer(stream, 666)
+		writer.write_section(section)
+		self.assertEqual(stream.getvalue(), '666\x003\x00666\x00100\x00foo')
+
+		binary_writer = BinaryWriter(BytesIO(), 666)
+		with self.assertRaises(ValueError):
+			binary_writer.write_section(section)
 	def should_write_matrices(self):
 		stream = StringIO()
 		writer = Writer(stream, 666)
@@ -191,6 +302,14 @@ class TestWriter(unittest.TestCase):
 		matrix.set_cell((2, 1), MockSerializableObject(21, '2;1'))
 		writer.write(matrix)
 		self.assertEqual(stream.getvalue(), '666\x003\x002\x000\x000;0\x0010\x001;0\x0020\x002;0\x001\x000;1\x0011\x001;1\x0021\x002;1')
+	def should_write_typed_matrices(self):
+		stream = StringIO()
+		writer = Writer(stream, 666)
+		matrix = Matrix(Size(2, 2), False, typecode='?')
+		matrix.set_cell((0, 0), True)
+		matrix.set_cell((1, 1), True)
+		writer.write(matrix)
+		self.assertEqual(stream.getvalue(), '666\x002\x002\x001\x000\x000\x001')
 	def should_write_optional_objects(self):
 		stream = StringIO()
 		writer = Writer(stream, 666)
@@ -203,6 +322,198 @@ class TestWriter(unittest.TestCase):
 		writer.write(None, optional=True)
 		self.assertEqual(stream.getvalue(), '666\x000')
 
+class TestBinaryFormat(unittest.TestCase):
+	def _reader(self, writer):
+		writer.flush()
+		return BinaryReader(BytesIO(writer.f.getvalue()))
+	def should_read_and_write_values(self):
+		writer = BinaryWriter(BytesIO(), 666)
+		values = [0, 1, -1, 63, 64, -65, 2**70, -2**70, 1.5, -0.25, None, '', 'game data', u'\u0444', 'x' * 300, True, False]
+		for value in values:
+			writer.write(value)
+		reader = self._reader(writer)
+		self.assertEqual(reader.version, 666)
+		self.assertEqual([reader.read_raw() for _ in values], values[:-2] + [1, 0])
+	def should_read_values_as_text(self):
+		writer = BinaryWriter(BytesIO(), 666)
+		for value in [123, 1.5, None, None, 'None', 'data', 1, '1', 0, 'text', 'text', 5, 'custom', 42, 42, 'text', (1, 2)]:
+			writer.write(value)
+		reader = self._reader(writer)
+		self.assertEqual(reader.read(), '123')
+		self.assertEqual(reader.read(), '1.5')
+		self.assertEqual(reader.read(), 'None')
+		self.assertIsNone(reader.read_str())
+		self.assertIsNone(reader.read_str())
+		self.assertEqual(reader.read_str(), 'data')
+		self.assertEqual([reader.read_bool(), reader.read_bool(), reader.read(bool)], [True, True, False])
+		self.assertEqual(reader.read(), 'text')
+		self.assertEqual(reader.read(), 'text')
+		self.assertEqual(reader.read(str), '5')
+		self.assertEqual(reader.read(lambda value: value.upper()), 'CUSTOM')
+		self.assertEqual(reader.read(lambda value: value + '!'), '42!')
+		self.assertEqual(reader.read_int(), 42)
+		self.assertEqual(reader.read(), 'text')
+		self.assertEqual(reader.read(), '(1, 2)')
+	def should_store_repeated_strings_as_references(self):
+		writer = BinaryWriter(BytesIO(), 666)
+		names = ['name{0}'.format(index) for index in range(200)]
+		for name in names + names:
+			writer.write(name)
+		writer.flush()
+		self.assertLess(len(writer.f.getvalue()), sum(len(name) + 2 for name in names) + 2 * 2 * len(names))
+		reader = self._reader(writer)
+		self.assertEqual([reader.read() for _ in range(400)], names + names)
+	def should_read_and_write_structures(self):
+		writer = BinaryWriter(BytesIO(), 666)
+		writer.write(Point(1, -2))
+		writer.write(Size(3, 4))
+		writer.write([1, 'a'])
+		writer.write(MockSerializableObject(5, 'five'))
+		writer.write(MockSerializableObject(6, 'six'), optional=True)
+		writer.write(None, optional=True)
+		reader = self._reader(writer)
+		self.assertEqual(reader.read_point(), Point(1, -2))
+		self.assertEqual(reader.read_size(), Size(3, 4))
+		self.assertEqual(reader.read_list(), ['1', 'a'])
+		obj = reader.read(MockSerializableObject)
+		self.assertEqual((obj.value, obj.data), (5, 'five'))
+		obj = reader.read(MockSerializableObject, optional=True)
+		self.assertEqual((obj.value, obj.data), (6, 'six'))
+		self.assertIsNone(reader.read(MockSerializableObject, optional=True))
+	def should_read_lists_of_custom_objects(self):
+		writer = BinaryWriter(BytesIO(), 666)
+		writer.write([MockSerializableObject(1, 'one'), MockSerializableObject(2, 'two')])
+		reader = self._reader(writer)
+		self.assertEqual([(obj.value, obj.data) for obj in reader.read_list(MockSerializableObject)], [(1, 'one'), (2, 'two')])
+	def should_read_and_write_sections(self):
+		writer = BinaryWriter(BytesIO(), 666)
+		writer.write('foo')
+		writer.write_section(MockSerializableObject(100, 'foo'))
+		writer.write('foo')
+		writer.write_section([True, 'bar'])
+		reader = self._reader(writer)
+		self.assertEqual(reader.read(), 'foo')
+		section = reader.read_section()
+		self.assertEqual(reader.read(), 'foo')
+		other_section = reader.read_section()
+
+		obj = section.get_reader().read(MockSerializableObject)
+		self.assertEqual((obj.value, obj.data), (100, 'foo'))
+
+		writer = BinaryWriter(BytesIO(), 666)
+		writer.write_section(other_section)
+		section = self._reader(writer).read_section()
+		self.assertEqual(section.data, other_section.data)
+		self.assertEqual(section.get_reader().read_list(), ['1', 'bar'])
+
+		with self.assertRaises(ValueError):
+			Writer(StringIO(), 666).write_section(section)
+	def should_pack_bool_matrices(self):
+		writer = BinaryWriter(BytesIO(), 666)
+		matrix = Matrix((5, 3), False, typecode='?')
+		matrix.set_cell((1, 1), True)
+		matrix.set_cell((4, 2), True)
+		writer.write(matrix)
+		untyped = Matrix((3, 3), False)
+		untyped.set_cell((2, 0), True)
+		writer.write(untyped)
+		writer.write(untyped)
+		writer.write(untyped)
+		writer.flush()
+		self.assertLess(len(writer.f.getvalue()), 40)
+		reader = self._reader(writer)
+		restored = reader.read_matrix(bool, typecode='?')
+		self.assertEqual(restored.typecode, '?')
+		self.assertEqual(restored.data, matrix.data)
+		self.assertEqual(reader.read_matrix(bool).data, untyped.data)
+		self.assertEqual(reader.read_matrix(lambda c: c == '1').data, untyped.data)
+		self.assertEqual(reader.read_matrix().data, ['0', '0', '1'] + ['0'] * 6)
+	def should_pack_int_matrices(self):
+		writer = BinaryWriter(BytesIO(), 666)
+		writer.write(Matrix((2, 2), 200, typecode='B'))
+		writer.write(Matrix((2, 2), -5, typecode='l'))
+		small, large = Matrix((2, 2), -100), Matrix((2, 2), 2**40)
+		small.set_cell((1, 1), 100)
+		writer.write(small)
+		writer.write(large)
+		writer.write(Matrix((2, 1), 2**70))
+		writer.write(Matrix((2, 1), 0.5, typecode='d'))
+		reader = self._reader(writer)
+		restored = reader.read_matrix(int, typecode='B')
+		self.assertEqual(restored.data, Matrix((2, 2), 200, typecode='B').data)
+		restored = reader.read_matrix(int, typecode='l')
+		self.assertEqual(restored.data.typecode, 'l')
+		self.assertEqual(list(restored.data), [-5] * 4)
+		self.assertEqual(reader.read_matrix(int).data, [-100, -100, -100, 100])
+		self.assertEqual(reader.read_matrix(int).data, [2**40] * 4)
+		self.assertEqual(reader.read_matrix(int).data, [2**70] * 2)
+		self.assertEqual(list(reader.read_matrix(float, typecode='d').data), [0.5, 0.5])
+	def should_pack_string_matrices(self):
+		writer = BinaryWriter(BytesIO(), 666)
+		matrix = Matrix((20, 20), '.')
+		matrix.set_cell((1, 1), '#')
+		writer.write(matrix)
+		many = Matrix((20, 20), '.')
+		many.data = [str(index) for index in range(400)]
+		writer.write(many)
+		writer.write(matrix)
+		writer.write(Matrix((2, 1), 'mixed'))
+		mixed = Matrix((2, 1), 'mixed')
+		mixed.set_cell((1, 0), 1)
+		writer.write(mixed)
+		reader = self._reader(writer)
+		self.assertEqual(reader.read_matrix().data, matrix.data)
+		self.assertEqual(reader.read_matrix().data, many.data)
+		self.assertEqual(reader.read_matrix(lambda c: c == '#').data, [c == '#' for c in matrix.data])
+		self.assertEqual(reader.read_matrix(str).data, ['mixed', 'mixed'])
+		self.assertEqual(reader.read_matrix().data, ['mixed', '1'])
+	def should_read_matrices_of_custom_objects(self):
+		writer = BinaryWriter(BytesIO(), 666)
+		matrix = Matrix((2, 1))
+		matrix.data = [MockSerializableObject(1, 'one'), MockSerializableObject(2, 'two')]
+		writer.write(matrix)
+		reader = self._reader(writer)
+		restored = reader.read_matrix(MockSerializableObject)
+		self.assertEqual([(obj.value, obj.data) for obj in restored.data], [(1, 'one'), (2, 'two')])
+	def should_read_and_write_in_small_chunks(self):
+		values = ['x' * 10, 300, 'x' * 10, 1.5, None]
+		with mock.patch.object(BinaryWriter, 'CHUNK_SIZE', 3):
+			stream = BytesIO()
+			writer = BinaryWriter(stream, 666)
+			for value in values:
+				writer.write(value)
+			writer.write(Matrix((3, 3), True))
+			self.assertEqual(stream.getvalue()[:4], b'\x01\xb4\x0a\x03')
+			writer.flush()
+		for chunk_size in (1, 2, 3):
+			with mock.patch.object(BinaryReader, 'CHUNK_SIZE', chunk_size):
+				reader = BinaryReader(BytesIO(stream.getvalue()))
+				self.assertEqual([reader.read_raw() for _ in values], values)
+				self.assertEqual(reader.read_matrix(bool).data, [True] * 9)
+				with self.assertRaises(EOFError):
+					reader.read()
+	def should_fail_on_truncated_or_invalid_data(self):
+		reader = BinaryReader(BytesIO(b'\x01\x02\x03\x05abc'))
+		with self.assertRaises(EOFError):
+			reader.read()
+		reader = BinaryReader(BytesIO(b'\x01\x02\x01'))
+		with self.assertRaises(EOFError):
+			reader.read()
+		reader = BinaryReader(BytesIO(b'\x01\x02\x01\x80'))
+		with self.assertRaises(EOFError):
+			reader.read()
+		reader = BinaryReader(BytesIO(b'\x01\x02\xff\x00'))
+		with self.assertRaises(ValueError):
+			reader.read()
+
+		stream = BytesIO()
+		writer = BinaryWriter(stream, 1)
+		writer.write(Size(2, 2))
+		writer.flush()
+		reader = BinaryReader(BytesIO(stream.getvalue()))
+		with self.assertRaises(EOFError):
+			reader.read_matrix()
+
 class TestSavefile(unittest.TestCase):
 	@mock.patch('os.stat')
 	@mock.patch('os.path.exists', side_effect=[False, True])
@@ -220,14 +531,14 @@ class TestSavefile(unittest.TestCase):
 	@mock.patch('os.path.exists', side_effect=[True])
 	def should_load_game_from_file_if_exists(self, os_path_exists):
 		VERSION = 666
-		stream = mock.mock_open(read_data='{version}\x00123\x00game data'.format(version=VERSION))
+		stream = mock.mock_open(read_data='{version}\x00123\x00game data'.format(version=VERSION).encode('utf-8'))
 		with mock.patch(BUILTIN_OPEN, stream):
 			savefile = Savefile(os.path.join(tempfile.gettempdir(), "clckwrkbdgr_serialize_stream_unittest.sav"))
 			with savefile.get_reader() as reader:
 				self.assertEqual(reader.version, VERSION)
 				game_object = (int(reader.read()), reader.read())
 			self.assertEqual(game_object, (123, 'game data'))
-			stream.assert_called_once_with(savefile.filename, 'r')
+			stream.assert_called_once_with(savefile.filename, 'rb')
 			handle = stream()
 			handle.read.assert_has_calls([
 				mock.call(StreamReader.CHUNK_SIZE),
@@ -236,13 +547,13 @@ class TestSavefile(unittest.TestCase):
 	def should_save_game_to_file(self):
 		stream = mock.mock_open()
 		VERSION = 666
-		with mock.patch(BUILTIN_OPEN, stream):
+		with mock.patch('io.open', stream):
 			savefile = Savefile(os.path.join(tempfile.gettempdir(), "clckwrkbdgr_serialize_stream_unittest.sav"))
 			with savefile.save(VERSION) as writer:
 				writer.write(123)
 				writer.write('game data')
 
-			stream.assert_called_once_with(savefile.filename, 'w')
+			stream.assert_called_once_with(savefile.filename, 'w', encoding='utf-8', newline='')
 			handle = stream()
 			handle.write.assert_has_calls([
 				mock.call('{0}'.format(666)),
@@ -256,7 +567,7 @@ class TestSavefile(unittest.TestCase):
 	def should_unlink_savefile_on_crash_during_saving(self, os_path_exists, os_unlink):
 		stream = mock.mock_open()
 		VERSION = 666
-		with mock.patch(BUILTIN_OPEN, stream):
+		with mock.patch('io.open', stream):
 			savefile = Savefile(os.path.join(tempfile.gettempdir(), "clckwrkbdgr_serialize_stream_unittest.sav"))
 			try:
 				with savefile.save(VERSION) as writer:
@@ -265,7 +576,7 @@ class TestSavefile(unittest.TestCase):
 			except RuntimeError as e:
 				self.assertEqual(str(e), 'crash!')
 
-			stream.assert_called_once_with(savefile.filename, 'w')
+			stream.assert_called_once_with(savefile.filename, 'w', encoding='utf-8', newline='')
 			handle = stream()
 			handle.write.assert_has_calls([
 				mock.call('{0}'.format(666)),
@@ -285,3 +596,125 @@ class TestSavefile(unittest.TestCase):
 		savefile = Savefile(os.path.join(tempfile.gettempdir(), "clckwrkbdgr_serialize_stream_unittest.sav"))
 		savefile.unlink()
 		os_unlink.assert_not_called()
+	def should_save_and_load_savefiles_in_all_formats(self):
+		temp_dir = tempfile.mkdtemp()
+		try:
+			filename = os.path.join(temp_dir, 'savefile.sav')
+			for binary, compression in [(False, None), (True, None), (True, 'zlib'), (True, 'lzma')]:
+				savefile = Savefile(filename, binary=binary, compression=compression)
+				with savefile.save(666) as writer:
+					writer.write(u'\u0444' * 5000)
+					writer.write(u'line\r\nbreak')
+					writer.write(Matrix((100, 100), '.'))
+				with mock.patch.object(BinaryReader, 'CHUNK_SIZE', 5):
+					with Savefile(filename).get_reader() as reader:
+						self.assertEqual(type(reader), BinaryReader if binary else StreamReader)
+						self.assertEqual(reader.version, 666)
+						self.assertEqual(reader.read(), u'\u0444' * 5000)
+						self.assertEqual(reader.read(), u'line\r\nbreak')
+						self.assertEqual(reader.read_matrix().data, ['.'] * 10000)
+						self.assertEqual(reader.read(), 'EOF')
+						if binary:
+							with self.assertRaises(EOFError):
+								reader.read()
+			with open(filename, 'wb') as f:
+				f.write(Savefile.BINARY_MAGIC + b'\xff\x00')
+			with self.assertRaises(ValueError):
+				with Savefile(filename).get_reader() as reader:
+					pass # pragma: no cover
+		finally:
+			shutil.rmtree(temp_dir)
+	def should_write_snapshots_in_all_formats(self):
+		temp_dir = tempfile.mkdtemp()
+		try:
+			filename = os.path.join(temp_dir, 'savefile.sav')
+			obj = MockSerializableObject(100, u'\u0444\r\n')
+			for binary, compression in [(False, None), (True, None), (True, 'zlib'), (True, 'lzma')]:
+				savefile = Savefile(filename, binary=binary, compression=compression)
+				savefile.write_snapshot(savefile.make_snapshot(666, obj))
+				with Savefile(filename).get_reader() as reader:
+					self.assertEqual(reader.version, 666)
+					restored = reader.read(MockSerializableObject)
+					self.assertEqual((restored.value, restored.data), (100, u'\u0444\r\n'))
+					self.assertEqual(reader.read(), 'EOF')
+			self.assertEqual(os.listdir(temp_dir), ['savefile.sav'])
+
+			with self.assertRaises(TypeError):
+				savefile.write_snapshot(u'not bytes')
+			self.assertEqual(os.listdir(temp_dir), ['savefile.sav'])
+			with Savefile(filename).get_reader() as reader:
+				self.assertEqual(reader.read(MockSerializableObject).value, 100)
+
+			with mock.patch('clckwrkbdgr.serialize.stream._os_replace', None): # Python 2.
+				savefile.write_snapshot(savefile.make_snapshot(666, MockSerializableObject(200, u'\u0444')))
+			self.assertEqual(os.listdir(temp_dir), ['savefile.sav'])
+			with Savefile(filename).get_reader() as reader:
+				self.assertEqual(reader.read(MockSerializableObject).value, 200)
+		finally:
+			shutil.rmtree(temp_dir)
+	def should_fail_on_invalid_compression(self):
+		with self.assertRaises(ValueError):
+			Savefile('savefile.sav', binary=True, compression='unknown')
+		with self.assertRaises(ValueError):
+			Savefile('savefile.sav', compression='zlib')
+
+class MockSnapshotSavefile(object):
+	def __init__(self):
+		self.snapshots = []
+		self.written = []
+		self.proceed = threading.Event()
+		self.error = None
+	def make_snapshot(self, version, obj):
+		self.snapshots.append((version, obj))
+		return obj
+	def write_snapshot(self, data):
+		self.proceed.wait()
+		if self.error:
+			raise self.error
+		self.written.append(data)
+
+class TestBackgroundSaver(unittest.TestCase):
+	def should_save_periodically_in_background(self):
+		savefile = MockSnapshotSavefile()
+		saver = BackgroundSaver(savefile, 666, 1000)
+		self.assertFalse(saver.update('obj'))
+		saver.interval = 0
+		self.assertTrue(saver.update('obj'))
+		self.assertFalse(saver.update('other obj'))
+		self.assertEqual(savefile.snapshots, [(666, 'obj')])
+		savefile.proceed.set()
+		saver.wait()
+		self.assertEqual(savefile.written, ['obj'])
+
+		self.assertTrue(saver.update('other obj'))
+		saver.save('final obj')
+		saver.wait()
+		self.assertEqual(savefile.written, ['obj', 'other obj', 'final obj'])
+	def should_log_autosave_errors(self):
+		savefile = MockSnapshotSavefile()
+		savefile.error = IOError('disk full')
+		savefile.proceed.set()
+		saver = BackgroundSaver(savefile, 666, 0)
+		self.assertTrue(saver.update('obj'))
+		saver._thread.join()
+		with self.assertLogs('savefile', level='ERROR') as logs:
+			self.assertTrue(saver.update('other obj'))
+			saver._thread.join()
+			savefile.make_snapshot = mock.Mock(side_effect=ValueError('cannot serialize'))
+			self.assertFalse(saver.update('broken obj'))
+		self.assertEqual(logs.output, [
+			'ERROR:savefile:Autosave failed: disk full',
+			'ERROR:savefile:Autosave failed: disk full',
+			'ERROR:savefile:Autosave failed: cannot serialize',
+			])
+		self.assertEqual(savefile.written, [])
+		saver.wait()
+	def should_reraise_errors_from_background_thread(self):
+		savefile = MockSnapshotSavefile()
+		savefile.error = IOError('disk full')
+		savefile.proceed.set()
+		saver = BackgroundSaver(savefile, 666, 0)
+		self.assertTrue(saver.update('obj'))
+		with self.assertRaises(IOError):
+			saver.wait()
+		saver.wait()
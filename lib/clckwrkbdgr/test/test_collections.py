@@ -1,7 +1,7 @@
 from clckwrkbdgr import unittest
 import pickle
 from clckwrkbdgr.collections import AutoRegistry
-from clckwrkbdgr.collections import dotdict
+from clckwrkbdgr.collections import dotdict, LazyDict
 from clckwrkbdgr.collections import Enum, DocstringEnum
 
 class TestDotDict(unittest.TestCase):
@@ -42,6 +42,54 @@ class TestDotDict(unittest.TestCase):
 		self.assertTrue(type(other) is dotdict)
 		self.assertTrue(type(other.nested) is dotdict)
 
+class TestLazyDict(unittest.TestCase):
+	def should_load_values_on_first_access(self):
+		loaded = []
+		def _loader(key, data):
+			loaded.append(key)
+			return data.upper()
+		d = LazyDict(_loader)
+		d['a'] = 'value'
+		d.pending['b'] = 'data'
+		d.pending['c'] = 'more data'
+		self.assertEqual(len(d), 3)
+		self.assertEqual(sorted(d), ['a', 'b', 'c'])
+		self.assertTrue('b' in d)
+		self.assertFalse('d' in d)
+		self.assertEqual(loaded, [])
+
+		self.assertEqual(d['b'], 'DATA')
+		self.assertEqual(d['b'], 'DATA')
+		self.assertEqual(loaded, ['b'])
+		self.assertEqual(d.loaded, {'a':'value', 'b':'DATA'})
+		self.assertEqual(d.pending, {'c':'more data'})
+		self.assertEqual(d.clean, {'b':'data'})
+		d.mark_dirty('b')
+		self.assertEqual(d.clean, {})
+		with self.assertRaises(KeyError):
+			d['d']
+
+		self.assertEqual(sorted(d.items()), [('a', 'value'), ('b', 'DATA'), ('c', 'MORE DATA')])
+		self.assertEqual(loaded, ['b', 'c'])
+	def should_replace_and_delete_pending_values(self):
+		d = LazyDict(lambda key, data: data.upper())
+		d.pending['a'] = 'data'
+		d.pending['b'] = 'data'
+		d.pending['c'] = 'data'
+		d['a'] = 'value'
+		self.assertEqual(d['a'], 'value')
+		self.assertEqual(d['c'], 'DATA')
+		d['c'] = 'value'
+		self.assertEqual(d.clean, {})
+		self.assertEqual(d['b'], 'DATA')
+		del d['a']
+		del d['b']
+		del d['c']
+		self.assertEqual(d.clean, {})
+		self.assertEqual(len(d), 0)
+		with self.assertRaises(KeyError):
+			del d['a']
+
 class TestAutoRegistry(unittest.TestCase):
 	def should_register_entry(self):
 		reg = AutoRegistry()